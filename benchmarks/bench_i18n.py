@@ -0,0 +1,73 @@
+"""
+Measure the per-call cost of t() against python-i18n
+
+Each message is translated in a tight loop, as update_progress does for the
+progress label, with the active locale's catalog already loaded. The
+python-i18n column is skipped when the package is not installed.
+
+Usage:
+    poetry run python benchmarks/bench_i18n.py [--calls 200000] [--locale es]
+"""
+import argparse
+import os
+import time
+
+from directory_printer.core import i18n_config
+from directory_printer.core.utilities import get_resource_path
+
+# (label, key, arguments) of each measured call
+CALLS = [
+    ("progress", "PROGRESS.PROCESSING", {"current": 1234, "total": 56789, "percent": "2.2"}),
+    ("static", "ACTIONS.GENERATE", {}),
+    ("fallback", "MISSING.KEY", {}),
+]
+
+
+def per_call(translate, key, kwargs, calls):
+    """Nanoseconds per translate(key, **kwargs) call"""
+    translate(key, **kwargs)  # Loads the catalog, outside the timing
+    start = time.perf_counter()
+    for _ in range(calls):
+        translate(key, **kwargs)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def python_i18n(locale):
+    """python-i18n's t(), configured as the GUI used to, or None if it is not installed"""
+    try:
+        import i18n
+    except ImportError:
+        return None
+    i18n.load_path.append(get_resource_path(os.path.join('directory_printer', 'translations')))
+    i18n.set('filename_format', '{locale}.{format}')
+    i18n.set('file_format', 'json')
+    i18n.set('skip_locale_root_data', True)
+    i18n.set('locale', locale)
+    i18n.set('fallback', 'en')
+    return i18n.t
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--locale", default="en")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    i18n_config.init_i18n(args.locale)
+    load_ms = (time.perf_counter() - start) * 1e3
+    baseline = python_i18n(args.locale)
+
+    print(f"catalog load ({args.locale}): {load_ms:.2f} ms")
+    print(f"{'message':>10}  {'t()':>10}  {'python-i18n':>12}  {'speedup':>8}")
+    for label, key, kwargs in CALLS:
+        ours = per_call(i18n_config.t, key, kwargs, args.calls)
+        if baseline is None:
+            print(f"{label:>10}  {ours:>7.0f} ns  {'skipped':>12}")
+            continue
+        theirs = per_call(baseline, key, kwargs, args.calls)
+        print(f"{label:>10}  {ours:>7.0f} ns  {theirs:>9.0f} ns  {theirs / ours:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
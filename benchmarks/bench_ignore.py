@@ -0,0 +1,108 @@
+"""
+Compare ignore matching with pathspec (should_ignore) against IgnoreMatcher
+
+Usage:
+    poetry run python benchmarks/bench_ignore.py [--patterns 1000 5000] [--paths 2000]
+"""
+import argparse
+import os
+import random
+import time
+
+import pathspec
+
+from directory_printer.core.ignore import IgnoreMatcher, default_ignore_patterns
+from directory_printer.core.printer import should_ignore
+
+SEGMENTS = ["src", "lib", "build", "dist", "node_modules", "vendor", "tests", "docs", "app", "pkg"]
+EXTENSIONS = ["py", "js", "ts", "log", "tmp", "txt", "json", "lock", "cache", "o"]
+
+
+def generate_patterns(count: int, rng: random.Random):
+    """Generate a realistic mix of gitignore patterns"""
+    patterns = default_ignore_patterns.copy()
+    for i in range(count):
+        kind = rng.randrange(6)
+        segment = rng.choice(SEGMENTS)
+        ext = rng.choice(EXTENSIONS)
+        if kind == 0:
+            patterns.append(f"{segment}{i}")
+        elif kind == 1:
+            patterns.append(f"{segment}{i}/")
+        elif kind == 2:
+            patterns.append(f"*.{ext}{i}")
+        elif kind == 3:
+            patterns.append(f"/{segment}/{segment}{i}/*.{ext}")
+        elif kind == 4:
+            patterns.append(f"**/{segment}{i}/**/*.{ext}")
+        else:
+            patterns.append(f"!{segment}{i}.{ext}")
+    return patterns
+
+
+def generate_paths(count: int, rng: random.Random):
+    """Generate relative paths; ancestors of each path are not ignored by construction"""
+    paths = []
+    for _ in range(count):
+        depth = rng.randint(1, 6)
+        parts = [rng.choice(SEGMENTS) for _ in range(depth - 1)]
+        if rng.random() < 0.5:
+            parts.append(f"{rng.choice(SEGMENTS)}{rng.randrange(50)}")
+            paths.append(("/".join(parts), True))
+        else:
+            parts.append(f"file{rng.randrange(50)}.{rng.choice(EXTENSIONS)}")
+            paths.append(("/".join(parts), False))
+    return paths
+
+
+def bench(patterns, paths):
+    base = os.path.abspath("bench-root")
+
+    start = time.perf_counter()
+    spec = pathspec.PathSpec.from_lines('gitwildmatch', patterns)
+    pathspec_compile = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = IgnoreMatcher(patterns)
+    matcher_compile = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for rel_path, _ in paths:
+        should_ignore(os.path.join(base, rel_path), base, spec)
+    pathspec_match = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for rel_path, is_dir in paths:
+        matcher.match(rel_path, is_dir)
+    matcher_match = time.perf_counter() - start
+
+    return pathspec_compile, matcher_compile, pathspec_match, matcher_match
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--patterns", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--paths", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    paths = generate_paths(args.paths, rng)
+
+    print(
+        f"{'patterns':>8}  {'compile (pathspec/matcher)':>28}  "
+        f"{'per path (pathspec/matcher)':>30}  {'speedup':>8}"
+    )
+    for count in args.patterns:
+        patterns = generate_patterns(count, rng)
+        ps_compile, m_compile, ps_match, m_match = bench(patterns, paths)
+        per_ps = ps_match / len(paths) * 1e6
+        per_m = m_match / len(paths) * 1e6
+        print(
+            f"{count:>8}  {ps_compile * 1e3:>12.1f} ms / {m_compile * 1e3:>8.1f} ms"
+            f"  {per_ps:>12.1f} us / {per_m:>10.2f} us  {per_ps / per_m:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Benchmark the printer core on synthetic directory trees
+
+Trees are generated in a temporary directory for each scenario: wide, deep,
+many small files, symlink-heavy and a tree with a large ignore file. For each
+one, traversal, ignore matching and output formatting are timed separately,
+along with the end-to-end print_structure and the legacy os.walk counting.
+Every scenario runs in its own interpreter so peak RSS is per scenario.
+
+Usage:
+    poetry run python benchmarks/bench_printer.py [--scenarios wide deep] [--scale 1.0]
+        [--json results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+SCENARIOS = ["wide", "deep", "small_files", "symlinks", "gitignore"]
+EXTENSIONS = ["py", "js", "log", "tmp", "txt", "json", "o", "md"]
+
+
+def _touch(path: str):
+    open(path, "w").close()
+
+
+def build_wide(root: str, scale: float):
+    """One directory with many files, plus many shallow subdirectories"""
+    for i in range(int(20000 * scale)):
+        _touch(os.path.join(root, f"file{i}.{EXTENSIONS[i % len(EXTENSIONS)]}"))
+    for d in range(int(200 * scale)):
+        sub = os.path.join(root, f"dir{d}")
+        os.mkdir(sub)
+        for i in range(50):
+            _touch(os.path.join(sub, f"file{i}.txt"))
+
+
+def build_deep(root: str, scale: float):
+    """A long chain of nested directories with a few files at every level"""
+    current = root
+    for level in range(int(200 * scale)):
+        for i in range(5):
+            _touch(os.path.join(current, f"file{i}.py"))
+        current = os.path.join(current, f"level{level}")
+        os.mkdir(current)
+
+
+def build_small_files(root: str, scale: float):
+    """A balanced tree of many directories holding small files"""
+    for a in range(int(40 * scale)):
+        for b in range(10):
+            sub = os.path.join(root, f"pkg{a}", f"mod{b}")
+            os.makedirs(sub)
+            for i in range(50):
+                with open(os.path.join(sub, f"f{i}.{EXTENSIONS[i % len(EXTENSIONS)]}"), "w") as f:
+                    f.write("x" * 64)
+
+
+def build_symlinks(root: str, scale: float):
+    """Directories where half of the entries are symlinks to files and sibling directories"""
+    targets = os.path.join(root, "targets")
+    os.mkdir(targets)
+    for d in range(int(50 * scale)):
+        sub = os.path.join(targets, f"t{d}")
+        os.mkdir(sub)
+        for i in range(20):
+            _touch(os.path.join(sub, f"file{i}.txt"))
+    links = os.path.join(root, "links")
+    os.mkdir(links)
+    for d in range(int(50 * scale)):
+        sub = os.path.join(links, f"l{d}")
+        os.mkdir(sub)
+        # Links point into "targets" only, which is never an ancestor, so there are no cycles
+        target = os.path.join(targets, f"t{d}")
+        os.symlink(target, os.path.join(sub, "dir_link"), target_is_directory=True)
+        for i in range(20):
+            os.symlink(os.path.join(target, f"file{i}.txt"), os.path.join(sub, f"link{i}.txt"))
+
+
+def build_gitignore(root: str, scale: float):
+    """A mid-sized tree and an ignore file with thousands of patterns"""
+    build_small_files(root, scale / 2)
+    patterns = ["*.log", "*.tmp", "mod3/", "**/mod7/*.o", "!pkg1/mod3/"]
+    for i in range(int(3000 * scale)):
+        kind = i % 4
+        if kind == 0:
+            patterns.append(f"generated{i}/")
+        elif kind == 1:
+            patterns.append(f"*.cache{i}")
+        elif kind == 2:
+            patterns.append(f"/pkg{i}/mod*/f{i}.py")
+        else:
+            patterns.append(f"**/build{i}/**")
+    ignore_path = os.path.join(root, ".gitignore")
+    with open(ignore_path, "w") as f:
+        f.write("\n".join(patterns))
+    return ignore_path
+
+
+BUILDERS = {
+    "wide": build_wide,
+    "deep": build_deep,
+    "small_files": build_small_files,
+    "symlinks": build_symlinks,
+    "gitignore": build_gitignore,
+}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, or None where it is not available"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def run_scenario(name: str, scale: float):
+    """Build one scenario and time each stage; runs inside a child interpreter"""
+    from directory_printer.core.compact_tree import CompactTree
+    from directory_printer.core.ignore import IgnoreMatcher, default_ignore_patterns
+    from directory_printer.core.printer import format_tree, print_structure
+    from directory_printer.core.search import NameIndex, filter_tree
+    from directory_printer.core.traversal import walk_tree
+
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as tmp:
+        root = os.path.join(tmp, "root")
+        os.mkdir(root)
+        _, build_seconds = timed(lambda: BUILDERS[name](root, scale))
+        ignore_path = os.path.join(root, ".gitignore") if name == "gitignore" else None
+
+        # Traversal only: every entry, no ignore matching or formatting
+        entries, walk_seconds = timed(lambda: list(walk_tree(root)))
+
+        # Ignore matching on the collected paths, including compile time
+        matcher, compile_seconds = timed(
+            lambda: IgnoreMatcher.from_file(ignore_path) if ignore_path
+            else IgnoreMatcher(default_ignore_patterns)
+        )
+        paths = [(entry.rel_path, entry.is_dir) for entry in entries if entry.error is None]
+        _, match_seconds = timed(
+            lambda: [matcher.match(rel_path, is_dir) for rel_path, is_dir in paths]
+        )
+
+        # Formatting only, from the pre-walked entries
+        lines, format_seconds = timed(lambda: list(format_tree(entries)))
+
+        # Compact model from the pre-walked entries, then a full render from the model
+        tree, compact_seconds = timed(lambda: CompactTree.from_entries(root, entries))
+        _, render_seconds = timed(lambda: list(tree.lines()))
+
+        # Name index over the model, then a glob query pruned to its matches
+        index, index_seconds = timed(lambda: NameIndex(tree))
+        filtered, search_seconds = timed(lambda: filter_tree(tree, "*1*", index))
+
+        printed, total_seconds = timed(lambda: print_structure(root, gitignore_path=ignore_path))
+        sized, sizes_seconds = timed(
+            lambda: print_structure(root, gitignore_path=ignore_path, sizes=True, largest=10)
+        )
+
+    def stage(seconds, count):
+        rate = count / seconds if seconds else None
+        return {"seconds": seconds, "entries": count, "entries_per_sec": rate}
+
+    return {
+        "scenario": name,
+        "scale": scale,
+        "entries": len(entries),
+        "build_seconds": build_seconds,
+        "stages": {
+            "traversal": stage(walk_seconds, len(entries)),
+            "ignore_compile": stage(compile_seconds, 0),
+            "ignore_match": stage(match_seconds, len(paths)),
+            "format": stage(format_seconds, len(lines)),
+            "compact_tree_build": stage(compact_seconds, len(tree)),
+            "compact_tree_render": stage(render_seconds, len(tree)),
+            "search_index": stage(index_seconds, len(tree)),
+            "search_filter": stage(search_seconds, filtered.matches),
+            "print_structure": stage(total_seconds, len(printed)),
+            "print_with_sizes": stage(sizes_seconds, len(sized)),
+        },
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiplier for the size of every tree"
+    )
+    parser.add_argument(
+        "--json", metavar="FILE", help="Write results as JSON to FILE ('-' for stdout)"
+    )
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_scenario(args.child, args.scale)))
+        return
+
+    results = []
+    for name in args.scenarios:
+        if name == "symlinks" and sys.platform == "win32":
+            print(f"skipping {name}: symlinks need extra privileges on Windows", file=sys.stderr)
+            continue
+        output = subprocess.run(
+            [
+                sys.executable, os.path.abspath(__file__), "--child", name,
+                "--scale", str(args.scale)
+            ],
+            capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    if args.json != "-":
+        print(
+            f"{'scenario':<12} {'entries':>8}  {'stage':<21} {'seconds':>9} "
+            f"{'entries/s':>12}  {'peak RSS':>9}"
+        )
+        for result in results:
+            rss = result["peak_rss_mb"]
+            for index, (stage_name, stage) in enumerate(result["stages"].items()):
+                rate = stage["entries_per_sec"]
+                print(
+                    f"{result['scenario'] if index == 0 else '':<12} "
+                    f"{result['entries'] if index == 0 else '':>8}  "
+                    f"{stage_name:<21} {stage['seconds']:>9.4f} "
+                    f"{f'{rate:,.0f}' if rate else '-':>12}  "
+                    f"{(f'{rss:.1f} MB' if rss is not None else '-') if index == 0 else '':>9}"
+                )
+
+    if args.json:
+        report = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        if args.json == "-":
+            print(json.dumps(report, indent=2))
+        else:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark GUI and CLI startup time
+
+Each run starts a fresh interpreter, so import caches from earlier runs do
+not hide regressions. The GUI is measured up to its first paint: the window
+is created, drawn once and closed before any deferred startup work runs.
+Pass budgets to fail (exit code 1) when the median exceeds them.
+
+Usage:
+    poetry run python benchmarks/bench_startup.py [--runs 5] [--budget-import-ms 150]
+        [--budget-paint-ms 400]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Runs inside the child interpreter; prints one JSON object with timings in milliseconds
+# The app reads and writes its settings under the home directory, so the probe gets an
+# empty temporary one and never touches the user's ~/.directory_printer
+GUI_PROBE = """
+import json, os, shutil, tempfile, time
+home = tempfile.mkdtemp()
+os.environ["HOME"] = os.environ["USERPROFILE"] = home
+try:
+    start = time.perf_counter()
+    from directory_printer.gui import app
+    imported = time.perf_counter()
+    try:
+        window = app.DirectoryPrinterApp()
+    except Exception as e:
+        print(json.dumps({"import_ms": (imported - start) * 1e3, "error": str(e)}))
+        raise SystemExit(0)
+    window.root.update()
+    painted = time.perf_counter()
+    window.root.destroy()
+    print(json.dumps({"import_ms": (imported - start) * 1e3, "paint_ms": (painted - start) * 1e3}))
+finally:
+    shutil.rmtree(home, ignore_errors=True)
+"""
+
+CLI_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from directory_printer import cli
+imported = time.perf_counter()
+heavy = sorted(m for m in ("tkinter", "PIL", "i18n", "tomli") if m in sys.modules)
+print(json.dumps({"import_ms": (imported - start) * 1e3, "heavy_modules": heavy}))
+"""
+
+
+def probe(code: str):
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def median(samples, key):
+    values = [sample[key] for sample in samples if key in sample]
+    return statistics.median(values) if values else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-import-ms", type=float, help="Maximum median GUI import time")
+    parser.add_argument("--budget-paint-ms", type=float, help="Maximum median time to first paint")
+    parser.add_argument("--budget-cli-ms", type=float, help="Maximum median CLI import time")
+    args = parser.parse_args()
+
+    gui = [probe(GUI_PROBE) for _ in range(args.runs)]
+    cli = [probe(CLI_PROBE) for _ in range(args.runs)]
+
+    gui_import = median(gui, "import_ms")
+    gui_paint = median(gui, "paint_ms")
+    cli_import = median(cli, "import_ms")
+
+    print(f"{'gui import':>16}  {gui_import:>8.1f} ms")
+    if gui_paint is None:
+        print(f"{'gui first paint':>16}  skipped ({gui[0].get('error')})")
+    else:
+        print(f"{'gui first paint':>16}  {gui_paint:>8.1f} ms")
+    print(f"{'cli import':>16}  {cli_import:>8.1f} ms")
+
+    failures = []
+    if cli[0]["heavy_modules"]:
+        failures.append(f"CLI imports GUI-only modules: {', '.join(cli[0]['heavy_modules'])}")
+    for name, value, budget in (
+        ("gui import", gui_import, args.budget_import_ms),
+        ("gui first paint", gui_paint, args.budget_paint_ms),
+        ("cli import", cli_import, args.budget_cli_ms),
+    ):
+        if budget is not None and value is not None and value > budget:
+            failures.append(f"{name} took {value:.1f} ms, budget is {budget:.1f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+Headless command line interface for printing directory structures
+
+Only the core package is imported, so the CLI starts quickly and runs
+without a display.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+from directory_printer.core.export import WRITERS, iter_records
+from directory_printer.core.git_index import SOURCE_WALK, SOURCES, find_git_dir, walk_source
+from directory_printer.core.ignore import load_ignore
+from directory_printer.core.printer import iter_entries, iter_paths, iter_structure
+from directory_printer.core.profiling import RunProfile
+from directory_printer.core.snapshot import SnapshotCache
+
+# Output formats supported by --format
+FORMATS = ("tree", "paths", *WRITERS)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="directory-printer-cli",
+        description="Print the structure of a directory to stdout or a file."
+    )
+    parser.add_argument(
+        "paths", nargs="*", metavar="path",
+        help="Directory to print; with several, each is written to its own file in --output-dir"
+    )
+    parser.add_argument(
+        "--batch", metavar="FILE",
+        help="Manifest of directories to generate, one per line, optionally followed by a tab and "
+             "that directory's ignore file"
+    )
+    parser.add_argument(
+        "--output-dir", metavar="DIR",
+        help="Write one output file per directory here, named after the directory"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=0, metavar="N",
+        help="With several directories, generate N at a time in separate processes "
+             "(default: one per CPU)"
+    )
+    parser.add_argument(
+        "-i", "--ignore-file", metavar="FILE",
+        help="Ignore file with gitignore patterns (e.g. .gitignore, .dockerignore)"
+    )
+    parser.add_argument(
+        "-n", "--nested-ignore", action="store_true",
+        help="Also apply .gitignore files found in subdirectories and .git/info/exclude"
+    )
+    parser.add_argument(
+        "-L", "--follow-symlinks", action="store_true",
+        help="Descend into symlinked directories; each directory is still listed once"
+    )
+    parser.add_argument(
+        "-x", "--one-file-system", action="store_true",
+        help="Do not descend into directories on other filesystems than the root's"
+    )
+    parser.add_argument(
+        "--source", choices=SOURCES, default=SOURCE_WALK,
+        help="Where entries come from in a git checkout: walk the directory, read the tracked "
+             "files from .git/index without walking (git), or add untracked files that are not "
+             "ignored (git-untracked). Directories that are not checkouts are walked "
+             "(default: walk)"
+    )
+    parser.add_argument(
+        "-d", "--depth", type=int, metavar="N",
+        help="Only descend N levels below the root"
+    )
+    parser.add_argument(
+        "-m", "--max-entries", type=int, metavar="N",
+        help="Stop after N entries; cut off directories end with a '… N more' line"
+    )
+    parser.add_argument(
+        "-s", "--sizes", action="store_true",
+        help="Show file sizes and recursive directory totals (tree format only)"
+    )
+    parser.add_argument(
+        "--largest", type=int, default=0, metavar="N",
+        help="With --sizes, also list the N largest directories"
+    )
+    parser.add_argument(
+        "--diff", metavar="OTHER",
+        help="Print what differs from path to OTHER, each a directory or a JSON, NDJSON or CSV "
+             "export; exits with 1 if they differ. With --sizes, file sizes are compared too"
+    )
+    parser.add_argument(
+        "--mtimes", action="store_true",
+        help="With --diff, also compare file modification times"
+    )
+    parser.add_argument(
+        "-F", "--filter", metavar="QUERY",
+        help="Only show entries whose name contains QUERY or matches it as a glob "
+             "(e.g. '*.py', 'src/**/test_*'), with the directories above them (tree format only)"
+    )
+    parser.add_argument(
+        "-f", "--format", choices=FORMATS, default="tree",
+        help="Output format: an indented tree, one relative path per line, or path, depth, "
+             "type, size, mtime and symlink target records as JSON, NDJSON or CSV (default: tree)"
+    )
+    parser.add_argument(
+        "-o", "--output", metavar="FILE",
+        help="Write to FILE instead of stdout"
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=0, metavar="N",
+        help="Threads prefetching directory listings (default: 0, list on the main thread)"
+    )
+    parser.add_argument(
+        "--profile", metavar="FILE",
+        help="Record counters and phase timings of the run and write them as JSON to FILE, "
+             "or as a readable report to stderr with '-' (tree format only)"
+    )
+    parser.add_argument(
+        "--cache", action="store_true",
+        help="Reuse listings of unchanged directories from ~/.directory_printer/snapshots.json"
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.batch or args.output_dir or len(args.paths) > 1:
+        return run_batch_command(parser, args)
+    if len(args.paths) != 1:
+        parser.error("a directory or --batch is required")
+    args.path = args.paths[0]
+    if args.diff is not None:
+        return run_diff_command(parser, args)
+    if args.mtimes:
+        parser.error("--mtimes requires --diff")
+    if not os.path.isdir(args.path):
+        parser.error(f"Directory '{args.path}' not found")
+    if args.ignore_file and not os.path.isfile(args.ignore_file):
+        parser.error(f"Ignore file '{args.ignore_file}' not found")
+    check_options(parser, args)
+    if args.filter is not None and (args.format != "tree" or args.sizes):
+        parser.error("--filter is only supported with --format tree, without --sizes")
+    if args.profile and (args.format != "tree" or args.filter is not None):
+        parser.error("--profile is only supported with --format tree, without --filter")
+    profile = RunProfile() if args.profile else None
+    if args.source != SOURCE_WALK and find_git_dir(args.path) is None:
+        print(
+            f"'{args.path}' is not the root of a git checkout; walking the directory",
+            file=sys.stderr
+        )
+
+    records = None
+    if args.format in WRITERS:
+        matcher = load_ignore(args.path, args.ignore_file, nested=args.nested_ignore)
+        records = iter_records(walk_source(
+            args.path, args.source, ignore=matcher, workers=args.workers, max_depth=args.depth,
+            max_entries=args.max_entries, stats=True, follow_symlinks=args.follow_symlinks,
+            one_filesystem=args.one_file_system
+        ))
+    elif args.format == "paths":
+        lines = iter_paths(
+            args.path,
+            gitignore_path=args.ignore_file,
+            workers=args.workers,
+            max_depth=args.depth,
+            max_entries=args.max_entries,
+            nested_ignore=args.nested_ignore,
+            follow_symlinks=args.follow_symlinks,
+            one_filesystem=args.one_file_system,
+            source=args.source
+        )
+    elif args.filter is not None:
+        from directory_printer.core.compact_tree import CompactTree
+        from directory_printer.core.search import filter_tree
+
+        # The whole tree is held in columns so it can be pruned to the matches
+        tree = CompactTree.from_entries(args.path, iter_entries(
+            args.path,
+            gitignore_path=args.ignore_file,
+            workers=args.workers,
+            cache=SnapshotCache() if args.cache else None,
+            max_depth=args.depth,
+            max_entries=args.max_entries,
+            nested_ignore=args.nested_ignore,
+            follow_symlinks=args.follow_symlinks,
+            one_filesystem=args.one_file_system,
+            source=args.source
+        ))
+        lines = filter_tree(tree, args.filter)
+    else:
+        lines = iter_structure(
+            args.path,
+            gitignore_path=args.ignore_file,
+            workers=args.workers,
+            cache=SnapshotCache() if args.cache else None,
+            max_depth=args.depth,
+            max_entries=args.max_entries,
+            nested_ignore=args.nested_ignore,
+            sizes=args.sizes,
+            largest=args.largest,
+            follow_symlinks=args.follow_symlinks,
+            one_filesystem=args.one_file_system,
+            source=args.source,
+            profile=profile
+        )
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if records is not None:
+            WRITERS[args.format](records, output, args.path)
+        else:
+            if args.format == "tree":
+                output.write(args.path + "\n")
+            for line in lines:
+                output.write(line + "\n")
+        output.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); silence the final flush at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    if profile is not None:
+        if args.profile == "-":
+            print("\n".join(profile.summary_lines()), file=sys.stderr)
+        else:
+            profile.dump(args.profile)
+    return 0
+
+
+def check_options(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """Errors shared by single and batch runs"""
+    if args.depth is not None and args.depth < 1:
+        parser.error("--depth must be at least 1")
+    if args.max_entries is not None and args.max_entries < 1:
+        parser.error("--max-entries must be at least 1")
+    if args.largest < 0:
+        parser.error("--largest must not be negative")
+    if args.largest and not args.sizes:
+        parser.error("--largest requires --sizes")
+    if args.sizes and args.format != "tree":
+        parser.error("--sizes is only supported with --format tree")
+    if args.workers < 0:
+        parser.error("--workers must not be negative")
+
+
+def run_diff_command(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    """Print the differences between two directories or exports as a tree; 1 if they differ"""
+    for path in (args.path, args.diff):
+        if not os.path.exists(path):
+            parser.error(f"'{path}' not found")
+    if args.ignore_file and not os.path.isfile(args.ignore_file):
+        parser.error(f"Ignore file '{args.ignore_file}' not found")
+    if (args.format != "tree" or args.filter is not None or args.depth is not None
+            or args.max_entries is not None or args.largest or args.profile or args.cache):
+        parser.error(
+            "--format, --filter, --depth, --max-entries, --largest, --profile and --cache "
+            "are not supported with --diff"
+        )
+    check_options(parser, args)
+    from directory_printer.core.tree_diff import diff_trees, format_diff, load_tree
+
+    trees = []
+    for path in (args.path, args.diff):
+        if args.source != SOURCE_WALK and os.path.isdir(path) and find_git_dir(path) is None:
+            print(
+                f"'{path}' is not the root of a git checkout; walking the directory",
+                file=sys.stderr
+            )
+        try:
+            trees.append(load_tree(
+                path, sizes=args.sizes, mtimes=args.mtimes, gitignore_path=args.ignore_file,
+                workers=args.workers, nested_ignore=args.nested_ignore,
+                follow_symlinks=args.follow_symlinks, one_filesystem=args.one_file_system,
+                source=args.source
+            ))
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"Cannot read '{path}': {e}")
+    old, new = trees
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        output.write(f"--- {args.path}\n+++ {args.diff}\n")
+        for line in format_diff(diff_trees(old, new)):
+            output.write(line + "\n")
+        output.flush()
+    except BrokenPipeError:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0 if old.digest == new.digest else 1
+
+
+def run_batch_command(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    """Generate every directory into --output-dir on a process pool, printing a timing report"""
+    check_options(parser, args)
+    if not args.output_dir:
+        parser.error("--output-dir is required with several directories")
+    if args.output or args.filter is not None or args.cache or args.workers or args.profile:
+        parser.error(
+            "--output, --filter, --cache, --workers and --profile are not supported with several "
+            "directories"
+        )
+    if args.jobs < 0:
+        parser.error("--jobs must not be negative")
+    if args.ignore_file and not os.path.isfile(args.ignore_file):
+        parser.error(f"Ignore file '{args.ignore_file}' not found")
+
+    # Process pools are only loaded when several directories are generated
+    from directory_printer.core.batch import format_report, plan_jobs, read_manifest, run_batch
+
+    roots = [(path, args.ignore_file) for path in args.paths]
+    if args.batch:
+        try:
+            roots.extend(read_manifest(args.batch))
+        except OSError as e:
+            parser.error(f"Cannot read batch file '{args.batch}': {e}")
+    if not roots:
+        parser.error(f"Batch file '{args.batch}' lists no directories")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    results = []
+    for result in run_batch(
+        plan_jobs(roots, args.output_dir, args.format),
+        processes=args.jobs or None,
+        output_format=args.format,
+        max_depth=args.depth,
+        max_entries=args.max_entries,
+        nested_ignore=args.nested_ignore,
+        sizes=args.sizes,
+        largest=args.largest,
+        follow_symlinks=args.follow_symlinks,
+        one_filesystem=args.one_file_system,
+        source=args.source
+    ):
+        results.append(result)
+        if result.error is not None:
+            print(f"{result.job.path}: {result.error}", file=sys.stderr)
+    for line in format_report(results, time.perf_counter() - start):
+        print(line)
+    return 1 if any(result.error is not None for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
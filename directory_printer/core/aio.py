@@ -0,0 +1,141 @@
+"""
+Asyncio versions of the traversal and printing generators
+
+The blocking generators of the core package are driven from an executor in
+batches, so the event loop only ever waits on an awaitable. Batches are
+fetched when the consumer asks for them, with one batch read ahead, so a
+slow consumer holds back the walk instead of letting entries pile up. A
+walk is stopped by cancelling the task that iterates it, or by closing the
+async generator, rather than through a progress callback.
+"""
+import asyncio
+import itertools
+import threading
+from concurrent.futures import Executor
+from typing import AsyncIterator, Iterator, List, Optional, TypeVar
+
+from directory_printer.core.git_index import SOURCE_WALK
+from directory_printer.core.printer import iter_entries, iter_structure
+from directory_printer.core.snapshot import SnapshotCache
+from directory_printer.core.traversal import TreeEntry
+
+# Entries or lines produced per executor call
+DEFAULT_BATCH_SIZE = 512
+
+T = TypeVar("T")
+
+
+async def iterate_in_executor(
+    iterator: Iterator[T],
+    executor: Optional[Executor] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> AsyncIterator[T]:
+    """
+    Drive a blocking iterator on an executor, yielding its items to the event loop
+
+    At most two batches are held at a time: the one being consumed and the
+    next one being read. When iteration stops early, through cancellation,
+    aclose() or an exception, the iterator is closed on the executor once its
+    current batch is done, so generators run their cleanup (e.g. shutting
+    down walk_tree's listing threads).
+
+    Args:
+        iterator: Blocking iterator, such as walk_tree or iter_structure
+        executor: Executor to run it on; None uses the loop's default executor.
+                  Pass a small ThreadPoolExecutor to bound how many walks run at once.
+        batch_size: Items read per executor call
+    """
+    loop = asyncio.get_running_loop()
+    # Held while the iterator runs, so closing it waits for a batch in progress
+    lock = threading.Lock()
+
+    def next_batch() -> List[T]:
+        with lock:
+            return list(itertools.islice(iterator, batch_size))
+
+    def close():
+        with lock:
+            close_iterator = getattr(iterator, "close", None)
+            if close_iterator is not None:
+                close_iterator()
+
+    pending = loop.run_in_executor(executor, next_batch)
+    try:
+        while True:
+            batch = await pending
+            if not batch:
+                pending = None
+                return
+            # Read ahead one batch while this one is consumed
+            pending = loop.run_in_executor(executor, next_batch)
+            for item in batch:
+                yield item
+    finally:
+        if pending is not None:
+            pending.cancel()  # Drops a read-ahead batch that has not started yet
+            loop.run_in_executor(executor, close)
+
+
+def walk_tree_async(
+    path: str,
+    gitignore_path: Optional[str] = None,
+    workers: int = 0,
+    cache: Optional[SnapshotCache] = None,
+    max_depth: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    nested_ignore: bool = False,
+    stats: bool = False,
+    follow_symlinks: bool = False,
+    one_filesystem: bool = False,
+    source: str = SOURCE_WALK,
+    executor: Optional[Executor] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> AsyncIterator[TreeEntry]:
+    """
+    Yield walk_tree entries, with the ignore rules and cache of iter_entries,
+    without blocking the loop
+
+    Arguments are those of iter_entries, plus the executor and batch size of
+    iterate_in_executor.
+    """
+    entries = iter_entries(
+        path, gitignore_path, workers=workers, cache=cache, max_depth=max_depth,
+        max_entries=max_entries, nested_ignore=nested_ignore, stats=stats,
+        follow_symlinks=follow_symlinks, one_filesystem=one_filesystem, source=source
+    )
+    return iterate_in_executor(entries, executor, batch_size)
+
+
+def iter_structure_async(
+    path: str,
+    gitignore_path: Optional[str] = None,
+    workers: int = 0,
+    cache: Optional[SnapshotCache] = None,
+    max_depth: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    nested_ignore: bool = False,
+    sizes: bool = False,
+    largest: int = 0,
+    follow_symlinks: bool = False,
+    one_filesystem: bool = False,
+    source: str = SOURCE_WALK,
+    executor: Optional[Executor] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> AsyncIterator[str]:
+    """
+    Yield the lines of iter_structure without blocking the loop
+
+    Ignore matching and formatting run on the executor along with the
+    directory listing, so the loop only receives finished lines.
+    """
+    lines = iter_structure(
+        path, gitignore_path=gitignore_path, workers=workers, cache=cache, max_depth=max_depth,
+        max_entries=max_entries, nested_ignore=nested_ignore, sizes=sizes, largest=largest,
+        follow_symlinks=follow_symlinks, one_filesystem=one_filesystem, source=source
+    )
+    return iterate_in_executor(lines, executor, batch_size)
+
+
+async def print_structure_async(path: str, **kwargs) -> List[str]:
+    """Collect the lines of iter_structure_async; keyword arguments are passed through"""
+    return [line async for line in iter_structure_async(path, **kwargs)]
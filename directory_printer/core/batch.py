@@ -0,0 +1,221 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from directory_printer.core.export import WRITERS, export_structure
+from directory_printer.core.git_index import SOURCE_WALK
+from directory_printer.core.printer import iter_paths, iter_structure
+
+# File extension of each output format
+OUTPUT_EXTENSIONS = {
+    "tree": ".txt", "paths": ".txt", "json": ".json", "ndjson": ".ndjson", "csv": ".csv"
+}
+
+
+class BatchJob(NamedTuple):
+    """One root to generate, with its own ignore file and output file"""
+    path: str
+    output_file: str
+    gitignore_path: Optional[str] = None
+
+
+class BatchResult(NamedTuple):
+    """
+    Outcome of one BatchJob
+
+    `entries` counts the lines or records written and `seconds` the time spent
+    in the worker process. On failure `error` holds the message and no output
+    file is written.
+    """
+    job: BatchJob
+    entries: int
+    seconds: float
+    error: Optional[str] = None
+
+
+def read_manifest(manifest_path: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Read a batch manifest: one root per line, optionally followed by a tab and its ignore file
+
+    Blank lines and lines starting with '#' are skipped. Relative paths are
+    resolved against the manifest's directory.
+    """
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    roots = []
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            root, _, gitignore_path = line.partition("\t")
+            gitignore_path = gitignore_path.strip()
+            roots.append((
+                os.path.join(base, root.strip()),
+                os.path.join(base, gitignore_path) if gitignore_path else None,
+            ))
+    return roots
+
+
+def plan_jobs(
+    roots: Iterable[Tuple[str, Optional[str]]],
+    output_dir: str,
+    output_format: str = "tree"
+) -> List[BatchJob]:
+    """Name one output file per root after the root's directory name, numbering repeated names"""
+    extension = OUTPUT_EXTENSIONS[output_format]
+    taken = set()
+    jobs = []
+    for path, gitignore_path in roots:
+        stem = os.path.basename(os.path.normpath(os.path.abspath(path))) or "root"
+        name, number = stem, 1
+        while name.lower() in taken:  # Case-insensitive, for Windows and macOS file systems
+            number += 1
+            name = f"{stem}-{number}"
+        taken.add(name.lower())
+        jobs.append(BatchJob(path, os.path.join(output_dir, name + extension), gitignore_path))
+    return jobs
+
+
+def generate_job(
+    job: BatchJob,
+    output_format: str = "tree",
+    max_depth: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    nested_ignore: bool = False,
+    sizes: bool = False,
+    largest: int = 0,
+    follow_symlinks: bool = False,
+    one_filesystem: bool = False,
+    source: str = SOURCE_WALK
+) -> BatchResult:
+    """Write one root's structure to its output file; runs in a worker process"""
+    start = time.perf_counter()
+    try:
+        if not os.path.isdir(job.path):
+            raise FileNotFoundError(f"Directory '{job.path}' not found")
+        if output_format in WRITERS:
+            count = export_structure(
+                job.path, job.output_file, output_format, gitignore_path=job.gitignore_path,
+                max_depth=max_depth, max_entries=max_entries, nested_ignore=nested_ignore,
+                follow_symlinks=follow_symlinks, one_filesystem=one_filesystem, source=source
+            )
+        else:
+            if output_format == "paths":
+                lines = iter_paths(
+                    job.path, gitignore_path=job.gitignore_path, max_depth=max_depth,
+                    max_entries=max_entries, nested_ignore=nested_ignore,
+                    follow_symlinks=follow_symlinks, one_filesystem=one_filesystem, source=source
+                )
+            else:
+                lines = iter_structure(
+                    job.path, gitignore_path=job.gitignore_path, max_depth=max_depth,
+                    max_entries=max_entries, nested_ignore=nested_ignore, sizes=sizes,
+                    largest=largest, follow_symlinks=follow_symlinks,
+                    one_filesystem=one_filesystem, source=source
+                )
+            count = _write_lines(job, lines, header=job.path if output_format == "tree" else None)
+    except Exception as e:
+        return BatchResult(job, 0, time.perf_counter() - start, str(e))
+    return BatchResult(job, count, time.perf_counter() - start)
+
+
+def _write_lines(job: BatchJob, lines: Iterable[str], header: Optional[str] = None) -> int:
+    """Write lines under a temporary name, moving the file into place once complete"""
+    temp_file = f"{job.output_file}.tmp"
+    count = 0
+    try:
+        with open(temp_file, "w", encoding="utf-8") as output:
+            if header is not None:
+                output.write(header + "\n")
+            for line in lines:
+                output.write(line + "\n")
+                count += 1
+        os.replace(temp_file, job.output_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+    return count
+
+
+def run_batch(
+    jobs: Iterable[BatchJob],
+    processes: Optional[int] = None,
+    output_format: str = "tree",
+    max_depth: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    nested_ignore: bool = False,
+    sizes: bool = False,
+    largest: int = 0,
+    follow_symlinks: bool = False,
+    one_filesystem: bool = False,
+    source: str = SOURCE_WALK
+) -> Iterator[BatchResult]:
+    """
+    Generate many roots in parallel, each in its own process, yielding results as they finish
+
+    Ignore matching and formatting are CPU bound, so separate processes use
+    separate cores where threads would share one. At most `processes` roots
+    are generated at a time (default: one per CPU). A root that fails is
+    reported in its result and does not stop the others.
+
+    Args:
+        jobs: Roots to generate, with their ignore and output files
+        processes: Number of worker processes; 1 generates every root in this process
+        output_format: "tree", "paths", "json", "ndjson" or "csv"
+        max_depth: Deepest level to generate for every root
+        max_entries: Stop each root after this many entries
+        nested_ignore: Also apply .gitignore files found in the walked directories
+        sizes: With the tree format, annotate sizes and directory totals
+        largest: With sizes, also list this many of the largest directories
+        follow_symlinks: Descend into symlinked directories
+        one_filesystem: Do not descend into other filesystems than each root's
+        source: "walk", or "git"/"git-untracked" to read the git index of each root that
+                is a checkout
+    """
+    if output_format not in OUTPUT_EXTENSIONS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    jobs = list(jobs)
+    generate = partial(
+        generate_job, output_format=output_format, max_depth=max_depth, max_entries=max_entries,
+        nested_ignore=nested_ignore, sizes=sizes, largest=largest,
+        follow_symlinks=follow_symlinks, one_filesystem=one_filesystem, source=source
+    )
+    processes = min(processes or os.cpu_count() or 1, len(jobs))
+    if processes <= 1:
+        yield from map(generate, jobs)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(generate, job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def format_report(
+    results: Iterable[BatchResult], wall_seconds: Optional[float] = None
+) -> List[str]:
+    """Per-root timing lines, slowest first, with a total line"""
+    results = sorted(results, key=lambda result: result.seconds, reverse=True)
+    lines = [f"{'seconds':>9}  {'entries':>9}  {'entries/s':>10}  root"]
+    for result in results:
+        if result.error is not None:
+            lines.append(
+                f"{result.seconds:9.2f}  {'-':>9}  {'-':>10}  {result.job.path}  "
+                f"(failed: {result.error})"
+            )
+            continue
+        rate = result.entries / result.seconds if result.seconds else 0
+        lines.append(
+            f"{result.seconds:9.2f}  {result.entries:9d}  {rate:10,.0f}  "
+            f"{result.job.path} -> {result.job.output_file}"
+        )
+    failed = sum(1 for result in results if result.error is not None)
+    total = f"{len(results)} roots, {sum(result.entries for result in results)} entries"
+    if failed:
+        total += f", {failed} failed"
+    if wall_seconds is not None:
+        total += f" in {wall_seconds:.2f} s"
+    lines.append(total)
+    return lines
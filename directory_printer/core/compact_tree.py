@@ -0,0 +1,364 @@
+import bisect
+import os
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+from directory_printer.core.traversal import (
+    ALREADY_LISTED, NOT_FOUND, OTHER_FILESYSTEM, PERMISSION_DENIED, PLACEHOLDERS, TRUNCATED,
+    TreeEntry, display_name
+)
+
+# Error kinds by their code in the low bits of the flags column; 0 is a regular entry
+ERROR_KINDS = (None, PERMISSION_DENIED, NOT_FOUND, TRUNCATED, ALREADY_LISTED, OTHER_FILESYSTEM)
+_ERROR_CODES = {kind: code for code, kind in enumerate(ERROR_KINDS)}
+ERROR_MASK = 0x0F
+IS_DIR = 0x10
+IS_LAST = 0x20
+
+# Appended to the line of a collapsed directory
+COLLAPSED_MARKER = "  [+]"
+
+
+class CompactTree:
+    """
+    A walked directory tree stored as parallel columns, one row per entry in display order
+
+    Names are interned, so repeated names such as `__init__.py` are stored
+    once. Parents, depths, flags and subtree ends live in `array` columns,
+    sizes and mtimes only when the walk collected stats, and symlink targets
+    in a dict keyed by row, since few entries have one. Nothing is
+    rendered up front: lines are built on demand from the parent chain, so
+    the tree can be re-rendered, exported or searched without walking the
+    disk again.
+
+    Rows are appended by one thread while others read them; readers must only
+    look at rows below `count`, which is advanced after a row is complete.
+    Subtree ends (and so collapsing) are only valid once `complete` is set.
+    """
+
+    def __init__(self, path: str, stats: bool = False):
+        self.path = path
+        self.names: List[str] = []
+        self.parents = array('i')  # Row of the parent directory, -1 below the root
+        self.depths = array('H')
+        self.flags = array('B')
+        self.ends = array('i')  # Row after the last row of each entry's subtree
+        self.sizes = array('q') if stats else None
+        self.mtimes = array('d') if stats else None
+        self.omitted: Dict[int, int] = {}  # Counts of TRUNCATED rows
+        self.links: Dict[int, str] = {}  # Targets of symbolic links
+        self.count = 0
+        self.complete = False
+        self._open: List[int] = []  # Directories whose subtree is still being added
+
+    @classmethod
+    def from_entries(
+        cls, path: str, entries: Iterable[TreeEntry], stats: bool = False
+    ) -> "CompactTree":
+        """Fill a new tree from walk_tree entries"""
+        tree = cls(path, stats)
+        for entry in entries:
+            tree.add(entry)
+        tree.finish()
+        return tree
+
+    def add(self, entry: TreeEntry) -> int:
+        """Append the next walk_tree entry, returning its row"""
+        row = len(self.names)
+        depths = self.depths
+        while self._open and depths[self._open[-1]] >= entry.depth:
+            self.ends[self._open.pop()] = row
+
+        self.names.append(sys.intern(entry.name))
+        self.parents.append(self._open[-1] if self._open else -1)
+        depths.append(entry.depth)
+        self.flags.append(
+            _ERROR_CODES[entry.error]
+            | (IS_DIR if entry.is_dir else 0)
+            | (IS_LAST if entry.is_last else 0)
+        )
+        self.ends.append(row + 1)
+        if self.sizes is not None:
+            self.sizes.append(entry.size)
+            self.mtimes.append(entry.mtime)
+        if entry.link is not None:
+            self.links[row] = entry.link
+        if entry.error == TRUNCATED:
+            self.omitted[row] = entry.omitted
+        elif entry.is_dir and entry.error is None:
+            self._open.append(row)
+        self.count = row + 1
+        return row
+
+    def finish(self):
+        """Close the remaining directories once the walk is over"""
+        for row in self._open:
+            self.ends[row] = len(self.names)
+        self._open = []
+        self.complete = True
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, row: int) -> "TreeNodeView":
+        if not 0 <= row < self.count:
+            raise IndexError(row)
+        return TreeNodeView(self, row)
+
+    def __iter__(self) -> Iterator["TreeNodeView"]:
+        return (TreeNodeView(self, row) for row in range(self.count))
+
+    def error(self, row: int) -> Optional[str]:
+        return ERROR_KINDS[self.flags[row] & ERROR_MASK]
+
+    def is_dir(self, row: int) -> bool:
+        return bool(self.flags[row] & IS_DIR)
+
+    def rel_path(self, row: int) -> str:
+        """Path relative to the root; for placeholder rows, that of their directory"""
+        parts = [self.names[row]] if self.names[row] else []
+        parent = self.parents[row]
+        while parent >= 0:
+            parts.append(self.names[parent])
+            parent = self.parents[parent]
+        return "/".join(reversed(parts))
+
+    def full_path(self, row: int) -> str:
+        rel_path = self.rel_path(row)
+        return os.path.join(self.path, *rel_path.split('/')) if rel_path else self.path
+
+    def children(self, row: int) -> Iterator[int]:
+        """Rows of the direct children of a directory row (-1 for the root)"""
+        child = row + 1
+        end = self.ends[row] if row >= 0 else self.count
+        while child < end:
+            yield child
+            child = self.ends[child]
+
+    def entry(self, row: int) -> TreeEntry:
+        """Rebuild the walk_tree entry of a row"""
+        flags = self.flags[row]
+        error = ERROR_KINDS[flags & ERROR_MASK]
+        return TreeEntry(
+            self.names[row],
+            self.full_path(row),
+            self.rel_path(row),
+            self.depths[row],
+            bool(flags & IS_DIR),
+            bool(flags & IS_LAST),
+            error,
+            self.omitted.get(row, 0),
+            self.sizes[row] if self.sizes is not None else 0,
+            self.mtimes[row] if self.mtimes is not None else 0.0,
+            self.links.get(row),
+        )
+
+    def entries(self) -> Iterator[TreeEntry]:
+        """All rows as walk_tree entries, for format_tree, exports and size summaries"""
+        # Paths are built from the parent's instead of walking the chain for every row
+        paths: Dict[int, tuple] = {-1: (self.path, "")}
+        for row in range(self.count):
+            flags = self.flags[row]
+            error = ERROR_KINDS[flags & ERROR_MASK]
+            parent_path, parent_rel = paths[self.parents[row]]
+            name = self.names[row]
+            if error is None:
+                path = os.path.join(parent_path, name)
+                rel_path = f"{parent_rel}/{name}" if parent_rel else name
+                if flags & IS_DIR:
+                    paths[row] = (path, rel_path)
+            else:
+                path, rel_path = parent_path, parent_rel
+            yield TreeEntry(
+                name, path, rel_path, self.depths[row], bool(flags & IS_DIR), bool(flags & IS_LAST),
+                error, self.omitted.get(row, 0),
+                self.sizes[row] if self.sizes is not None else 0,
+                self.mtimes[row] if self.mtimes is not None else 0.0,
+                self.links.get(row),
+            )
+
+    def lines(self, prefix: str = "") -> Iterator[str]:
+        """Render every row, as format_tree would, straight from the columns"""
+        names, depths, flags, links = self.names, self.depths, self.flags, self.links
+        # Full line prefix for each depth, built once per directory
+        prefixes = [prefix]
+        for row in range(self.count):
+            del prefixes[depths[row]:]
+            row_flags = flags[row]
+            error = ERROR_KINDS[row_flags & ERROR_MASK]
+            if error == NOT_FOUND:
+                yield f"Error: Directory '{self.full_path(row)}' not found!"
+                continue
+            current_prefix = prefixes[-1]
+            name = names[row] if row not in links else display_name(names[row], links[row])
+            if error == TRUNCATED:
+                yield f"{current_prefix}└── … {self.omitted[row]} more"
+            elif error is not None:
+                yield f"{current_prefix}{PLACEHOLDERS[error]}"
+            elif row_flags & IS_LAST:
+                yield f"{current_prefix}└── {name}"
+                if row_flags & IS_DIR:
+                    prefixes.append(current_prefix + "    ")
+            else:
+                yield f"{current_prefix}├── {name}"
+                if row_flags & IS_DIR:
+                    prefixes.append(current_prefix + "│   ")
+
+    def line(self, row: int, prefix: str = "") -> str:
+        """Render a single row from its ancestors, without rendering the rows before it"""
+        flags = self.flags[row]
+        error = ERROR_KINDS[flags & ERROR_MASK]
+        if error == NOT_FOUND:
+            return f"Error: Directory '{self.full_path(row)}' not found!"
+        segments = []
+        parent = self.parents[row]
+        while parent >= 0:
+            segments.append("    " if self.flags[parent] & IS_LAST else "│   ")
+            parent = self.parents[parent]
+        segments.append(prefix)
+        line_prefix = "".join(reversed(segments))
+        if error == TRUNCATED:
+            return f"{line_prefix}└── … {self.omitted[row]} more"
+        if error is not None:
+            return f"{line_prefix}{PLACEHOLDERS[error]}"
+        name = display_name(self.names[row], self.links.get(row))
+        return f"{line_prefix}{'└── ' if flags & IS_LAST else '├── '}{name}"
+
+
+class TreeNodeView:
+    """A lightweight handle on one row of a CompactTree"""
+
+    __slots__ = ("tree", "row")
+
+    def __init__(self, tree: CompactTree, row: int):
+        self.tree = tree
+        self.row = row
+
+    @property
+    def name(self) -> str:
+        return self.tree.names[self.row]
+
+    @property
+    def depth(self) -> int:
+        return self.tree.depths[self.row]
+
+    @property
+    def is_dir(self) -> bool:
+        return self.tree.is_dir(self.row)
+
+    @property
+    def is_last(self) -> bool:
+        return bool(self.tree.flags[self.row] & IS_LAST)
+
+    @property
+    def error(self) -> Optional[str]:
+        return self.tree.error(self.row)
+
+    @property
+    def size(self) -> int:
+        return self.tree.sizes[self.row] if self.tree.sizes is not None else 0
+
+    @property
+    def mtime(self) -> float:
+        return self.tree.mtimes[self.row] if self.tree.mtimes is not None else 0.0
+
+    @property
+    def rel_path(self) -> str:
+        return self.tree.rel_path(self.row)
+
+    @property
+    def path(self) -> str:
+        return self.tree.full_path(self.row)
+
+    @property
+    def parent(self) -> Optional["TreeNodeView"]:
+        parent = self.tree.parents[self.row]
+        return TreeNodeView(self.tree, parent) if parent >= 0 else None
+
+    @property
+    def children(self) -> List["TreeNodeView"]:
+        return [TreeNodeView(self.tree, row) for row in self.tree.children(self.row)]
+
+    def __repr__(self) -> str:
+        return f"TreeNodeView({self.rel_path!r})"
+
+
+class TreeLines(Sequence):
+    """
+    The visible lines of a CompactTree, rendered only when read
+
+    Header lines (such as the root path) come first. Directories can be
+    collapsed and expanded once the tree is complete; the visible rows are
+    then kept in an array, and until then every row added so far is visible.
+    """
+
+    def __init__(self, tree: CompactTree, header: Iterable[str] = (), prefix: str = ""):
+        self.tree = tree
+        self.header = list(header)
+        self.prefix = prefix
+        self.collapsed: Set[int] = set()
+        self._rows: Optional[array] = None  # Visible rows, once something has been collapsed
+
+    def __len__(self) -> int:
+        rows = len(self._rows) if self._rows is not None else self.tree.count
+        return len(self.header) + rows
+
+    def row(self, index: int) -> Optional[int]:
+        """Tree row shown at a line index, or None for header lines"""
+        index -= len(self.header)
+        if index < 0:
+            return None
+        return self._rows[index] if self._rows is not None else index
+
+    def _line(self, index: int) -> str:
+        row = self.row(index)
+        if row is None:
+            return self.header[index]
+        line = self.tree.line(row, self.prefix)
+        return line + COLLAPSED_MARKER if row in self.collapsed else line
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._line(index) for index in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError(key)
+        return self._line(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.header
+        if self._rows is None:
+            # Nothing is collapsed; rendering in order shares each directory's prefix with its
+            # children
+            yield from self.tree.lines(self.prefix)
+        else:
+            for index in range(len(self.header), len(self)):
+                yield self._line(index)
+
+    def toggle(self, row: int) -> bool:
+        """Collapse or expand a directory row; returns False if it cannot be toggled"""
+        tree = self.tree
+        if not tree.complete or not tree.is_dir(row) or tree.error(row) is not None:
+            return False
+        if tree.ends[row] == row + 1:
+            return False
+        if self._rows is None:
+            self._rows = array('i', range(tree.count))
+        rows = self._rows
+        position = bisect.bisect_left(rows, row)
+        if rows[position] != row:
+            return False  # Hidden inside a collapsed ancestor
+        if row in self.collapsed:
+            self.collapsed.discard(row)
+            shown = array('i')
+            child = row + 1
+            while child < tree.ends[row]:
+                shown.append(child)
+                child = tree.ends[child] if child in self.collapsed else child + 1
+            rows[position + 1:position + 1] = shown
+        else:
+            self.collapsed.add(row)
+            del rows[position + 1:bisect.bisect_left(rows, tree.ends[row], position + 1)]
+        return True
@@ -1,14 +1,48 @@
 import json
 import os
 import shutil
+import threading
+import time
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
+# Number of directories remembered, most recently used first; each keeps its own settings
+# and last run
+MAX_RECENT_FILES = 50
+
+# Changes are written once no other change has been made for this long
+SAVE_DELAY_SECONDS = 0.5
+
+# How long to wait for the recent directories to answer an existence check;
+# a path on an unreachable network mount may not answer at all
+PATH_CHECK_TIMEOUT_SECONDS = 2.0
+
+
 class Configuration:
-    def __init__(self):
+    """
+    Application settings and per-directory profiles, stored in
+    ~/.directory_printer/configuration.json
+
+    Setters only update memory and schedule a write: changes made in quick
+    succession are coalesced into one write, SAVE_DELAY_SECONDS after the
+    last of them, from a background thread. The file is written under a
+    temporary name and renamed into place, so it is never left half written.
+    Call flush() before exiting to write pending changes immediately.
+
+    Recent directories are not checked when loading; check_recent_files()
+    drops the ones that no longer exist, without waiting on paths that do
+    not answer.
+    """
+
+    def __init__(self, save_delay: float = SAVE_DELAY_SECONDS):
         self.config_dir = os.path.join(str(Path.home()), '.directory_printer')
         self.config_file = os.path.join(self.config_dir, 'configuration.json')
+        self.save_delay = save_delay
+        # Guards the configuration, which the save timer and path checks read from other threads
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
         self.config = self._load_configuration()
 
     def _create_backup(self):
@@ -32,9 +66,8 @@ class Configuration:
             try:
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     config = json.load(f)
-                # Validate and clean recent files
-                if 'recent_files' in config:
-                    config['recent_files'] = self._validate_recent_files(config['recent_files'])
+                if not isinstance(config.get('recent_files', []), list):
+                    raise ValueError("Invalid recent files")
                 # Add timestamps if they don't exist
                 if 'created_at' not in config:
                     config['created_at'] = datetime.now().isoformat()
@@ -48,14 +81,38 @@ class Configuration:
                 return self._get_default_configuration()
         return self._get_default_configuration()
 
-    def _validate_recent_files(self, recent_files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Validate recent files and remove entries with non-existent paths"""
-        valid_entries = []
-        for entry in recent_files:
-            path = entry.get('path', '')
-            if os.path.exists(path):
-                valid_entries.append(entry)
-        return valid_entries
+    def check_recent_files(self, timeout: float = PATH_CHECK_TIMEOUT_SECONDS) -> List[str]:
+        """
+        Remove recent directories that no longer exist, returning their paths
+
+        Each path is checked on its own daemon thread, and paths that have not
+        answered within `timeout` seconds are kept, so a stale network mount
+        costs at most the timeout and never blocks exiting. Blocks while
+        checking; the GUI runs it in the background after startup.
+        """
+        with self._lock:
+            paths = [entry.get('directory_path', '') for entry in self.get_recent_files()]
+        exists: Dict[str, bool] = {}
+
+        def check(path: str):
+            exists[path] = os.path.exists(path)
+
+        threads = [threading.Thread(target=check, args=(path,), daemon=True) for path in set(paths)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+        missing = {path for path, found in list(exists.items()) if not found}
+        if missing:
+            with self._lock:
+                self.config['recent_files'] = [
+                    entry for entry in self.get_recent_files()
+                    if entry.get('directory_path', '') not in missing
+                ]
+                self._save_configuration()
+        return sorted(missing)
 
     def _get_default_configuration(self) -> dict:
         """Get default configuration"""
@@ -68,11 +125,36 @@ class Configuration:
         }
 
     def _save_configuration(self):
-        """Save configuration to file"""
-        # Update the updated_at timestamp
-        self.config['updated_at'] = datetime.now().isoformat()
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(self.config, f, indent=2)
+        """Schedule a write of the configuration, restarting the delay if one is already pending"""
+        with self._lock:
+            self.config['updated_at'] = datetime.now().isoformat()
+            self._dirty = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write pending changes now, atomically"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            data = json.dumps(self.config, indent=2)
+            self._dirty = False
+            os.makedirs(self.config_dir, exist_ok=True)
+            temp_file = f"{self.config_file}.tmp"
+            try:
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(temp_file, self.config_file)
+            except OSError:
+                self._dirty = True  # Retried on the next change or flush
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
 
     def get_language(self) -> str:
         """Get current language"""
@@ -80,8 +162,9 @@ class Configuration:
 
     def set_language(self, language: str):
         """Set current language"""
-        self.config['language'] = language
-        self._save_configuration()
+        with self._lock:
+            self.config['language'] = language
+            self._save_configuration()
 
     def get_recent_files(self) -> List[Dict[str, Any]]:
         """Get list of recent files with their configurations"""
@@ -89,38 +172,70 @@ class Configuration:
 
     def set_recent_files(self, recent_files: List[Dict[str, Any]]):
         """Set the list of recent files and save to disk"""
-        self.config['recent_files'] = recent_files
-        self._save_configuration()
+        with self._lock:
+            self.config['recent_files'] = recent_files
+            self._save_configuration()
+
+    def get_profile(self, directory_path: str) -> Optional[Dict[str, Any]]:
+        """
+        The recent files entry of a directory: its config, and its last run if
+        one was recorded
+        """
+        for entry in self.get_recent_files():
+            if entry.get('directory_path') == directory_path:
+                return entry
+        return None
 
     def add_recent_file(self, directory_path: str, config: Optional[Dict[str, Any]] = None):
         """
         Add a directory with its configuration to recent files list
-        
+
+        A directory already in the list moves to the front with the new
+        configuration, keeping its last run.
+
         Args:
             directory_path: Path to the directory
             config: Dictionary containing configuration (e.g., ignore_file path)
         """
         if config is None:
             config = {}
-            
-        recent_files = self.get_recent_files()
-        entry = {
-            'directory_path': directory_path,
-            'config': config,
-            'created_at': datetime.now().isoformat()
-        }
-        
-        # Remove if path already exists
-        recent_files = [f for f in recent_files if f.get('directory_path') != directory_path]
-        
-        # Add to front of list
-        recent_files.insert(0, entry)
-        
-        # Keep only last 5
-        self.config['recent_files'] = recent_files[:5]
-        self._save_configuration()
+
+        with self._lock:
+            recent_files = self.get_recent_files()
+            previous = self.get_profile(directory_path) or {}
+            entry = dict(previous)
+            entry.update({
+                'directory_path': directory_path,
+                'config': config,
+                'created_at': previous.get('created_at', datetime.now().isoformat()),
+                'last_used': datetime.now().isoformat()
+            })
+
+            # Remove if path already exists
+            recent_files = [f for f in recent_files if f.get('directory_path') != directory_path]
+
+            # Add to front of list
+            recent_files.insert(0, entry)
+
+            self.config['recent_files'] = recent_files[:MAX_RECENT_FILES]
+            self._save_configuration()
+
+    def record_run(self, directory_path: str, config: Dict[str, Any], stats: Dict[str, Any]):
+        """
+        Remember the settings and outcome of a generation for a directory
+
+        Args:
+            directory_path: Path to the directory
+            config: Settings the structure was generated with (e.g., ignore_file, nested_ignore)
+            stats: Outcome of the run (e.g., entries, seconds)
+        """
+        with self._lock:
+            self.add_recent_file(directory_path, config)
+            last_run = dict(stats, finished_at=datetime.now().isoformat())
+            self.config['recent_files'][0]['last_run'] = last_run
 
     def clear_recent_files(self):
         """Clear recent files list"""
-        self.config['recent_files'] = []
-        self._save_configuration() 
\ No newline at end of file
+        with self._lock:
+            self.config['recent_files'] = []
+            self._save_configuration()
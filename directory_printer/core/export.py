@@ -0,0 +1,276 @@
+import csv
+import json
+import os
+from json.encoder import encode_basestring
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+from directory_printer.core.git_index import SOURCE_WALK, walk_source
+from directory_printer.core.ignore import load_ignore
+from directory_printer.core.traversal import TreeEntry
+
+if TYPE_CHECKING:
+    # Only plain walks are exported from the CLI, which does not load the tree columns
+    from directory_printer.core.compact_tree import CompactTree
+
+# Structured formats, by the file extension they are saved with
+EXPORT_FORMATS = {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}
+
+# Columns of every exported record
+FIELDS = ("path", "depth", "type", "size", "mtime", "target")
+
+# A record holds the FIELDS values in order; the target is only set for symbolic links
+Record = Tuple[str, int, str, Optional[int], float, Optional[str]]
+
+# Bytes buffered before each write to the export file
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def iter_records(entries: Iterable[TreeEntry]) -> Iterator[Record]:
+    """
+    Turn walk_tree entries into export records
+
+    Paths are relative to the root with '/' separators. Directories have no
+    size. Symbolic links that were not followed have the type "symlink", the
+    size of the link itself and the path they point to as their target.
+    Placeholders for unreadable, repeated or
+    skipped directories and cut-off entries are skipped.
+    """
+    for entry in entries:
+        if entry.error is not None:
+            continue
+        if entry.is_dir:
+            yield entry.rel_path, entry.depth, "directory", None, entry.mtime, None
+        elif entry.link is not None:
+            yield entry.rel_path, entry.depth, "symlink", entry.size, entry.mtime, entry.link
+        else:
+            yield entry.rel_path, entry.depth, "file", entry.size, entry.mtime, None
+
+
+def _json_object(record: Record) -> str:
+    """Encode a record as a JSON object, without the overhead of json.dumps"""
+    path, depth, kind, size, mtime, target = record
+    return '{"path": %s, "depth": %d, "type": "%s", "size": %s, "mtime": %r, "target": %s}' % (
+        encode_basestring(path), depth, kind, "null" if size is None else size, mtime,
+        "null" if target is None else encode_basestring(target)
+    )
+
+
+def write_json(records: Iterable[Record], output: TextIO, root: str = "") -> int:
+    """Write one JSON document, {"root": ..., "entries": [...]}, one record at a time"""
+    count = 0
+    output.write('{"root": %s, "entries": [' % json.dumps(root, ensure_ascii=False))
+    for record in records:
+        output.write(",\n  " if count else "\n  ")
+        output.write(_json_object(record))
+        count += 1
+    output.write("\n]}\n" if count else "]}\n")
+    return count
+
+
+def write_ndjson(records: Iterable[Record], output: TextIO, root: str = "") -> int:
+    """Write one JSON object per line"""
+    count = 0
+    for record in records:
+        output.write(_json_object(record) + "\n")
+        count += 1
+    return count
+
+
+def write_csv(records: Iterable[Record], output: TextIO, root: str = "") -> int:
+    """
+    Write a header row followed by one row per record; directories have an
+    empty size, and entries other than symbolic links an empty target
+    """
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(FIELDS)
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+WRITERS: Dict[str, Callable[[Iterable[Record], TextIO, str], int]] = {
+    "json": write_json,
+    "ndjson": write_ndjson,
+    "csv": write_csv,
+}
+
+
+def _record(values: Dict) -> Record:
+    size = values["size"]
+    target = values.get("target")  # Not in exports written before targets were recorded
+    return (
+        values["path"], int(values["depth"]), values["type"],
+        None if size is None or size == "" else int(size), float(values["mtime"]),
+        target or None
+    )
+
+
+def _file_format(file_name: str, export_format: Optional[str]) -> str:
+    """
+    The given export format, or the one of the file extension; raises
+    ValueError if unsupported
+    """
+    if export_format is None:
+        export_format = EXPORT_FORMATS.get(os.path.splitext(file_name)[1].lower())
+    if export_format not in WRITERS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    return export_format
+
+
+def _write_file(
+    records: Iterable[Record],
+    output_file: str,
+    export_format: str,
+    root: str,
+    stopped: Callable[[], bool]
+) -> Optional[int]:
+    """
+    Write records under a temporary name, moving the file into place unless
+    stopped() is set by then
+    """
+    temp_file = f"{output_file}.tmp"
+    try:
+        with open(
+            temp_file, "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER_SIZE
+        ) as output:
+            count = WRITERS[export_format](records, output, root)
+        if stopped():
+            return None
+        os.replace(temp_file, output_file)
+        return count
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def read_records(input_file: str, export_format: Optional[str] = None) -> Iterator[Record]:
+    """
+    Read the records of a JSON, NDJSON or CSV export back, in the order they were written
+
+    The format is taken from the file extension if omitted. NDJSON and CSV
+    files are read one record at a time; a JSON document is loaded whole.
+    """
+    export_format = _file_format(input_file, export_format)
+    with open(input_file, "r", encoding="utf-8", newline="") as f:
+        if export_format == "json":
+            for values in json.load(f)["entries"]:
+                yield _record(values)
+        elif export_format == "ndjson":
+            for line in f:
+                if line.strip():
+                    yield _record(json.loads(line))
+        else:
+            for values in csv.DictReader(f):
+                yield _record(values)
+
+
+def export_structure(
+    path: str,
+    output_file: str,
+    export_format: Optional[str] = None,
+    gitignore_path: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, int], bool]] = None,
+    workers: int = 0,
+    max_depth: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    nested_ignore: bool = False,
+    follow_symlinks: bool = False,
+    one_filesystem: bool = False,
+    source: str = SOURCE_WALK
+) -> Optional[int]:
+    """
+    Walk a directory and stream its entries to a JSON, NDJSON or CSV file
+
+    Records are written as the tree is walked, so memory use does not grow
+    with the number of entries. The file is written under a temporary name
+    and only moved into place once the walk completes.
+
+    Args:
+        path: Directory to export
+        output_file: File to write
+        export_format: "json", "ndjson" or "csv"; taken from the file extension if omitted
+        gitignore_path: Path to .gitignore file
+        progress_callback: Callback function(current, total) -> bool for progress updates
+                         Returns False to stop; the output file is then not written.
+        workers: Number of threads prefetching directory listings (0 disables)
+        max_depth: Deepest level to export; deeper directories are not listed
+        max_entries: Stop after this many entries
+        nested_ignore: Also apply .gitignore files found in the walked directories
+        follow_symlinks: Walk into symbolic links to directories, listing each directory once
+        one_filesystem: Do not walk into directories on other filesystems
+        source: "walk", "git" or "git-untracked"; see walk_source
+
+    Returns:
+        The number of records written, or None if the export was stopped
+    """
+    export_format = _file_format(output_file, export_format)
+    stopped = False
+
+    def _progress(current: int, total: int) -> bool:
+        nonlocal stopped
+        if not progress_callback(current, total):
+            stopped = True
+        return not stopped
+
+    matcher = load_ignore(path, gitignore_path, nested=nested_ignore)
+    entries = walk_source(
+        path, source, ignore=matcher, progress_callback=_progress if progress_callback else None,
+        workers=workers, max_depth=max_depth, max_entries=max_entries, stats=True,
+        follow_symlinks=follow_symlinks, one_filesystem=one_filesystem
+    )
+    return _write_file(iter_records(entries), output_file, export_format, path, lambda: stopped)
+
+
+def _with_stats(entry: TreeEntry) -> TreeEntry:
+    """Fill in the size and mtime of an entry from its path, not following symbolic links"""
+    if entry.error is not None:
+        return entry
+    try:
+        st = os.lstat(entry.path)
+    except OSError:
+        return entry
+    return entry._replace(size=0 if entry.is_dir else st.st_size, mtime=st.st_mtime)
+
+
+def export_tree(
+    tree: "CompactTree",
+    output_file: str,
+    export_format: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, int], bool]] = None
+) -> Optional[int]:
+    """
+    Write the rows of an already walked tree to a JSON, NDJSON or CSV file
+
+    The records are exactly the tree's rows, whatever limits and ignore
+    rules it was walked with, and no directory is listed again. Sizes and
+    mtimes come from the tree when it was walked with stats; otherwise each
+    row's path is stat'ed as it is written.
+
+    Args:
+        tree: A complete CompactTree
+        output_file: File to write
+        export_format: "json", "ndjson" or "csv"; taken from the file extension if omitted
+        progress_callback: Callback function(current, total) -> bool called per row;
+                         returning False stops, and the output file is then not written
+
+    Returns:
+        The number of records written, or None if the export was stopped
+    """
+    export_format = _file_format(output_file, export_format)
+    stopped = False
+    total = len(tree)
+
+    def _entries() -> Iterator[TreeEntry]:
+        nonlocal stopped
+        entries = tree.entries() if tree.sizes is not None else map(_with_stats, tree.entries())
+        for current, entry in enumerate(entries, 1):
+            yield entry
+            if progress_callback and not progress_callback(current, total):
+                stopped = True
+                return
+
+    return _write_file(
+        iter_records(_entries()), output_file, export_format, tree.path, lambda: stopped
+    )
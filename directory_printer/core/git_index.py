@@ -0,0 +1,328 @@
+"""
+Tree entries from a git checkout's index instead of a directory walk
+
+The binary .git/index file lists every tracked path, so reading it once
+replaces listing every directory. It is parsed directly: no git process is
+started. Only the root's own checkout is used; when the root has no .git,
+or its index cannot be read, the directory is walked as usual.
+"""
+import os
+import re
+import struct
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from directory_printer.core.ignore import load_ignore
+from directory_printer.core.traversal import NO_STATS, TRUNCATED, TreeEntry, walk_tree
+
+# Where the entries of a walk come from: the directory itself, the paths tracked
+# in the git index, or the tracked paths plus untracked files that are not ignored
+SOURCE_WALK = "walk"
+SOURCE_GIT = "git"
+SOURCE_GIT_UNTRACKED = "git-untracked"
+SOURCES = (SOURCE_WALK, SOURCE_GIT, SOURCE_GIT_UNTRACKED)
+
+# Object types in the top bits of an index entry's mode
+_TYPE_SYMLINK = 0o12
+_TYPE_GITLINK = 0o16  # Submodule
+_TYPE_DIRECTORY = 0o04  # Directory entry of a sparse index
+
+# ctime, mtime, dev, ino, mode, uid, gid, size: the fields before the object id
+_STAT_SIZE = 40
+_MODE_OFFSET = 24
+_FLAG_EXTENDED = 0x4000
+_NAME_MASK = 0xFFF
+
+# A directory of the index tree maps names to subdirectories, or to the mode of a file
+IndexTree = Dict[str, Union["IndexTree", int]]
+
+
+def find_git_dir(path: str) -> Optional[str]:
+    """
+    The git directory of a checkout rooted at `path`, or None
+
+    Follows the `gitdir:` file that worktrees and submodules have in place
+    of a .git directory.
+    """
+    dot_git = os.path.join(path, ".git")
+    if os.path.isdir(dot_git):
+        return dot_git
+    try:
+        with open(dot_git, "r", encoding="utf-8") as f:
+            line = f.readline().strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+    if not line.startswith("gitdir:"):
+        return None
+    git_dir = os.path.join(path, line[len("gitdir:"):].strip())
+    return git_dir if os.path.isdir(git_dir) else None
+
+
+def _hash_size(git_dir: str) -> int:
+    """Bytes per object id: 32 in SHA-256 repositories, 20 otherwise"""
+    # Worktrees keep their config in the main repository's git directory
+    common_dir = git_dir
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r", encoding="utf-8") as f:
+            common_dir = os.path.join(git_dir, f.read().strip())
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(common_dir, "config"), "r", encoding="utf-8", errors="replace") as f:
+            config = f.read()
+    except OSError:
+        return 20
+    sha256 = re.search(r"^\s*objectformat\s*=\s*sha256\s*$", config, re.MULTILINE | re.IGNORECASE)
+    return 32 if sha256 else 20
+
+
+def read_index(git_dir: str) -> List[Tuple[str, int]]:
+    """
+    Read the tracked paths and their modes from a git index, in index order
+
+    Supports index versions 2 to 4. Paths of conflicted files, which have an
+    entry per merge stage, are listed once. Raises ValueError if the file is
+    not an index this reader understands, e.g. a split index whose entries
+    live in a shared file.
+    """
+    with open(os.path.join(git_dir, "index"), "rb") as f:
+        data = f.read()
+    hash_size = _hash_size(git_dir)
+    if len(data) < 12 or data[:4] != b"DIRC":
+        raise ValueError("Not a git index")
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in (2, 3, 4):
+        raise ValueError(f"Unsupported git index version {version}")
+
+    unpack_mode = struct.Struct(">I").unpack_from
+    unpack_flags = struct.Struct(">H").unpack_from
+    flags_offset = _STAT_SIZE + hash_size
+    entries: List[Tuple[str, int]] = []
+    previous = b""
+    offset = 12
+    for _ in range(count):
+        mode = unpack_mode(data, offset + _MODE_OFFSET)[0]
+        flags = unpack_flags(data, offset + flags_offset)[0]
+        name_start = offset + flags_offset + 2
+        if flags & _FLAG_EXTENDED and version >= 3:
+            name_start += 2
+        if version == 4:
+            # The path is the previous one, less a varint count of trailing bytes, plus a suffix
+            byte = data[name_start]
+            name_start += 1
+            strip = byte & 0x7F
+            while byte & 0x80:
+                byte = data[name_start]
+                name_start += 1
+                strip = ((strip + 1) << 7) | (byte & 0x7F)
+            name_end = data.index(b"\0", name_start)
+            name = previous[:len(previous) - strip] + data[name_start:name_end]
+            offset = name_end + 1
+        else:
+            length = flags & _NAME_MASK
+            name_end = name_start + length if length < _NAME_MASK else data.index(b"\0", name_start)
+            name = data[name_start:name_end]
+            # Entries are padded with 1 to 8 NUL bytes to a multiple of 8
+            offset += (name_end - offset + 8) & ~7
+        if name != previous:
+            entries.append((os.fsdecode(name), mode))
+        previous = name
+
+    # Extensions follow the entries, each a signature and a size; only the split index one
+    # matters here
+    end = len(data) - hash_size
+    while offset + 8 <= end:
+        signature = data[offset:offset + 4]
+        if signature == b"link":
+            raise ValueError("Split git indexes are not supported")
+        offset += 8 + struct.unpack_from(">I", data, offset + 4)[0]
+    return entries
+
+
+def build_index_tree(entries: List[Tuple[str, int]]) -> Tuple[IndexTree, Dict[str, IndexTree]]:
+    """Nest tracked paths into directories; also returns every directory by relative path"""
+    root: IndexTree = {}
+    directories: Dict[str, IndexTree] = {"": root}
+
+    def directory(rel_dir: str) -> IndexTree:
+        node = directories.get(rel_dir)
+        if node is None:
+            parent, _, name = rel_dir.rpartition("/")
+            node = directories[rel_dir] = {}
+            directory(parent)[name] = node
+        return node
+
+    for path, mode in entries:
+        path = path.rstrip("/")  # Directory entries of a sparse index end with '/'
+        if mode >> 12 in (_TYPE_GITLINK, _TYPE_DIRECTORY):
+            directory(path)  # Shown as a directory whose contents are not tracked here
+        else:
+            rel_dir, _, name = path.rpartition("/")
+            directory(rel_dir)[name] = mode
+    return root, directories
+
+
+def walk_index(
+    path: str,
+    tree: IndexTree,
+    ignore: Optional[Callable[[str, bool], bool]] = None,
+    progress_callback: Optional[Callable[[int, int], bool]] = None,
+    max_depth: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    stats: bool = False,
+    profile=None
+) -> Iterator[TreeEntry]:
+    """
+    Yield the entries of an index tree in walk_tree's order, with its limits and markers
+
+    Nothing is listed from disk. Symbolic links are read for their target,
+    and with `stats` every entry is stat'ed for its size and mtime.
+    """
+    if profile is not None:
+        if ignore:
+            ignore = profile.wrap_ignore(ignore)
+        if progress_callback:
+            progress_callback = profile.wrap_callback(progress_callback)
+    current = 0
+    discovered = 0
+
+    def _list(node: IndexTree, dir_path: str, rel_dir: str, depth: int):
+        nonlocal discovered
+        children = []
+        for name in sorted(node):
+            child = node[name]
+            is_dir = isinstance(child, dict)
+            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+            if ignore and ignore(rel_path, is_dir):
+                continue
+            children.append((name, os.path.join(dir_path, name), rel_path, is_dir, child))
+        discovered += len(children)
+        return [children, 0, depth]
+
+    stack = [_list(tree, path, "", 1)]
+    while stack:
+        frame = stack[-1]
+        children, index, depth = frame
+        if index >= len(children):
+            stack.pop()
+            continue
+        frame[1] = index + 1
+
+        name, child_path, rel_path, is_dir, child = children[index]
+        link = None
+        if not is_dir and child >> 12 == _TYPE_SYMLINK:
+            try:
+                link = os.readlink(child_path)
+            except OSError:
+                pass
+        size, mtime = _stats(child_path, is_dir) if stats else NO_STATS
+        if profile is not None and stats:
+            profile.count("entries_stated")
+        yield TreeEntry(
+            name, child_path, rel_path, depth, is_dir, index == len(children) - 1,
+            size=size, mtime=mtime, link=link
+        )
+
+        current += 1
+        if progress_callback and not progress_callback(
+            current, discovered if max_entries is None else min(discovered, max_entries)
+        ):
+            return
+
+        if max_entries is not None and current >= max_entries:
+            for children, index, depth in reversed(stack):
+                if index < len(children):
+                    _, child_path, rel_path, _, _ = children[index]
+                    yield TreeEntry(
+                        "", os.path.dirname(child_path), rel_path.rpartition("/")[0], depth,
+                        False, True, TRUNCATED, len(children) - index
+                    )
+            return
+
+        if is_dir and (max_depth is None or depth < max_depth):
+            stack.append(_list(child, child_path, rel_path, depth + 1))
+
+
+def _stats(path: str, is_dir: bool) -> Tuple[int, float]:
+    """Size and mtime of a tracked path from the working tree; a deleted file has none"""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return NO_STATS
+    return (0 if is_dir else st.st_size, st.st_mtime)
+
+
+def _untracked_filter(
+    path: str,
+    tracked: Set[str],
+    submodules: Set[str],
+    ignore: Optional[Callable[[str, bool], bool]]
+) -> Callable[[str, bool], bool]:
+    """Ignore function keeping tracked paths and untracked ones that git does not ignore"""
+    git_ignore = load_ignore(path, nested=True)
+
+    def ignored(rel_path: str, is_dir: bool) -> bool:
+        if ignore and ignore(rel_path, is_dir):
+            return True
+        if rel_path in tracked:
+            return False
+        # Files in a submodule belong to its own checkout
+        return rel_path.rpartition("/")[0] in submodules or git_ignore(rel_path, is_dir)
+
+    return ignored
+
+
+def walk_source(
+    path: str,
+    source: str = SOURCE_WALK,
+    ignore: Optional[Callable[[str, bool], bool]] = None,
+    **options
+) -> Iterator[TreeEntry]:
+    """
+    Yield the entries of a directory from the chosen source
+
+    With SOURCE_WALK, or when `path` is not the root of a git checkout with a
+    readable index, this is walk_tree(path, ignore=ignore, **options).
+    SOURCE_GIT yields the paths tracked in the index, as recorded there:
+    nothing is listed, so deleted files still show and new ones do not.
+    SOURCE_GIT_UNTRACKED walks the directory, keeping tracked paths and
+    untracked ones not ignored by the checkout's .gitignore files.
+
+    `ignore`, from the ignore file selected by the user, applies to every
+    source. Options are those of walk_tree; with SOURCE_GIT, workers,
+    follow_symlinks and one_filesystem do not apply, and neither git source
+    uses a snapshot. The index is read once iteration starts.
+    """
+    if source not in SOURCES:
+        raise ValueError(f"Unsupported source: {source}")
+    git_dir = find_git_dir(path) if source != SOURCE_WALK else None
+    entries = None
+    if git_dir is not None:
+        start = time.perf_counter()
+        try:
+            entries = read_index(git_dir)
+        except (OSError, ValueError, struct.error, IndexError):
+            pass  # Walked instead
+    if entries is None:
+        yield from walk_tree(path, ignore=ignore, **options)
+        return
+
+    profile = options.get("profile")
+    tree, directories = build_index_tree(entries)
+    if profile is not None:
+        # The index is read in one go in place of every directory listing
+        profile.record_scan(len(entries), False, time.perf_counter() - start, 0.0, 0.0)
+
+    options.pop("snapshot", None)  # Listings depend on the index, which the snapshot does not track
+    if source == SOURCE_GIT_UNTRACKED:
+        tracked = set(directories)
+        tracked.update(rel_path.rstrip("/") for rel_path, _ in entries)
+        submodules = {rel_path for rel_path, mode in entries if mode >> 12 == _TYPE_GITLINK}
+        untracked = _untracked_filter(path, tracked, submodules, ignore)
+        yield from walk_tree(path, ignore=untracked, **options)
+        return
+    yield from walk_index(
+        path, tree, ignore=ignore, progress_callback=options.get("progress_callback"),
+        max_depth=options.get("max_depth"), max_entries=options.get("max_entries"),
+        stats=options.get("stats", False), profile=profile
+    )
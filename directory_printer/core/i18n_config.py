@@ -1,27 +1,117 @@
+import json
 import os
-import i18n
+import re
+from typing import Dict, Optional, Tuple
+
 from directory_printer.core.utilities import get_resource_path
 
-def init_i18n():
-    """Initialize i18n configuration"""
-    translations_path = get_resource_path(os.path.join('directory_printer', 'translations'))
-    i18n.load_path.append(translations_path)
+# Locale used until one is set
+DEFAULT_LOCALE = "en"
+# Locale whose messages are used for keys missing from the active one
+FALLBACK_LOCALE = "en"
+
+# A %{name} placeholder, or %% for a literal '%', as in python-i18n templates
+_PLACEHOLDER = re.compile(r"%(?:(%)|\{([_a-zA-Z][_a-zA-Z0-9]*)\})")
+# The same, once literal braces are doubled for str.format
+_ESCAPED_PLACEHOLDER = re.compile(r"%(?:(%)|\{\{([_a-zA-Z][_a-zA-Z0-9]*)\}\})")
+
+# A compiled message: its text without arguments, and a str.format template,
+# or None when it has no placeholders
+Message = Tuple[str, Optional[str]]
+
+# Compiled catalogs by locale, loaded on first use
+_catalogs: Dict[str, Dict[str, Message]] = {}
+_locale = DEFAULT_LOCALE
+# Messages of the active locale; fallbacks are added as they are looked up
+_messages: Dict[str, Message] = {}
+
+
+class _KeepMissing(dict):
+    """Format arguments that leave unknown placeholders as they are, like python-i18n"""
+
+    def __missing__(self, name: str) -> str:
+        return f"%{{{name}}}"
+
+
+def _compile(text: str) -> Message:
+    """Turn a %{name} template into a str.format template, once per message"""
+    if "%" not in text:
+        return (text, None)
+    plain = _PLACEHOLDER.sub(lambda match: "%" if match.group(1) else match.group(0), text)
+    if not any(match.group(2) for match in _PLACEHOLDER.finditer(text)):
+        return (plain, None)
+    escaped = text.replace("{", "{{").replace("}", "}}")
+    template = _ESCAPED_PLACEHOLDER.sub(
+        lambda match: "%" if match.group(1) else "{" + match.group(2) + "}", escaped
+    )
+    return (plain, template)
+
+
+def _flatten(tree: dict, prefix: str, messages: Dict[str, Message]):
+    for name, value in tree.items():
+        key = f"{prefix}{name}"
+        if isinstance(value, dict):
+            _flatten(value, key + ".", messages)
+        else:
+            messages[key] = _compile(str(value))
+
+
+def load_catalog(locale: str) -> Dict[str, Message]:
+    """
+    Read and compile the translations of a locale, once; a missing or
+    invalid file gives an empty catalog
+    """
+    catalog = _catalogs.get(locale)
+    if catalog is None:
+        catalog = {}
+        path = get_resource_path(
+            os.path.join('directory_printer', 'translations', f"{locale}.json")
+        )
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                _flatten(json.load(f), "", catalog)
+        except (OSError, ValueError):
+            pass
+        _catalogs[locale] = catalog
+    return catalog
+
+
+def init_i18n(locale: str = DEFAULT_LOCALE):
+    """Initialize i18n configuration, loading only the given locale"""
+    set_language(locale)
 
-    i18n.set('filename_format', '{locale}.{format}')
-    i18n.set('file_format', 'json')  
-    i18n.set('skip_locale_root_data', True)
-    i18n.set('locale', 'en')
-    i18n.set('fallback', 'en')
 
 def set_language(locale: str):
     """Set the current language"""
-    i18n.set('locale', locale)
+    global _locale, _messages
+    _locale = locale
+    _messages = dict(load_catalog(locale))
+
 
 def get_language() -> str:
     """Get the current language"""
-    return i18n.get('locale')
+    return _locale
+
+
+def _resolve(key: str) -> Message:
+    """
+    Look a key up in the fallback locale, loading it on first use; unknown
+    keys translate to themselves
+    """
+    message = load_catalog(FALLBACK_LOCALE).get(key) if _locale != FALLBACK_LOCALE else None
+    if message is None:
+        message = (key, None)
+    _messages[key] = message
+    return message
+
 
 def t(key: str, **kwargs) -> str:
-    """Translate a key with optional parameters"""    
-    value = i18n.t(key, **kwargs)
-    return value
+    """Translate a key with optional parameters"""
+    message = _messages.get(key) or _resolve(key)
+    text, template = message
+    if template is None or not kwargs:
+        return text
+    try:
+        return template.format(**kwargs)
+    except KeyError:
+        return template.format_map(_KeepMissing(kwargs))
@@ -0,0 +1,277 @@
+import hashlib
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+from pathspec.patterns import GitWildMatchPattern
+
+default_ignore_patterns = [
+    ".git/",           # Git directory
+]
+
+# Prefix pathspec puts in front of patterns that may match at any depth
+_ANY_DEPTH_PREFIX = "^(?:.+/)?"
+# Suffixes pathspec uses to also match descendants; entries under a matched
+# directory are pruned, so the pattern only needs to match the entry itself
+_DESCENDANT_SUFFIXES = (
+    ("(?:(?P<ps_d>/).*)?$", "/?$"),
+    ("(?P<ps_d>/).*$", "/$"),
+)
+_GLOB_CHARS = frozenset("*?[\\")
+
+
+def read_ignore_patterns(gitignore_path: str, include_defaults: bool = True) -> List[str]:
+    """Read patterns from an ignore file, skipping empty lines and comments"""
+    patterns = default_ignore_patterns.copy() if include_defaults else []
+    with open(gitignore_path, 'r') as f:
+        patterns.extend([
+            line.strip()
+            for line in f
+            if line.strip() and not line.strip().startswith('#')
+        ])
+    return patterns
+
+
+def _compile_pattern(pattern: str) -> Tuple[Optional[str], Optional[bool]]:
+    """Translate a gitignore pattern into a regex matching the entry itself"""
+    regex, include = GitWildMatchPattern.pattern_to_regex(pattern)
+    if regex is None:
+        return None, None
+    for suffix, replacement in _DESCENDANT_SUFFIXES:
+        if regex.endswith(suffix):
+            return regex[:-len(suffix)] + replacement, include
+    return regex, include
+
+
+def _literal_segment(core: str) -> Optional[str]:
+    """Longest path segment of a pattern that contains no glob characters"""
+    literals = [
+        segment for segment in core.split('/')
+        if segment and not _GLOB_CHARS.intersection(segment)
+    ]
+    return max(literals, key=len) if literals else None
+
+
+def _combine(alternatives: List[Tuple[str, int, bool]]):
+    """
+    Join pattern regexes into a single regex
+
+    Alternatives are ordered from the last pattern to the first, so the first
+    alternative that matches is the pattern that wins under gitignore rules.
+    Each alternative gets one capturing group whose number maps back to it.
+    """
+    if not alternatives:
+        return None, {}
+    parts = []
+    groups = {}
+    for group, (regex, index, include) in enumerate(reversed(alternatives), start=1):
+        parts.append(f"({regex})")
+        groups[group] = (index, include)
+    return re.compile("|".join(parts)), groups
+
+
+class IgnoreMatcher:
+    """
+    Gitignore patterns compiled once for fast per-entry matching
+
+    Patterns without a slash are matched against the entry name only: plain
+    names go into a dict keyed by path segment, "*suffix" patterns into a dict
+    keyed by suffix, and other globs into one combined regex.
+    Patterns with a slash are keyed by their longest literal segment and only
+    tried when the path contains that segment; the rest go into a second
+    combined regex tested against the relative path. Ancestors are not
+    re-tested, so the walker is expected to prune ignored directories instead
+    of descending into them.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        patterns = list(patterns)
+        # Identifies the pattern set, e.g. for caching filtered listings
+        self.digest = hashlib.sha256("\n".join(patterns).encode('utf-8')).hexdigest()
+        self._file_names: Dict[str, Tuple[int, bool]] = {}
+        self._dir_names: Dict[str, Tuple[int, bool]] = {}
+        self._file_suffixes: Dict[str, Tuple[int, bool]] = {}
+        self._dir_suffixes: Dict[str, Tuple[int, bool]] = {}
+        self._path_segments: Dict[str, List[Tuple[int, bool, Pattern]]] = {}
+        name_alternatives = []
+        path_alternatives = []
+
+        for index, pattern in enumerate(patterns):
+            regex, include = _compile_pattern(pattern)
+            if regex is None:
+                continue
+            body = pattern[1:] if pattern.startswith('!') else pattern
+            dir_only = body.endswith('/')
+            core = body.rstrip('/')
+
+            if '/' in core:
+                segment = _literal_segment(core)
+                if segment:
+                    self._path_segments.setdefault(segment, []).append(
+                        (index, include, re.compile(regex))
+                    )
+                else:
+                    path_alternatives.append((regex, index, include))
+            elif not _GLOB_CHARS.intersection(core) and regex.startswith(_ANY_DEPTH_PREFIX):
+                self._dir_names[core] = (index, include)
+                if not dir_only:
+                    self._file_names[core] = (index, include)
+            elif core.startswith('*') and not _GLOB_CHARS.intersection(core[1:]):
+                self._dir_suffixes[core[1:]] = (index, include)
+                if not dir_only:
+                    self._file_suffixes[core[1:]] = (index, include)
+            elif regex.startswith(_ANY_DEPTH_PREFIX):
+                name_alternatives.append(("^" + regex[len(_ANY_DEPTH_PREFIX):], index, include))
+            else:
+                path_alternatives.append((regex, index, include))
+
+        self._suffix_lengths = sorted({len(suffix) for suffix in self._dir_suffixes})
+        self._name_regex, self._name_groups = _combine(name_alternatives)
+        self._path_regex, self._path_groups = _combine(path_alternatives)
+
+    @classmethod
+    def from_file(cls, gitignore_path: str) -> Optional["IgnoreMatcher"]:
+        """Compile an ignore file, returning None if it does not exist"""
+        if not os.path.exists(gitignore_path):
+            return None
+        return cls(read_ignore_patterns(gitignore_path))
+
+    def match(self, rel_path: str, is_dir: bool) -> bool:
+        """
+        Check whether an entry is ignored
+
+        Args:
+            rel_path: Path relative to the root, using '/' separators
+            is_dir: Whether the entry is a directory
+        """
+        return self.check(rel_path, is_dir) is True
+
+    __call__ = match
+
+    def check(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Like match, but None when no pattern matches the entry at all
+
+        Lets ignore files with higher precedence fall through to lower ones.
+        """
+        name = rel_path[rel_path.rfind('/') + 1:]
+        best, include = (self._dir_names if is_dir else self._file_names).get(name, (-1, False))
+
+        if self._suffix_lengths:
+            suffixes = self._dir_suffixes if is_dir else self._file_suffixes
+            for length in self._suffix_lengths:
+                if length > len(name):
+                    break
+                hit = suffixes.get(name[len(name) - length:])
+                if hit and hit[0] > best:
+                    best, include = hit
+
+        if self._name_regex is not None:
+            m = self._name_regex.match(name + '/' if is_dir else name)
+            if m:
+                index, matched_include = self._name_groups[m.lastindex]
+                if index > best:
+                    best, include = index, matched_include
+
+        if self._path_regex is not None:
+            m = self._path_regex.match(rel_path + '/' if is_dir else rel_path)
+            if m:
+                index, matched_include = self._path_groups[m.lastindex]
+                if index > best:
+                    best, include = index, matched_include
+
+        if self._path_segments:
+            for segment in rel_path.split('/'):
+                for index, matched_include, regex in self._path_segments.get(segment, ()):
+                    if index > best and regex.match(rel_path + '/' if is_dir else rel_path):
+                        best, include = index, matched_include
+
+        return include if best >= 0 else None
+
+
+class NestedIgnoreMatcher:
+    """
+    Ignore rules from ignore files found while walking, layered on a base matcher
+
+    Every directory may hold its own ignore file whose patterns are relative
+    to that directory, as with git. The rules for a directory are its
+    parent's layers plus its own file, so each file is read and compiled once
+    per walk; directories without a file share their parent's layers.
+    Layers are checked from the deepest file up, then .git/info/exclude at
+    the root, then the base matcher; the first one with a matching pattern
+    decides.
+    """
+
+    def __init__(
+        self, root: str, base: Optional[IgnoreMatcher] = None, file_name: str = ".gitignore"
+    ):
+        self.root = root
+        self.file_name = file_name
+        layers = []
+        if base is not None:
+            layers.append(("", base))
+        exclude_path = os.path.join(root, ".git", "info", "exclude")
+        if os.path.isfile(exclude_path):
+            exclude = read_ignore_patterns(exclude_path, include_defaults=False)
+            layers.append(("", IgnoreMatcher(exclude)))
+        self.digest = "nested:" + ",".join(matcher.digest for _, matcher in layers)
+        # Layers and a digest of them for each directory, from lowest to highest precedence
+        self._layers: Dict[Optional[str], Tuple[Tuple[Tuple[str, IgnoreMatcher], ...], str]] = {
+            None: (tuple(layers), self.digest)
+        }
+
+    def _layers_for(self, rel_dir: str):
+        cached = self._layers.get(rel_dir)
+        if cached is not None:
+            return cached
+        parent_dir = rel_dir.rpartition('/')[0] if rel_dir else None
+        parent_layers, parent_digest = self._layers_for(parent_dir)
+        ignore_path = os.path.join(self.root, *rel_dir.split('/'), self.file_name)
+        try:
+            matcher = IgnoreMatcher(read_ignore_patterns(ignore_path, include_defaults=False))
+        except (OSError, ValueError):
+            cached = (parent_layers, parent_digest)  # No readable ignore file here
+        else:
+            cached = (
+                parent_layers + ((rel_dir, matcher),), f"{parent_digest},{rel_dir}:{matcher.digest}"
+            )
+        self._layers[rel_dir] = cached
+        return cached
+
+    def digest_for(self, rel_dir: str) -> str:
+        """Digest of the rules applied to the children of a directory"""
+        return self._layers_for(rel_dir)[1]
+
+    def match(self, rel_path: str, is_dir: bool) -> bool:
+        """
+        Check whether an entry is ignored
+
+        Args:
+            rel_path: Path relative to the root, using '/' separators
+            is_dir: Whether the entry is a directory
+        """
+        rel_dir = rel_path[:rel_path.rfind('/')] if '/' in rel_path else ""
+        for base_dir, matcher in reversed(self._layers_for(rel_dir)[0]):
+            decision = matcher.check(rel_path[len(base_dir) + 1:] if base_dir else rel_path, is_dir)
+            if decision is not None:
+                return decision
+        return False
+
+    __call__ = match
+
+
+def load_ignore(root: str, gitignore_path: Optional[str] = None, nested: bool = False):
+    """
+    Build the ignore function for a walk of `root`
+
+    Args:
+        root: Directory being walked
+        gitignore_path: Ignore file selected by the user, applied from the root
+        nested: Also apply ignore files found in the walked directories
+
+    Returns None when nothing is ignored.
+    """
+    matcher = IgnoreMatcher.from_file(gitignore_path) if gitignore_path else None
+    if nested:
+        return NestedIgnoreMatcher(root, base=matcher or IgnoreMatcher(default_ignore_patterns))
+    return matcher
@@ -1,25 +1,24 @@
+import itertools
 import os
-from typing import List, Optional, Callable
+from typing import Callable, Iterable, Iterator, List, Optional
 import pathspec
 
-default_ignore_patterns = [
-    ".git/",           # Git directory
-]
+from directory_printer.core.git_index import SOURCE_WALK, walk_source
+# default_ignore_patterns was defined here before core/ignore.py; kept for existing imports
+from directory_printer.core.ignore import default_ignore_patterns  # pylint: disable=unused-import
+from directory_printer.core.ignore import load_ignore, read_ignore_patterns
+from directory_printer.core.profiling import RunProfile
+from directory_printer.core.sizes import summarize_sizes
+from directory_printer.core.snapshot import SnapshotCache
+from directory_printer.core.traversal import (
+    NOT_FOUND, PLACEHOLDERS, TRUNCATED, TreeEntry, display_name
+)
 
 def parse_gitignore(gitignore_path: str) -> Optional[pathspec.PathSpec]:
     """Parse gitignore file and return a PathSpec object"""
     if not os.path.exists(gitignore_path):
         return None
-    
-    patterns = default_ignore_patterns.copy()
-    with open(gitignore_path, 'r') as f:
-        # Read and filter out empty lines and comments
-        patterns.extend([
-            line.strip()
-            for line in f
-            if line.strip() and not line.strip().startswith('#')
-        ])
-        return pathspec.PathSpec.from_lines('gitwildmatch', patterns)
+    return pathspec.PathSpec.from_lines('gitwildmatch', read_ignore_patterns(gitignore_path))
 
 
 def should_ignore(path: str, base_path: str, spec: Optional[pathspec.PathSpec]) -> bool:
@@ -46,14 +45,179 @@ def should_ignore(path: str, base_path: str, spec: Optional[pathspec.PathSpec])
     return False
 
 
-def count_entries(path: str, spec: Optional[pathspec.PathSpec] = None) -> int:
-    """Count total number of entries for progress tracking"""
-    total = 0
-    for root, dirs, files in os.walk(path):
-        if spec and should_ignore(root, path, spec):
+def format_tree(
+    entries: Iterable[TreeEntry],
+    prefix: str = "",
+    labels: Optional[Iterable[Optional[str]]] = None
+) -> Iterator[str]:
+    """
+    Render walk_tree entries as tree lines
+
+    Args:
+        entries: Entries in display order, as produced by walk_tree
+        prefix: Prefix for every line (used for tree structure)
+        labels: Optional annotation per entry, shown in parentheses after its name
+    """
+    # Full line prefix for each depth, built once per directory
+    prefixes = [prefix]
+
+    for entry, label in zip(entries, labels if labels is not None else itertools.repeat(None)):
+        del prefixes[entry.depth:]
+        if entry.error == NOT_FOUND:
+            yield f"Error: Directory '{entry.path}' not found!"
+            continue
+        current_prefix = prefixes[-1]
+        if entry.error == TRUNCATED:
+            yield f"{current_prefix}└── … {entry.omitted} more"
+            continue
+        if entry.error is not None:
+            yield f"{current_prefix}{PLACEHOLDERS[entry.error]}"
             continue
-        total += len(files) + len(dirs)
-    return total
+
+        symbol = "└── " if entry.is_last else "├── "
+        name = entry.name if entry.link is None else display_name(entry.name, entry.link)
+        line = f"{current_prefix}{symbol}{name}"
+        yield f"{line}  ({label})" if label else line
+        if entry.is_dir:
+            prefixes.append(current_prefix + ("    " if entry.is_last else "│   "))
+
+
+def iter_entries(
+    path: str,
+    gitignore_path: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, int], bool]] = None,
+    workers: int = 0,
+    cache: Optional[SnapshotCache] = None,
+    max_depth: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    nested_ignore: bool = False,
+    stats: bool = False,
+    profile: Optional[RunProfile] = None,
+    follow_symlinks: bool = False,
+    one_filesystem: bool = False,
+    source: str = SOURCE_WALK
+) -> Iterator[TreeEntry]:
+    """
+    Yield walk_tree entries with the ignore rules and snapshot cache of iter_structure applied
+
+    Arguments are those of iter_structure; with `stats`, or a git source,
+    entries carry size and mtime and the cache is not used. With `profile`, the
+    time spent in the walk is recorded under "walk".
+    """
+    # Compile gitignore patterns if provided; ignored directories are never entered
+    matcher = load_ignore(path, gitignore_path, nested=nested_ignore)
+
+    snapshot = None
+    if cache and not stats and source == SOURCE_WALK:
+        # Listings record whether links to directories were walked into, so each mode has its
+        # own snapshot
+        digest = matcher.digest if matcher else ""
+        if follow_symlinks:
+            digest += ":follow-symlinks"
+        snapshot = cache.open(path, digest)
+
+    entries = walk_source(
+        path, source, ignore=matcher, progress_callback=progress_callback, workers=workers,
+        snapshot=snapshot, max_depth=max_depth, max_entries=max_entries, stats=stats,
+        profile=profile, follow_symlinks=follow_symlinks, one_filesystem=one_filesystem
+    )
+    yield from profile.time_iter(entries, "walk") if profile is not None else entries
+
+    if snapshot is not None:
+        cache.save(snapshot)
+
+
+def iter_structure(
+    path: str,
+    prefix: str = "",
+    gitignore_path: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, int], bool]] = None,
+    workers: int = 0,
+    cache: Optional[SnapshotCache] = None,
+    max_depth: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    nested_ignore: bool = False,
+    sizes: bool = False,
+    largest: int = 0,
+    profile: Optional[RunProfile] = None,
+    follow_symlinks: bool = False,
+    one_filesystem: bool = False,
+    source: str = SOURCE_WALK
+) -> Iterator[str]:
+    """
+    Yield directory structure lines as the tree is walked
+
+    Args:
+        path: Directory path to print
+        prefix: Prefix for every line (used for tree structure)
+        gitignore_path: Path to .gitignore file
+        progress_callback: Callback function(current, total) -> bool for progress updates
+                         Returns False to stop the generator, True to continue.
+                         The total is a running count of discovered entries.
+        workers: Number of threads prefetching directory listings (0 disables)
+        cache: Snapshot cache reusing listings of directories unchanged since the last run
+        max_depth: Deepest level to print; deeper directories are not listed
+        max_entries: Stop after this many entries, ending each open directory
+                     with a "… N more" line; directories not reached are not listed
+        nested_ignore: Also apply .gitignore files found in the walked directories
+        sizes: Annotate files with their size and directories with recursive byte
+               and file totals, followed by a total line; the cache is not used
+        largest: With sizes, also list this many of the largest directories
+        profile: RunProfile filled with counters and phase timings as the lines are produced
+        follow_symlinks: Walk into symbolic links to directories, listing each directory
+                         once; by default links are shown as `name -> target`
+        one_filesystem: Do not walk into directories on other filesystems, listing each
+                        directory once
+        source: "walk" lists the directory; in a git checkout, "git" reads the tracked
+                paths from .git/index instead and "git-untracked" adds the untracked
+                files that are not ignored (see walk_source). The cache is not used.
+    """
+    entries = iter_entries(
+        path, gitignore_path, progress_callback, workers, cache, max_depth, max_entries,
+        nested_ignore, stats=sizes, profile=profile, follow_symlinks=follow_symlinks,
+        one_filesystem=one_filesystem, source=source
+    )
+    lines = _structure_lines(entries, prefix, sizes, largest, max_depth)
+    yield from profile.measure_output(lines) if profile is not None else lines
+
+
+def _structure_lines(
+    entries: Iterable[TreeEntry],
+    prefix: str,
+    sizes: bool,
+    largest: int,
+    max_depth: Optional[int]
+) -> Iterator[str]:
+    """Render walked entries as tree lines, with size labels and totals when asked"""
+    if sizes:
+        # Totals are only known once a directory is complete, so the tree is rendered after the walk
+        summary = summarize_sizes(entries, largest=largest, max_depth=max_depth)
+        yield from format_tree(summary.entries, prefix, summary.labels())
+        yield from summary.summary_lines()
+        return
+
+    yield from format_tree(entries, prefix)
+
+
+def iter_paths(
+    path: str,
+    gitignore_path: Optional[str] = None,
+    workers: int = 0,
+    max_depth: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    nested_ignore: bool = False,
+    follow_symlinks: bool = False,
+    one_filesystem: bool = False,
+    source: str = SOURCE_WALK
+) -> Iterator[str]:
+    """Yield one relative path per entry, with a trailing '/' on directories"""
+    matcher = load_ignore(path, gitignore_path, nested=nested_ignore)
+    for entry in walk_source(
+        path, source, ignore=matcher, workers=workers, max_depth=max_depth, max_entries=max_entries,
+        follow_symlinks=follow_symlinks, one_filesystem=one_filesystem
+    ):
+        if entry.error is None:
+            yield entry.rel_path + "/" if entry.is_dir else entry.rel_path
 
 
 def print_structure(
@@ -61,7 +225,18 @@ def print_structure(
     prefix: str = "",
     output_list: Optional[List[str]] = None,
     gitignore_path: Optional[str] = None,
-    progress_callback: Optional[Callable[[int, int], bool]] = None
+    progress_callback: Optional[Callable[[int, int], bool]] = None,
+    workers: int = 0,
+    cache: Optional[SnapshotCache] = None,
+    max_depth: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    nested_ignore: bool = False,
+    sizes: bool = False,
+    largest: int = 0,
+    profile: Optional[RunProfile] = None,
+    follow_symlinks: bool = False,
+    one_filesystem: bool = False,
+    source: str = SOURCE_WALK
 ) -> List[str]:
     """
     Print directory structure with gitignore support and progress tracking
@@ -72,55 +247,53 @@ def print_structure(
         output_list: List to store output lines
         gitignore_path: Path to .gitignore file
         progress_callback: Callback function(current, total) -> bool for progress updates
-                         Returns False to stop processing, True to continue
+                         Returns False to stop processing, True to continue.
+                         The total is a running count of discovered entries.
+        workers: Number of threads prefetching directory listings (0 disables)
+        cache: Snapshot cache reusing listings of directories unchanged since the last run
+        max_depth: Deepest level to print; deeper directories are not listed
+        max_entries: Stop after this many entries, ending each open directory
+                     with a "… N more" line; directories not reached are not listed
+        nested_ignore: Also apply .gitignore files found in the walked directories
+        sizes: Annotate files with their size and directories with recursive byte
+               and file totals, followed by a total line; the cache is not used
+        largest: With sizes, also list this many of the largest directories
+        profile: RunProfile filled with counters and phase timings
+        follow_symlinks: Walk into symbolic links to directories, listing each directory
+                         once; by default links are shown as `name -> target`
+        one_filesystem: Do not walk into directories on other filesystems, listing each
+                        directory once
+        source: "walk", "git" or "git-untracked"; see iter_structure
     """
     if output_list is None:
         output_list = []
-        
-    # Parse gitignore patterns if provided
-    spec = parse_gitignore(gitignore_path) if gitignore_path else None
-    
-    # Count total entries for progress tracking
-    total_entries = count_entries(path, spec)
-    current_entry = 0
 
-    def _print_structure_recursive(current_path: str, current_prefix: str = "") -> bool:
-        nonlocal current_entry
-        
-        try:
-            entries = sorted(os.listdir(current_path))
-        except PermissionError:
-            output_list.append(f"{current_prefix}[Permission Denied]")
-            return True
-        except FileNotFoundError:
-            output_list.append(f"Error: Directory '{current_path}' not found!")
-            return True
+    stopped = False
 
-        # Filter out ignored entries before processing
-        filtered_entries = []
-        for entry in entries:
-            full_path = os.path.join(current_path, entry)
-            if not spec or not should_ignore(full_path, path, spec):
-                filtered_entries.append(entry)
-
-        for i, entry in enumerate(filtered_entries):
-            full_path = os.path.join(current_path, entry)
-            is_last = i == len(filtered_entries) - 1
-            symbol = "└── " if is_last else "├── "
-            output_list.append(f"{current_prefix}{symbol}{entry}")
-            
-            current_entry += 1
-            if progress_callback:
-                if not progress_callback(current_entry, total_entries):
-                    return False  # Stop processing
-            
-            if os.path.isdir(full_path):
-                next_prefix = "    " if is_last else "│   "
-                if not _print_structure_recursive(full_path, current_prefix + next_prefix):
-                    return False  # Stop processing
-        
-        return True  # Continue processing
+    def _progress(current: int, total: int) -> bool:
+        nonlocal stopped
+        if not progress_callback(current, total):
+            stopped = True
+        return not stopped
+
+    output_list.extend(iter_structure(
+        path,
+        prefix=prefix,
+        gitignore_path=gitignore_path,
+        progress_callback=_progress if progress_callback else None,
+        workers=workers,
+        cache=cache,
+        max_depth=max_depth,
+        max_entries=max_entries,
+        nested_ignore=nested_ignore,
+        sizes=sizes,
+        largest=largest,
+        profile=profile,
+        follow_symlinks=follow_symlinks,
+        one_filesystem=one_filesystem,
+        source=source
+    ))
 
-    if not _print_structure_recursive(path, prefix):
+    if stopped:
         return []  # Return empty list if stopped
     return output_list
@@ -0,0 +1,167 @@
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+# Timed phases, in report order
+PHASES = (
+    "listing",  # os.scandir, summed over listing threads
+    "sorting",  # Sorting each listing by name
+    "stat",  # Resolving entry types, and sizes and mtimes with stats
+    "ignore",  # Ignore rule checks
+    "progress_callback",  # Progress callbacks, including the GUI's
+    "walk",  # Everything inside the walk, including the phases above
+    "formatting",  # Turning entries into output, outside the walk
+    "output",  # Time spent by the consumer of the output, e.g. writing or the GUI
+    "total",  # Wall time from the first output to the last
+)
+
+# Counters, in report order
+COUNTERS = (
+    "directories_listed",
+    "cached_listings",  # Directories whose listing came from the snapshot cache
+    "entries_scanned",
+    "entries_stated",
+    "ignore_checks",
+    "ignore_matches",
+    "output_lines",
+    "output_bytes",
+)
+
+
+class RunProfile:
+    """
+    Counters and phase timings for one run of the printer
+
+    Pass an instance as `profile` to walk_tree, iter_entries, iter_structure
+    or print_structure and read it once the run is over, like output_list.
+    Without one, the walk runs unchanged: the hooks are only installed when
+    a profile is given, so a disabled profile costs a single check per
+    directory.
+
+    Listing threads record their scans concurrently; counters are updated
+    under a lock, and with workers the listing time is the sum over threads,
+    so it can exceed the walk's wall time.
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+        self.seconds: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self._lock = threading.Lock()
+
+    def record_scan(self, entries: int, stated: bool, listing: float, sorting: float, stat: float):
+        """Account for one directory listing; safe to call from listing threads"""
+        with self._lock:
+            self.counts["directories_listed"] += 1
+            self.counts["entries_scanned"] += entries
+            if stated:
+                self.counts["entries_stated"] += entries
+            self.seconds["listing"] += listing
+            self.seconds["sorting"] += sorting
+            self.seconds["stat"] += stat
+
+    def count(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.counts[counter] += amount
+
+    def wrap_ignore(self, ignore: Callable[[str, bool], bool]) -> Callable[[str, bool], bool]:
+        """Count and time the checks of an ignore function; only called from the walking thread"""
+        counts, seconds, perf_counter = self.counts, self.seconds, time.perf_counter
+
+        def timed_ignore(rel_path: str, is_dir: bool) -> bool:
+            start = perf_counter()
+            ignored = ignore(rel_path, is_dir)
+            seconds["ignore"] += perf_counter() - start
+            counts["ignore_checks"] += 1
+            if ignored:
+                counts["ignore_matches"] += 1
+            return ignored
+
+        return timed_ignore
+
+    def wrap_callback(self, callback: Callable[[int, int], bool]) -> Callable[[int, int], bool]:
+        """Time a progress callback"""
+        seconds, perf_counter = self.seconds, time.perf_counter
+
+        def timed_callback(current: int, total: int) -> bool:
+            start = perf_counter()
+            result = callback(current, total)
+            seconds["progress_callback"] += perf_counter() - start
+            return result
+
+        return timed_callback
+
+    def time_iter(self, iterable: Iterable[T], phase: str) -> Iterator[T]:
+        """Add the time spent producing each item, not consuming it, to a phase"""
+        perf_counter = time.perf_counter
+        elapsed = 0.0
+        try:
+            start = perf_counter()
+            for item in iterable:
+                elapsed += perf_counter() - start
+                yield item
+                start = perf_counter()
+            elapsed += perf_counter() - start
+        finally:
+            self.seconds[phase] += elapsed
+
+    def measure_output(self, items: Iterable[T]) -> Iterator[T]:
+        """
+        Count output lines and bytes and split the run's time between its phases
+
+        The items must be produced from a walk timed under "walk" (as
+        iter_entries does). Producing them outside the walk counts as
+        formatting, the time between items as output, and the whole as total.
+        """
+        perf_counter = time.perf_counter
+        walk_before = self.seconds["walk"]
+        produced = 0.0
+        lines = 0
+        size = 0
+        started = perf_counter()
+        try:
+            start = started
+            for item in items:
+                produced += perf_counter() - start
+                lines += 1
+                if isinstance(item, str):
+                    size += len(item.encode("utf-8")) + 1  # With its newline
+                yield item
+                start = perf_counter()
+            produced += perf_counter() - start
+        finally:
+            total = perf_counter() - started
+            self.counts["output_lines"] += lines
+            self.counts["output_bytes"] += size
+            self.seconds["formatting"] += max(0.0, produced - (self.seconds["walk"] - walk_before))
+            self.seconds["output"] += max(0.0, total - produced)
+            self.seconds["total"] += total
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return {"counts": dict(self.counts), "seconds": dict(self.seconds)}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def dump(self, output_file: str):
+        """Write the profile to a JSON file"""
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(self.to_json() + "\n")
+
+    def summary_lines(self) -> List[str]:
+        """Human readable report: counters, then each phase with its share of the total"""
+        counts, seconds = self.counts, self.seconds
+        lines = [
+            f"{counts['directories_listed']} directories listed "
+            f"({counts['cached_listings']} from cache), "
+            f"{counts['entries_scanned']} entries scanned, {counts['entries_stated']} stat'ed",
+            f"{counts['ignore_checks']} ignore checks, {counts['ignore_matches']} matched",
+            f"{counts['output_lines']} lines, {counts['output_bytes']} bytes of output",
+        ]
+        total = seconds["total"] or seconds["walk"]
+        for phase in PHASES:
+            share = f" ({seconds[phase] / total:.0%})" if total and phase != "total" else ""
+            lines.append(f"  {phase:<18} {seconds[phase]:8.3f} s{share}")
+        return lines
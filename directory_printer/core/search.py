@@ -0,0 +1,324 @@
+import bisect
+import itertools
+import re
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from directory_printer.core.compact_tree import IS_DIR, CompactTree
+from directory_printer.core.traversal import display_name
+
+# Characters that make a query a glob pattern instead of a substring
+GLOB_CHARS = frozenset("*?[")
+
+# Shortest literal searched for in the joined names; shorter ones hit most names,
+# which are then quicker to test one by one
+MIN_SEARCH_LITERAL = 3
+
+
+class NameIndex:
+    """
+    Inverted index from entry names to the rows of a CompactTree that carry them
+
+    Queries are matched against distinct names, which are far fewer than the
+    rows of a large tree, and never touch the filesystem. Globs with a
+    literal start or end, such as `test_*` or `*.proto`, bisect the names
+    sorted forwards or reversed and only match the range found. Substring
+    queries, and other globs with a literal part, are a linear scan: str.find
+    runs over all names joined into one string, in C, jumping to the next
+    name after each hit, and only the names found are matched exactly.
+    Queries whose literal parts are all shorter than MIN_SEARCH_LITERAL,
+    e.g. `ab` or `*a?b*`, are matched against every name.
+    The tree must be complete.
+    """
+
+    def __init__(self, tree: CompactTree):
+        self.tree = tree
+        rows_by_name: Dict[str, List[int]] = {}
+        for row, name in enumerate(tree.names):
+            if name:  # Placeholder rows have no name
+                rows_by_name.setdefault(name, []).append(row)
+        self.names = list(rows_by_name)
+        self._rows = list(rows_by_name.values())
+        self._folded = [name.casefold() for name in self.names]
+        # Name ids by folded name, and by folded name reversed, with the keys they are sorted on
+        self._forward = sorted(range(len(self.names)), key=self._folded.__getitem__)
+        self._forward_keys = [self._folded[i] for i in self._forward]
+        reversed_names = [name[::-1] for name in self._folded]
+        self._backward = sorted(range(len(self.names)), key=reversed_names.__getitem__)
+        self._backward_keys = [reversed_names[i] for i in self._backward]
+        # Folded names joined by newlines, and the offset of each plus the end; a hit
+        # spanning two names needs a newline in the query, and is dropped by the exact match
+        self._joined = "\n".join(self._folded)
+        self._starts = array(
+            'q', itertools.accumulate((len(name) + 1 for name in self._folded), initial=0)
+        )
+
+    def _with_prefix(self, prefix: str, backward: bool = False) -> List[int]:
+        """Ids of names starting with a folded prefix, or ending with it reversed if `backward`"""
+        if backward:
+            keys, ids = self._backward_keys, self._backward
+        else:
+            keys, ids = self._forward_keys, self._forward
+        start = bisect.bisect_left(keys, prefix)
+        end = bisect.bisect_left(keys, prefix + "\U0010ffff", start)
+        return ids[start:end]
+
+    def _containing(self, literal: str) -> List[int]:
+        """Ids of the names containing a folded literal, in id order"""
+        joined, starts = self._joined, self._starts
+        ids = []
+        position = joined.find(literal)
+        while position >= 0:
+            i = bisect.bisect_right(starts, position) - 1
+            ids.append(i)
+            position = joined.find(literal, starts[i + 1])
+        return ids
+
+    def _candidates(self, name_part: str, is_glob: bool) -> Sequence[int]:
+        """Ids of the names a folded name query may match; no other name can"""
+        if not is_glob:
+            literal = name_part
+        else:
+            literals = _glob_literals(name_part)
+            prefix, suffix = literals[0], literals[-1] if len(literals) > 1 else ""
+            if prefix and len(prefix) >= len(suffix):
+                return self._with_prefix(prefix)
+            if suffix:
+                return self._with_prefix(suffix[::-1], backward=True)
+            literal = max(literals, key=len)
+        if len(literal) < MIN_SEARCH_LITERAL:
+            return range(len(self.names))
+        return self._containing(literal)
+
+    def search(self, query: str, case_sensitive: bool = False) -> array:
+        """
+        Rows whose name matches a query, in display order
+
+        A query containing *, ? or [ is a glob; otherwise it matches names
+        containing it. With a '/', the part before the last '/' must match
+        the directory the entry is in: `migrations/*.py`, `src/**/*.proto`,
+        or `db/migrations` as a substring of the path. As in .gitignore, `*`
+        stays within one path segment, `**` spans directories, and a leading
+        '/' anchors the query to the root.
+        """
+        query = query.strip()
+        anchored = query.startswith("/")
+        query = query.strip("/")
+        if not query:
+            return array('i')
+        is_glob = not GLOB_CHARS.isdisjoint(query)
+        names = self.names if case_sensitive else self._folded
+        if not case_sensitive:
+            query = query.casefold()
+
+        dir_part, _, name_part = query.rpartition("/")
+        literal = name_part.casefold() if case_sensitive else name_part
+        candidates = self._candidates(literal, is_glob)
+        if is_glob:
+            pattern = re.compile(glob_to_regex(name_part))
+            candidates = [i for i in candidates if pattern.match(names[i])]
+        else:
+            candidates = [i for i in candidates if name_part in names[i]]
+
+        rows = sorted(itertools.chain.from_iterable(self._rows[i] for i in candidates))
+        if dir_part:
+            rows = self._filter_paths(rows, query, dir_part, is_glob, anchored, case_sensitive)
+        return array('i', rows)
+
+    def _filter_paths(self, rows: List[int], query: str, dir_part: str, is_glob: bool,
+                      anchored: bool, case_sensitive: bool) -> List[int]:
+        """Keep candidate rows, already matched by their name, whose path matches the whole query"""
+        tree = self.tree
+        dir_paths: Dict[int, str] = {}
+
+        def dir_path(parent: int) -> str:
+            # Candidates often share directories, so each directory's path is built once
+            path = dir_paths.get(parent)
+            if path is None:
+                path = tree.rel_path(parent) if parent >= 0 else ""
+                path = dir_paths[parent] = path if case_sensitive else path.casefold()
+            return path
+
+        kept = []
+        if is_glob:
+            if dir_part == "**":
+                return rows  # Any directory, including the root
+            # Only the directory is left to check, once per distinct parent; a trailing
+            # "/**" also matches the directory itself, as "a/**/b" matches "a/b"
+            recursive = dir_part.endswith("/**")
+            body = _glob_body(dir_part[:-3] if recursive else dir_part)
+            pattern = re.compile(
+                ("" if anchored else "(?:.*/)?")
+                + "(?s:" + body + ("(?:/.*)?" if recursive else "") + r")\Z"
+            )
+            parents = tree.parents
+            matched = {
+                parent for parent in set(map(parents.__getitem__, rows))
+                if parent >= 0 and pattern.match(dir_path(parent))
+            }
+            kept = [row for row in rows if parents[row] in matched]
+        else:
+            for row in rows:
+                parent = tree.parents[row]
+                name = tree.names[row] if case_sensitive else tree.names[row].casefold()
+                rel_path = f"{dir_path(parent)}/{name}" if parent >= 0 else name
+                if rel_path.startswith(query) if anchored else query in rel_path:
+                    kept.append(row)
+        return kept
+
+
+def _glob_literals(pattern: str) -> List[str]:
+    """
+    The literal runs of a glob, split at each wildcard or character class
+
+    The first run is the literal start of the pattern and, when there is
+    more than one, the last is its literal end; either may be empty.
+    """
+    literals = []
+    current = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char in "*?" or (char == "[" and "]" in pattern[i + 2:]):
+            literals.append("".join(current))
+            current = []
+            i = pattern.index("]", i + 2) + 1 if char == "[" else i + 1
+            continue
+        current.append(char)
+        i += 1
+    literals.append("".join(current))
+    return literals
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate a glob to a regex matching a whole path; `*` and `?` stop at '/', `**` does not"""
+    return "(?s:" + _glob_body(pattern) + r")\Z"
+
+
+def _glob_body(pattern: str) -> str:
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[" and "]" in pattern[i + 2:]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+            continue
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return "".join(parts)
+
+
+def with_ancestors(tree: CompactTree, rows: Iterable[int]) -> array:
+    """Rows plus every directory above them, in display order"""
+    keep = bytearray(tree.count)
+    parents = tree.parents
+    for row in rows:
+        keep[row] = 1
+    # Matches share few distinct parents; walk up from each until a kept row is reached
+    for parent in set(map(parents.__getitem__, rows)):
+        while parent >= 0 and not keep[parent]:
+            keep[parent] = 1
+            parent = parents[parent]
+    return array('i', itertools.compress(range(tree.count), keep))
+
+
+class FilteredLines(Sequence):
+    """
+    Lines of a CompactTree pruned to a subset of rows, rendered only when read
+
+    Rows must be in display order and include their ancestors (see
+    with_ancestors). Tree symbols are drawn for the pruned tree: a row is
+    last if no later row with the same parent was kept. `matches` counts the
+    rows that matched, without the ancestors kept around them.
+    """
+
+    def __init__(self, tree: CompactTree, rows: array, header: Iterable[str] = (), prefix: str = "",
+                 matches: Optional[int] = None):
+        self.tree = tree
+        self.rows = rows
+        self.header = list(header)
+        self.prefix = prefix
+        self.matches = len(rows) if matches is None else matches
+        # Whether each kept row is the last kept child of its parent
+        self._last = bytearray(len(rows))
+        last_child: Dict[int, int] = {}
+        parents = tree.parents
+        for index, row in enumerate(rows):
+            last_child[parents[row]] = index
+        for index in last_child.values():
+            self._last[index] = 1
+
+    def __len__(self) -> int:
+        return len(self.header) + len(self.rows)
+
+    def row(self, index: int) -> Optional[int]:
+        """Tree row shown at a line index, or None for header lines"""
+        index -= len(self.header)
+        return self.rows[index] if index >= 0 else None
+
+    def _is_last(self, row: int) -> bool:
+        return bool(self._last[bisect.bisect_left(self.rows, row)])
+
+    def _line(self, index: int) -> str:
+        row = self.row(index)
+        if row is None:
+            return self.header[index]
+        segments = []
+        parent = self.tree.parents[row]
+        while parent >= 0:
+            segments.append("    " if self._is_last(parent) else "│   ")
+            parent = self.tree.parents[parent]
+        segments.append(self.prefix)
+        symbol = "└── " if self._last[index - len(self.header)] else "├── "
+        name = display_name(self.tree.names[row], self.tree.links.get(row))
+        return "".join(reversed(segments)) + symbol + name
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._line(index) for index in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError(key)
+        return self._line(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.header
+        tree = self.tree
+        names, depths, flags, links = tree.names, tree.depths, tree.flags, tree.links
+        # Full line prefix for each depth, built once per directory
+        prefixes = [self.prefix]
+        for row, last in zip(self.rows, self._last):
+            del prefixes[depths[row]:]
+            current_prefix = prefixes[-1]
+            name = names[row] if row not in links else display_name(names[row], links[row])
+            yield f"{current_prefix}{'└── ' if last else '├── '}{name}"
+            if flags[row] & IS_DIR:
+                prefixes.append(current_prefix + ("    " if last else "│   "))
+
+
+def filter_tree(tree: CompactTree, query: str, index: Optional[NameIndex] = None,
+                header: Iterable[str] = (), case_sensitive: bool = False) -> FilteredLines:
+    """Prune a tree to the entries matching a query and their ancestors"""
+    if index is None:
+        index = NameIndex(tree)
+    rows = index.search(query, case_sensitive)
+    return FilteredLines(tree, with_ancestors(tree, rows), header, matches=len(rows))
@@ -0,0 +1,155 @@
+import heapq
+from typing import Iterable, List, Optional, Tuple
+
+from directory_printer.core.traversal import TreeEntry
+
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+
+def format_size(size: int) -> str:
+    """Human readable size in 1024-based units, e.g. '512 B' or '1.5 MB'"""
+    value = float(size)
+    for unit in SIZE_UNITS:
+        if value < 1024 or unit == SIZE_UNITS[-1]:
+            break
+        value /= 1024
+    return f"{size} B" if unit == "B" else f"{value:.1f} {unit}"
+
+
+def plural(count: int, noun: str) -> str:
+    """The noun for a count, e.g. 'file' for 1 and 'files' otherwise"""
+    return noun if count == 1 else f"{noun}s"
+
+
+class SizeSummary:
+    """
+    Recursive byte and file totals for the entries of one walk
+
+    `totals` runs parallel to `entries`: (bytes, files) for each file and the
+    recursive totals for each directory, or None for directories whose
+    contents were not listed (at max_depth), for symbolic links that were
+    not walked as directories and for placeholder entries. Such links are
+    counted in `total_links` only: like du, neither their own size nor their
+    target's is added.
+    `largest` holds the top directories by bytes as (bytes, files, rel_path),
+    largest first. `partial` is set when some contents were not listed, so
+    the totals only cover what was walked.
+    """
+
+    def __init__(self, entries: List[TreeEntry], totals: List[Optional[Tuple[int, int]]],
+                 largest: List[Tuple[int, int, str]], total_bytes: int, total_files: int,
+                 partial: bool = False, total_links: int = 0):
+        self.entries = entries
+        self.totals = totals
+        self.largest = largest
+        self.total_bytes = total_bytes
+        self.total_files = total_files
+        self.partial = partial
+        self.total_links = total_links
+
+    def labels(self) -> List[Optional[str]]:
+        """Annotation for each entry, for format_tree"""
+        labels = []
+        for entry, total in zip(self.entries, self.totals):
+            if total is None:
+                labels.append(None)
+            elif entry.is_dir:
+                labels.append(f"{format_size(total[0])}, {total[1]} {plural(total[1], 'file')}")
+            else:
+                labels.append(format_size(total[0]))
+        return labels
+
+    def summary_lines(self) -> List[str]:
+        """Total and largest-subtree lines to print below the tree"""
+        total = "Total of listed entries" if self.partial else "Total"
+        files = f"{self.total_files} {plural(self.total_files, 'file')}"
+        total = f"{total}: {format_size(self.total_bytes)} in {files}"
+        if self.total_links:
+            total += f" and {self.total_links} {plural(self.total_links, 'symbolic link')}"
+        lines = ["", total]
+        if self.largest:
+            lines.append("Largest directories:")
+            width = max(len(format_size(size)) for size, _, _ in self.largest)
+            for size, files, rel_path in self.largest:
+                lines.append(
+                    f"  {format_size(size):>{width}}  {files:>8} {plural(files, 'file'):<5}  "
+                    f"{rel_path}"
+                )
+        return lines
+
+
+def summarize_sizes(
+    entries: Iterable[TreeEntry],
+    largest: int = 0,
+    max_depth: Optional[int] = None
+) -> SizeSummary:
+    """
+    Roll file sizes up into per-directory totals in one pass over the entries
+
+    Entries must come from walk_tree with stats=True, in display order. Each
+    directory's totals are added to its parent as soon as its last entry has
+    been seen, and only the `largest` biggest directories are kept, on a heap
+    bounded to that size. Symbolic links that were not walked as directories
+    add no bytes and are not counted as files; they are counted in
+    `total_links`.
+
+    Args:
+        entries: walk_tree entries with file sizes
+        largest: Number of largest directories to report (0 disables)
+        max_depth: The max_depth the entries were walked with; directories at
+                   that depth were not listed and get no totals
+    """
+    entries = list(entries)
+    totals: List[Optional[List[int]]] = [None] * len(entries)
+    root = [0, 0]
+    # Open directories as (depth, index into entries), innermost last
+    stack: List[Tuple[int, int]] = []
+    heap: List[Tuple[int, int, str]] = []
+    partial = False
+    links = 0
+
+    def close():
+        _, index = stack.pop()
+        total = totals[index]
+        parent = totals[stack[-1][1]] if stack else root
+        parent[0] += total[0]
+        parent[1] += total[1]
+        if largest > 0:
+            item = (total[0], total[1], entries[index].rel_path)
+            if len(heap) < largest:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+    for index, entry in enumerate(entries):
+        if entry.error is not None:
+            partial = True  # Unreadable directory or entries cut off by max_entries
+            continue
+        while stack and stack[-1][0] >= entry.depth:
+            close()
+        if entry.is_dir:
+            if max_depth is None or entry.depth < max_depth:
+                totals[index] = [0, 0]
+                stack.append((entry.depth, index))
+            else:
+                partial = True
+            continue
+        if entry.link is not None:
+            links += 1  # The link's own size is not the target's, which may also be in the tree
+            continue
+        totals[index] = [entry.size, 1]
+        parent = totals[stack[-1][1]] if stack else root
+        parent[0] += entry.size
+        parent[1] += 1
+    while stack:
+        close()
+
+    return SizeSummary(
+        entries,
+        [tuple(total) if total is not None else None for total in totals],
+        sorted(heap, reverse=True),
+        root[0],
+        root[1],
+        partial,
+        links
+    )
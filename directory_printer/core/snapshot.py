@@ -0,0 +1,139 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Listings of directories modified this recently are not stored, since a
+# change within the same mtime tick would go unnoticed on the next run
+RACY_WINDOW_NS = 2_000_000_000
+
+# Default number of directory listings kept across all roots
+DEFAULT_MAX_DIRECTORIES = 200_000
+
+# An unchanged snapshot is only rewritten to refresh its recency after this long
+RECENCY_REFRESH_SECONDS = 3600
+
+SNAPSHOT_VERSION = 3
+
+# A directory listing as stored in the snapshot: (name, is_dir, link target) after ignore
+# filtering. Each is stored as [mtime_ns, listing, ignore_key].
+Listing = List[Tuple[str, bool, Optional[str]]]
+
+
+class Snapshot:
+    """
+    Directory listings of one root under one ignore spec
+
+    Listings from the previous run are looked up by relative directory and
+    only reused while the directory mtime is unchanged. Every listing used or
+    made during the current walk is recorded again, so directories that no
+    longer exist drop out of the snapshot when it is saved.
+    """
+
+    def __init__(self, key: str, previous: Optional[Dict[str, list]] = None):
+        self.key = key
+        self._previous = previous or {}
+        self.directories: Dict[str, list] = {}
+        # Set by the walker once every directory has been visited
+        self.complete = False
+        self._changed = False
+
+    def lookup(self, rel_dir: str, mtime_ns: int, ignore_key: str = "") -> Optional[Listing]:
+        """Return the cached listing of a directory if its mtime and ignore rules are unchanged"""
+        cached = self._previous.get(rel_dir)
+        if cached is None or cached[0] != mtime_ns or cached[2] != ignore_key:
+            self._changed = True
+            return None
+        self.directories[rel_dir] = cached
+        return cached[1]
+
+    @property
+    def changed(self) -> bool:
+        """Whether the walk found listings that differ from the previous run"""
+        return self._changed or len(self.directories) != len(self._previous)
+
+    def store(self, rel_dir: str, mtime_ns: int, listing: Listing, ignore_key: str = ""):
+        """Record a freshly scanned listing"""
+        if time.time_ns() - mtime_ns < RACY_WINDOW_NS:
+            return
+        self.directories[rel_dir] = [mtime_ns, listing, ignore_key]
+
+
+class SnapshotCache:
+    """
+    Persistent cache of directory listings, stored next to the configuration
+
+    Snapshots are keyed by root path and ignore spec digest. The total number
+    of directory listings is bounded; when it is exceeded, the least recently
+    used roots are evicted first.
+    """
+
+    def __init__(
+        self,
+        cache_file: Optional[str] = None,
+        max_directories: int = DEFAULT_MAX_DIRECTORIES
+    ):
+        if cache_file is None:
+            cache_file = os.path.join(str(Path.home()), '.directory_printer', 'snapshots.json')
+        self.cache_file = cache_file
+        self.max_directories = max_directories
+        self._roots: Optional[Dict[str, dict]] = None
+
+    def _load(self) -> Dict[str, dict]:
+        """Load snapshots from disk, starting empty if the file is missing or unreadable"""
+        if self._roots is None:
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') != SNAPSHOT_VERSION:
+                    raise ValueError("Unsupported snapshot version")
+                self._roots = data['roots']
+            except Exception:
+                self._roots = {}
+        return self._roots
+
+    def open(self, root: str, ignore_digest: str = "") -> Snapshot:
+        """Open the snapshot of a root for a walk"""
+        key = f"{ignore_digest}:{os.path.abspath(root)}"
+        stored = self._load().get(key)
+        return Snapshot(key, stored['directories'] if stored else None)
+
+    def save(self, snapshot: Snapshot):
+        """Store a walked snapshot as the most recently used and write the cache file"""
+        if not snapshot.complete:
+            return  # A stopped walk would drop the listings it never reached
+        now = time.time()
+        stored = self._load().pop(snapshot.key, None)
+        self._roots[snapshot.key] = {'last_used': now, 'directories': snapshot.directories}
+        self._evict()
+        if stored and not snapshot.changed and now - stored['last_used'] < RECENCY_REFRESH_SECONDS:
+            return  # Nothing new to write; recency is kept in memory until the next write
+
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        temp_file = f"{self.cache_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': SNAPSHOT_VERSION, 'roots': self._roots}, f, separators=(',', ':'))
+        os.replace(temp_file, self.cache_file)
+
+    def clear(self):
+        """Remove every snapshot"""
+        self._roots = {}
+        if os.path.exists(self.cache_file):
+            os.remove(self.cache_file)
+
+    def _evict(self):
+        """Keep the most recently used roots that fit within max_directories"""
+        budget = self.max_directories
+        kept = {}
+        by_last_use = sorted(
+            self._roots.items(), key=lambda item: item[1]['last_used'], reverse=True
+        )
+        for key, stored in by_last_use:
+            size = len(stored['directories'])
+            if size > budget:
+                continue
+            budget -= size
+            kept[key] = stored
+        # Insert oldest first so the file stays in LRU order
+        self._roots = dict(reversed(list(kept.items())))
@@ -0,0 +1,349 @@
+import itertools
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from directory_printer.core.snapshot import Snapshot
+
+# Error kinds reported in place of a directory listing
+PERMISSION_DENIED = "permission_denied"
+NOT_FOUND = "not_found"
+# Kind of the marker yielded in place of entries left out by max_entries
+TRUNCATED = "truncated"
+# Kinds reported in place of the listing of a directory that is deliberately not walked:
+# one already listed through another path (a symlink loop, bind mount or hardlink),
+# and one on another filesystem than the root
+ALREADY_LISTED = "already_listed"
+OTHER_FILESYSTEM = "other_filesystem"
+
+# Lines shown in place of a directory's listing, by error kind
+PLACEHOLDERS = {
+    PERMISSION_DENIED: "[Permission Denied]",
+    ALREADY_LISTED: "[Already listed]",
+    OTHER_FILESYSTEM: "[Other filesystem]",
+}
+
+# Maximum number of prefetched listings waiting to be consumed, per worker thread
+PREFETCH_PER_WORKER = 16
+
+
+class TreeEntry(NamedTuple):
+    """A single node produced by the traversal, in display order"""
+    name: str
+    path: str
+    rel_path: str
+    depth: int
+    is_dir: bool
+    is_last: bool
+    error: Optional[str] = None
+    omitted: int = 0  # Number of entries left out, for TRUNCATED markers
+    size: int = 0  # File size in bytes, when the walk collects stats
+    mtime: float = 0.0  # Modification time in seconds since the epoch, when the walk collects stats
+    link: Optional[str] = None  # Target of a symbolic link
+
+
+def display_name(name: str, link: Optional[str]) -> str:
+    """An entry's name as shown in the tree, with `-> target` for symbolic links"""
+    return f"{name} -> {link}" if link is not None else name
+
+
+def scan_directory(path: str) -> List[os.DirEntry]:
+    """List a directory once with os.scandir, sorted by name"""
+    with os.scandir(path) as it:
+        entries = list(it)
+    entries.sort(key=lambda entry: entry.name)
+    return entries
+
+
+def _is_dir(entry: os.DirEntry, follow_symlinks: bool = True) -> bool:
+    """Check entry type using the cached DirEntry information"""
+    try:
+        return entry.is_dir(follow_symlinks=follow_symlinks)
+    except OSError:
+        return False
+
+
+def _link_target(entry: os.DirEntry) -> Optional[str]:
+    """
+    Target of a symbolic link, or None for other entries; the type check uses
+    the cached DirEntry information
+    """
+    try:
+        return os.readlink(entry.path) if entry.is_symlink() else None
+    except OSError:
+        return None
+
+
+# (size, mtime) of an entry whose stats were not collected
+NO_STATS = (0, 0.0)
+
+
+def _entry_stats(entry: os.DirEntry, is_dir: bool) -> Tuple[int, float]:
+    """
+    File size (0 for directories) and mtime from a DirEntry, cached on Windows
+
+    Symbolic links are not followed: a link gets the size of the link itself,
+    which summarize_sizes leaves out of the totals.
+    """
+    try:
+        st = entry.stat(follow_symlinks=False)
+    except OSError:
+        return NO_STATS
+    return (0 if is_dir else st.st_size, st.st_mtime)
+
+
+# A listed entry: the DirEntry, whether it is walked as a directory, (size, mtime) and its
+# link target
+Scanned = Tuple[os.DirEntry, bool, Tuple[int, float], Optional[str]]
+
+
+def _resolve_types(
+    entries: List[os.DirEntry], stats: bool = False, follow_symlinks: bool = False
+) -> List[Scanned]:
+    """
+    Resolve the type, link target and optionally the size and mtime of each listed entry
+
+    A symbolic link to a directory only counts as a directory when links are followed.
+    """
+    scanned = []
+    for entry in entries:
+        link = _link_target(entry)
+        is_dir = _is_dir(entry, follow_symlinks or link is None)
+        scanned.append((entry, is_dir, _entry_stats(entry, is_dir) if stats else NO_STATS, link))
+    return scanned
+
+
+def _scan_with_types(
+    path: str, stats: bool = False, follow_symlinks: bool = False
+) -> List[Scanned]:
+    """List a directory and resolve the type, and optionally the size and mtime, of each entry"""
+    return _resolve_types(scan_directory(path), stats, follow_symlinks)
+
+
+def _scan_profiled(
+    path: str, stats: bool = False, follow_symlinks: bool = False, profile=None
+) -> List[Scanned]:
+    """
+    _scan_with_types, recording the time spent listing, sorting and resolving
+    types in a RunProfile
+    """
+    start = time.perf_counter()
+    with os.scandir(path) as it:
+        entries = list(it)
+    listed = time.perf_counter()
+    entries.sort(key=lambda entry: entry.name)
+    sorted_at = time.perf_counter()
+    scanned = _resolve_types(entries, stats, follow_symlinks)
+    profile.record_scan(
+        len(entries), stats, listed - start, sorted_at - listed, time.perf_counter() - sorted_at
+    )
+    return scanned
+
+
+def walk_tree(
+    path: str,
+    ignore: Optional[Callable[[str, bool], bool]] = None,
+    progress_callback: Optional[Callable[[int, int], bool]] = None,
+    workers: int = 0,
+    snapshot: Optional[Snapshot] = None,
+    max_depth: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    stats: bool = False,
+    profile=None,
+    follow_symlinks: bool = False,
+    one_filesystem: bool = False
+) -> Iterator[TreeEntry]:
+    """
+    Walk a directory tree in a single pass, yielding entries in display order
+
+    Every directory is listed exactly once. The progress total is a running
+    count of the entries discovered so far, so no separate pre-scan is needed.
+
+    Args:
+        path: Root directory to walk
+        ignore: Function(rel_path, is_dir) -> bool, True to drop the entry
+        progress_callback: Callback function(current, total) -> bool for progress updates
+                         Returns False to stop the walk
+        workers: Number of threads prefetching subdirectory listings; 0 lists
+                 every directory on the calling thread. Output order is the same.
+        snapshot: Listings from a previous walk with the same ignore function;
+                  a directory whose mtime is unchanged is not listed again. If the
+                  ignore function has digest_for(rel_dir), its per-directory digest
+                  must also be unchanged.
+        max_depth: Deepest level to list; directories at this depth are yielded
+                   but never listed. None walks the whole tree.
+        max_entries: Stop after yielding this many entries. Directories that
+                     were not reached are never listed; for each directory with
+                     siblings left over, a TRUNCATED entry counting them is
+                     yielded instead. None yields every entry.
+        stats: Set TreeEntry.size and TreeEntry.mtime from the same scan. Cached
+               listings carry no stats, so the snapshot is not used.
+        profile: RunProfile recording listings, ignore checks and callbacks
+        follow_symlinks: Walk into symbolic links to directories. By default links
+                         are yielded with their target in TreeEntry.link and not followed.
+        one_filesystem: Do not walk into directories on another filesystem than the
+                        root, such as network mounts; an OTHER_FILESYSTEM entry is
+                        yielded in place of their listing.
+
+    With follow_symlinks or one_filesystem, every directory is stat'ed before
+    it is listed and each (st_dev, st_ino) is only listed once: a directory
+    reached again, through a symlink loop, bind mount or hardlinked
+    directory, gets an ALREADY_LISTED entry in place of its listing.
+    """
+    current = 0
+    discovered = 0
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 0 else None
+    prefetch_limit = workers * PREFETCH_PER_WORKER
+    # Listings submitted to the pool, keyed by directory path
+    pending: Dict[str, Future] = {}
+    # Per-directory rules, e.g. from nested ignore files, that cached listings depend on
+    digest_for = getattr(ignore, "digest_for", None) if snapshot is not None else None
+    if stats:
+        snapshot = None  # A directory's mtime does not change when its files grow
+    scan = partial(_scan_with_types, stats=stats, follow_symlinks=follow_symlinks)
+    if profile is not None:
+        # Instrumented stand-ins are only swapped in when profiling, keeping the plain walk
+        # untouched
+        scan = partial(
+            _scan_profiled, stats=stats, follow_symlinks=follow_symlinks, profile=profile
+        )
+        if ignore:
+            ignore = profile.wrap_ignore(ignore)
+        if progress_callback:
+            progress_callback = profile.wrap_callback(progress_callback)
+
+    def _list(dir_path: str, rel_dir: str, depth: int):
+        nonlocal discovered
+        future = pending.pop(dir_path, None)
+        listing = None
+        entry_stats: List[Tuple[int, float]] = []
+        if snapshot is not None:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+            ignore_key = digest_for(rel_dir) if digest_for else ""
+            listing = snapshot.lookup(rel_dir, mtime_ns, ignore_key)
+            if listing is not None:
+                if future is not None:
+                    future.cancel()
+                if profile is not None:
+                    profile.count("cached_listings")
+
+        if listing is None:
+            scanned = future.result() if future is not None else scan(dir_path)
+            listing = []
+            for entry, is_dir, entry_stat, link in scanned:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if ignore and ignore(rel_path, is_dir):
+                    continue
+                listing.append((entry.name, is_dir, link))
+                entry_stats.append(entry_stat)
+            if snapshot is not None:
+                snapshot.store(rel_dir, mtime_ns, listing, ignore_key)
+
+        children = [
+            (
+                name, os.path.join(dir_path, name), f"{rel_dir}/{name}" if rel_dir else name,
+                is_dir, entry_stat, link
+            )
+            for (name, is_dir, link), entry_stat
+            in zip(listing, entry_stats or itertools.repeat(NO_STATS))
+        ]
+        discovered += len(children)
+
+        if executor is not None and (max_depth is None or depth < max_depth):
+            for _, child_path, _, is_dir, _, _ in children:
+                if len(pending) >= prefetch_limit:
+                    break
+                if is_dir:
+                    pending[child_path] = executor.submit(scan, child_path)
+        return [children, 0, depth]
+
+    def _error(dir_path: str, rel_dir: str, depth: int, kind: str) -> TreeEntry:
+        return TreeEntry("", dir_path, rel_dir, depth, False, True, kind)
+
+    # (st_dev, st_ino) of every directory listed so far, when tracked
+    visited = set() if follow_symlinks or one_filesystem else None
+    root_dev = None
+
+    def _skip_reason(dir_path: str) -> Optional[str]:
+        """Why a directory must not be listed, recording it as visited otherwise"""
+        try:
+            st = os.stat(dir_path)
+        except OSError:
+            return None  # Reported by the listing itself
+        if one_filesystem and root_dev is not None and st.st_dev != root_dev:
+            return OTHER_FILESYSTEM
+        key = (st.st_dev, st.st_ino)
+        if key in visited:
+            return ALREADY_LISTED
+        visited.add(key)
+        return None
+
+    try:
+        if visited is not None:
+            try:
+                root_dev = os.stat(path).st_dev
+            except OSError:
+                pass  # Reported by the listing itself
+            _skip_reason(path)
+        try:
+            stack = [_list(path, "", 1)]
+        except PermissionError:
+            yield _error(path, "", 1, PERMISSION_DENIED)
+            return
+        except FileNotFoundError:
+            yield _error(path, "", 1, NOT_FOUND)
+            return
+
+        while stack:
+            frame = stack[-1]
+            children, index, depth = frame
+            if index >= len(children):
+                stack.pop()
+                continue
+            frame[1] = index + 1
+
+            name, child_path, rel_path, is_dir, (size, mtime), link = children[index]
+            yield TreeEntry(
+                name, child_path, rel_path, depth, is_dir, index == len(children) - 1,
+                size=size, mtime=mtime, link=link
+            )
+
+            current += 1
+            if progress_callback and not progress_callback(
+                current, discovered if max_entries is None else min(discovered, max_entries)
+            ):
+                return
+
+            if max_entries is not None and current >= max_entries:
+                # Close every open directory with a count of what was left out
+                for children, index, depth in reversed(stack):
+                    if index < len(children):
+                        _, child_path, rel_path, _, _, _ = children[index]
+                        yield TreeEntry(
+                            "", os.path.dirname(child_path), rel_path.rpartition("/")[0], depth,
+                            False, True, TRUNCATED, len(children) - index
+                        )
+                return
+
+            if is_dir and (max_depth is None or depth < max_depth):
+                reason = _skip_reason(child_path) if visited is not None else None
+                if reason is not None:
+                    future = pending.pop(child_path, None)
+                    if future is not None:
+                        future.cancel()
+                    yield _error(child_path, rel_path, depth + 1, reason)
+                    continue
+                try:
+                    stack.append(_list(child_path, rel_path, depth + 1))
+                except PermissionError:
+                    yield _error(child_path, rel_path, depth + 1, PERMISSION_DENIED)
+                except FileNotFoundError:
+                    yield _error(child_path, rel_path, depth + 1, NOT_FOUND)
+
+        if snapshot is not None:
+            snapshot.complete = True
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,255 @@
+"""
+Compare two directory trees through per-directory Merkle hashes
+
+Each directory is hashed from the sorted names, types and hashes of its
+children as the tree is read, so two trees are compared top-down and an
+identical subtree is skipped after one digest comparison, however large it
+is. Trees are read from a live directory or from a saved JSON, NDJSON or
+CSV export, in the same record form.
+"""
+import hashlib
+import os
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional
+
+from directory_printer.core.export import iter_records, read_records, Record
+from directory_printer.core.git_index import SOURCE_WALK
+from directory_printer.core.printer import iter_entries
+from directory_printer.core.sizes import format_size
+
+# Status of a DiffEntry
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+# Marker shown before the name of an entry, by status
+MARKERS = {ADDED: "+", REMOVED: "-", CHANGED: "~"}
+
+# Bytes per digest; collisions between two trees are not a practical concern at this size
+DIGEST_SIZE = 16
+
+
+class HashedNode:
+    """
+    One entry of a hashed tree
+
+    `kind` is the export type: "file", "directory" or "symlink". Directories
+    hold their children by name and count the files and directories below
+    them. `digest` is set once the entry is complete: for a file or link,
+    from its type, a link's target and, when compared, its size and mtime;
+    for a directory, from the names and digests of its children.
+    """
+
+    __slots__ = ("kind", "size", "mtime", "target", "children", "files", "directories", "digest")
+
+    def __init__(
+        self,
+        kind: str,
+        size: Optional[int] = None,
+        mtime: float = 0.0,
+        target: Optional[str] = None
+    ):
+        self.kind = kind
+        self.size = size
+        self.mtime = mtime
+        self.target = target
+        self.children: Optional[Dict[str, "HashedNode"]] = {} if kind == "directory" else None
+        self.files = 0
+        self.directories = 0
+        self.digest = b""
+
+    @property
+    def is_dir(self) -> bool:
+        return self.children is not None
+
+
+def _close(node: HashedNode):
+    """Hash a directory whose children are all complete, and roll up its counts"""
+    digest = hashlib.blake2b(b"directory", digest_size=DIGEST_SIZE)
+    for name in sorted(node.children):
+        child = node.children[name]
+        digest.update(os.fsencode(name) + b"\0" + child.digest)
+        if child.is_dir:
+            node.files += child.files
+            node.directories += child.directories + 1
+        else:
+            node.files += 1
+    node.digest = digest.digest()
+
+
+def hash_records(
+    records: Iterable[Record], sizes: bool = False, mtimes: bool = False
+) -> HashedNode:
+    """
+    Build the hashed tree of a walk or an export, hashing each directory as
+    soon as it is complete
+
+    Records must be in walk order, each directory before its contents, as
+    walk_tree and the exports produce them.
+
+    Args:
+        records: Export records, from iter_records or read_records
+        sizes: Include file sizes in the hashes
+        mtimes: Include file modification times in the hashes
+    """
+    root = HashedNode("directory")
+    # Directories whose contents are still being read, from the root down, with their relative paths
+    stack = [("", root)]
+    for rel_path, _, kind, size, mtime, target in records:
+        parent_path, _, name = rel_path.rpartition("/")
+        while stack[-1][0] != parent_path:
+            _close(stack.pop()[1])
+            if not stack:
+                raise ValueError(f"Records are not in walk order at '{rel_path}'")
+        node = HashedNode(kind, size, mtime, target)
+        stack[-1][1].children[name] = node
+        if node.is_dir:
+            stack.append((rel_path, node))
+            continue
+        fields = kind
+        if target is not None:
+            fields += f"\0{target}"
+        if sizes:
+            fields += f"\0{size}"
+        if mtimes:
+            fields += f"\0{mtime!r}"
+        node.digest = hashlib.blake2b(
+            fields.encode("utf-8", "surrogateescape"), digest_size=DIGEST_SIZE
+        ).digest()
+    while stack:
+        _close(stack.pop()[1])
+    return root
+
+
+def load_tree(
+    path: str,
+    sizes: bool = False,
+    mtimes: bool = False,
+    gitignore_path: Optional[str] = None,
+    workers: int = 0,
+    nested_ignore: bool = False,
+    follow_symlinks: bool = False,
+    one_filesystem: bool = False,
+    source: str = SOURCE_WALK
+) -> HashedNode:
+    """
+    Hash a live directory, walked as iter_entries does, or a saved JSON, NDJSON or CSV export
+
+    The walk options only apply to directories; an export holds whatever
+    was walked when it was saved. Placeholders for unreadable or skipped
+    directories are left out, as in the exports.
+    """
+    if os.path.isdir(path):
+        records = iter_records(iter_entries(
+            path, gitignore_path, workers=workers, nested_ignore=nested_ignore,
+            stats=sizes or mtimes, follow_symlinks=follow_symlinks,
+            one_filesystem=one_filesystem, source=source
+        ))
+    else:
+        records = read_records(path)
+    return hash_records(records, sizes, mtimes)
+
+
+class DiffEntry(NamedTuple):
+    """A difference between two trees, in display order"""
+    name: str
+    rel_path: str
+    depth: int
+    is_dir: bool
+    is_last: bool  # Last among the differences shown in its directory
+    status: str
+    old: Optional[HashedNode]  # None for added entries
+    new: Optional[HashedNode]  # None for removed entries
+
+
+def _changes(old: HashedNode, new: HashedNode):
+    """
+    Children of two differing directories that differ, by name; a changed type
+    is a removal and an addition
+    """
+    changes = []
+    old_children, new_children = old.children, new.children
+    for name in sorted(old_children.keys() | new_children.keys()):
+        before, after = old_children.get(name), new_children.get(name)
+        if before is not None and after is not None and before.digest == after.digest:
+            continue  # Identical subtree: nothing below it is visited
+        if after is None:
+            changes.append((name, REMOVED, before, None))
+        elif before is None:
+            changes.append((name, ADDED, None, after))
+        elif before.kind != after.kind:
+            changes.append((name, REMOVED, before, None))
+            changes.append((name, ADDED, None, after))
+        else:
+            changes.append((name, CHANGED, before, after))
+    return changes
+
+
+def diff_trees(old: HashedNode, new: HashedNode) -> Iterator[DiffEntry]:
+    """
+    Yield the added, removed and changed entries between two hashed trees, in display order
+
+    Only directories whose digests differ are descended into. Added and
+    removed directories are yielded once, without their contents.
+    """
+    if old.digest == new.digest:
+        return
+    stack = [[_changes(old, new), 0, 1, ""]]
+    while stack:
+        frame = stack[-1]
+        changes, index, depth, rel_dir = frame
+        if index >= len(changes):
+            stack.pop()
+            continue
+        frame[1] = index + 1
+
+        name, status, before, after = changes[index]
+        node = after if after is not None else before
+        rel_path = f"{rel_dir}/{name}" if rel_dir else name
+        yield DiffEntry(
+            name, rel_path, depth, node.is_dir, index == len(changes) - 1, status, before, after
+        )
+        if status == CHANGED and node.is_dir:
+            stack.append([_changes(before, after), 0, depth + 1, rel_path])
+
+
+def _detail(entry: DiffEntry) -> str:
+    """What changed about an entry, shown after its name"""
+    if entry.is_dir:
+        if entry.status == CHANGED:
+            return ""
+        node = entry.new if entry.status == ADDED else entry.old
+        return f"  ({node.files} files, {node.directories} directories)"
+    if entry.status != CHANGED:
+        return ""
+    before, after = entry.old, entry.new
+    if before.target != after.target:
+        return f"  (-> {before.target} now -> {after.target})"
+    if before.size != after.size and before.size is not None and after.size is not None:
+        return f"  ({format_size(before.size)} -> {format_size(after.size)})"
+    return "  (modified)"
+
+
+def format_diff(diffs: Iterable[DiffEntry], prefix: str = "") -> Iterator[str]:
+    """
+    Render differences as tree lines, marked + (added), - (removed) or ~ (changed),
+    followed by a count
+
+    Directory names end with '/'. Changed directories only show the
+    branches below them that differ.
+    """
+    prefixes = [prefix]
+    counts = dict.fromkeys(MARKERS, 0)
+    for entry in diffs:
+        del prefixes[entry.depth:]
+        current_prefix = prefixes[-1]
+        symbol = "└── " if entry.is_last else "├── "
+        name = entry.name + "/" if entry.is_dir else entry.name
+        yield f"{current_prefix}{symbol}{MARKERS[entry.status]} {name}{_detail(entry)}"
+        if entry.status == CHANGED and entry.is_dir:
+            prefixes.append(current_prefix + ("    " if entry.is_last else "│   "))
+        else:
+            counts[entry.status] += 1
+    if not any(counts.values()):
+        yield "No differences"
+    else:
+        yield f"{counts[ADDED]} added, {counts[REMOVED]} removed, {counts[CHANGED]} changed"
@@ -0,0 +1,331 @@
+import bisect
+import os
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional
+
+from directory_printer.core.traversal import (
+    NOT_FOUND, PLACEHOLDERS, TreeEntry, display_name, walk_tree
+)
+
+
+class LinePatch(NamedTuple):
+    """Replace `count` rendered lines starting at `start` with `lines`"""
+    start: int
+    count: int
+    lines: List[str]
+
+
+class TreeNode:
+    """An entry in the tree model; `size` is the number of lines its children render"""
+
+    def __init__(
+        self, name: str, is_dir: bool, error: Optional[str] = None, link: Optional[str] = None
+    ):
+        self.name = name
+        self.is_dir = is_dir
+        self.error = error
+        self.link = link  # Target of a symbolic link
+        self.parent: Optional["TreeNode"] = None
+        self.children: List["TreeNode"] = []
+        self.names: List[str] = []  # Child names, kept sorted alongside children
+        self.size = 0
+
+    def child(self, name: str) -> Optional["TreeNode"]:
+        index = bisect.bisect_left(self.names, name)
+        if index < len(self.names) and self.names[index] == name:
+            return self.children[index]
+        return None
+
+
+def apply_patches(lines: List[str], patches: Iterable[LinePatch], offset: int = 0):
+    """Apply patches in order to a list of rendered lines"""
+    for patch in patches:
+        lines[offset + patch.start:offset + patch.start + patch.count] = patch.lines
+
+
+class TreeModel:
+    """
+    In-memory tree of a walked directory that renders the same lines as iter_structure
+
+    Entries can be inserted, deleted and renamed one at a time without
+    listing their siblings again. Each change returns the line patches that
+    bring a previous rendering up to date, touching only the changed entry
+    and, when the last child changes, its previous sibling.
+    """
+
+    def __init__(self, path: str, ignore: Optional[Callable[[str, bool], bool]] = None):
+        self.path = path
+        self.ignore = ignore
+        self.root = TreeNode(path, True)
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        ignore: Optional[Callable[[str, bool], bool]] = None,
+        progress_callback: Optional[Callable[[int, int], bool]] = None,
+        workers: int = 0
+    ) -> "TreeModel":
+        """Walk a directory into a new model"""
+        model = cls(path, ignore)
+        model._attach(model.root, walk_tree(
+            path, ignore=ignore, progress_callback=progress_callback, workers=workers
+        ))
+        return model
+
+    def _attach(self, node: TreeNode, entries: Iterator[TreeEntry]):
+        """Fill an empty directory node from walk_tree entries of its path"""
+        stack = [node]
+        for entry in entries:
+            del stack[entry.depth:]
+            if entry.error is not None:
+                stack[-1].error = entry.error
+                continue
+            child = TreeNode(entry.name, entry.is_dir, link=entry.link)
+            child.parent = stack[-1]
+            stack[-1].children.append(child)
+            stack[-1].names.append(entry.name)
+            if entry.is_dir:
+                stack.append(child)
+        # Sizes are summed bottom-up once the subtree is complete
+        self._compute_sizes(node)
+
+    def _compute_sizes(self, node: TreeNode):
+        order = [node]
+        for current in order:
+            order.extend(child for child in current.children if child.is_dir)
+        for current in reversed(order):
+            if current.error is not None:
+                current.size = 1
+            else:
+                current.size = sum(1 + child.size for child in current.children)
+
+    def rel_path(self, node: TreeNode) -> str:
+        parts = []
+        while node.parent is not None:
+            parts.append(node.name)
+            node = node.parent
+        return "/".join(reversed(parts))
+
+    def full_path(self, node: TreeNode) -> str:
+        rel_path = self.rel_path(node)
+        return os.path.join(self.path, *rel_path.split('/')) if rel_path else self.path
+
+    def find(self, rel_path: str) -> Optional[TreeNode]:
+        node = self.root
+        for name in rel_path.split('/') if rel_path else ():
+            node = node.child(name)
+            if node is None:
+                return None
+        return node
+
+    def iter_dirs(self, node: Optional[TreeNode] = None) -> Iterator[TreeNode]:
+        """Yield every directory node below and including `node` (the root by default)"""
+        stack = [node or self.root]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(child for child in node.children if child.is_dir)
+
+    # Rendering
+
+    def lines(self) -> List[str]:
+        """Render the whole tree, as iter_structure would"""
+        out: List[str] = []
+        self._render_block(self.root, "", out)
+        return out
+
+    def _render_block(self, node: TreeNode, prefix: str, out: List[str]):
+        """Render the children of a directory node"""
+        stack = [(node, 0, prefix)]
+        while stack:
+            current, index, current_prefix = stack.pop()
+            if current.error == NOT_FOUND:
+                out.append(f"Error: Directory '{self.full_path(current)}' not found!")
+                continue
+            if current.error in PLACEHOLDERS:
+                out.append(f"{current_prefix}{PLACEHOLDERS[current.error]}")
+                continue
+            if index >= len(current.children):
+                continue
+            stack.append((current, index + 1, current_prefix))
+            child = current.children[index]
+            is_last = index == len(current.children) - 1
+            symbol = "└── " if is_last else "├── "
+            out.append(f"{current_prefix}{symbol}{display_name(child.name, child.link)}")
+            if child.is_dir:
+                stack.append((child, 0, current_prefix + ("    " if is_last else "│   ")))
+
+    def _render_node(self, node: TreeNode) -> List[str]:
+        """Render a node's own line followed by its subtree"""
+        parent = node.parent
+        is_last = parent.children[-1] is node
+        prefix = self._block_prefix(parent)
+        out = [f"{prefix}{'└── ' if is_last else '├── '}{display_name(node.name, node.link)}"]
+        if node.is_dir:
+            self._render_block(node, prefix + ("    " if is_last else "│   "), out)
+        return out
+
+    def _block_prefix(self, node: TreeNode) -> str:
+        """Line prefix used by the children of a directory node"""
+        segments = []
+        while node.parent is not None:
+            segments.append("    " if node.parent.children[-1] is node else "│   ")
+            node = node.parent
+        return "".join(reversed(segments))
+
+    def _line_of(self, node: TreeNode) -> int:
+        """Index of a node's own line in the rendered output"""
+        line = -1
+        while node.parent is not None:
+            parent = node.parent
+            for sibling in parent.children:
+                if sibling is node:
+                    break
+                line += 1 + sibling.size
+            line += 1
+            node = parent
+        return line
+
+    def _resize(self, node: TreeNode, delta: int):
+        while node is not None:
+            node.size += delta
+            node = node.parent
+
+    # Changes
+
+    def rebuild(self) -> LinePatch:
+        """Walk the whole tree again, returning a patch that replaces every line"""
+        count = self.root.size
+        self.root = TreeNode(self.path, True)
+        self._attach(self.root, walk_tree(self.path, ignore=self.ignore))
+        return LinePatch(0, count, self.lines())
+
+    def insert(self, rel_path: str, is_dir: bool) -> List[LinePatch]:
+        """
+        Add an entry, walking its subtree if it is a directory
+
+        Returns no patches if the parent is unknown, the entry already exists
+        or it is ignored.
+        """
+        parent_rel, _, name = rel_path.rpartition('/')
+        parent = self.find(parent_rel)
+        if parent is None or not parent.is_dir or parent.error is not None or parent.child(name):
+            return []
+        full_path = os.path.join(self.full_path(parent), name)
+        try:
+            link = os.readlink(full_path) if os.path.islink(full_path) else None
+        except OSError:
+            link = None
+        is_dir = is_dir and link is None  # Links are not followed, as in walk_tree
+        if self.ignore and self.ignore(rel_path, is_dir):
+            return []
+
+        node = TreeNode(name, is_dir, link=link)
+        if is_dir:
+            ignore = self.ignore
+            self._attach(node, walk_tree(
+                full_path,
+                ignore=(lambda rel, d: ignore(f"{rel_path}/{rel}", d)) if ignore else None
+            ))
+            if node.error == NOT_FOUND:
+                return []  # Removed again before it could be listed
+        return self._link(parent, node)
+
+    def _link(self, parent: TreeNode, node: TreeNode) -> List[LinePatch]:
+        index = bisect.bisect_left(parent.names, node.name)
+        previous_last = None
+        if parent.children and index == len(parent.children):
+            previous_last = parent.children[-1]
+        parent.children.insert(index, node)
+        parent.names.insert(index, node.name)
+        node.parent = parent
+        self._resize(parent, 1 + node.size)
+
+        if previous_last is not None:
+            # The former last child gains a sibling below it, changing its branch and prefixes
+            start = self._line_of(previous_last)
+            lines = self._render_node(previous_last) + self._render_node(node)
+            return [LinePatch(start, 1 + previous_last.size, lines)]
+        return [LinePatch(self._line_of(node), 0, self._render_node(node))]
+
+    def delete(self, rel_path: str) -> List[LinePatch]:
+        """Remove an entry and its subtree"""
+        node = self.find(rel_path) if rel_path else None
+        if node is None:
+            return []
+        return self._unlink(node)
+
+    def _unlink(self, node: TreeNode) -> List[LinePatch]:
+        parent = node.parent
+        index = parent.children.index(node)
+        start = self._line_of(node)
+        count = 1 + node.size
+        was_last = index == len(parent.children) - 1
+
+        if was_last and index > 0:
+            new_last = parent.children[index - 1]
+            start = self._line_of(new_last)
+            count += 1 + new_last.size
+
+        del parent.children[index]
+        del parent.names[index]
+        node.parent = None
+        self._resize(parent, -(1 + node.size))
+
+        if was_last and index > 0:
+            return [LinePatch(start, count, self._render_node(parent.children[-1]))]
+        return [LinePatch(start, count, [])]
+
+    def rename(self, old_rel_path: str, new_rel_path: str) -> List[LinePatch]:
+        """
+        Move an entry, keeping its subtree instead of walking it again
+
+        With ignore rules, a moved directory is walked again at its new path
+        instead: rules that match by path, such as `build/**/*.log`, can hide
+        entries that were shown at the old path or show ones that were hidden.
+        """
+        node = self.find(old_rel_path) if old_rel_path else None
+        if node is None:
+            return []
+        parent_rel, _, name = new_rel_path.rpartition('/')
+        parent = self.find(parent_rel)
+        if (parent is None or not parent.is_dir or parent.error is not None
+                or (self.ignore and self.ignore(new_rel_path, node.is_dir))):
+            return self._unlink(node)
+        existing = parent.child(name)
+        patches = self._unlink(node)
+        if existing is not None and existing is not node:
+            patches += self._unlink(existing)  # Replaced by the moved entry
+        if node.is_dir and self.ignore:
+            return patches + self.insert(new_rel_path, True)
+        node.name = name
+        return patches + self._link(parent, node)
+
+    def sync_directory(self, rel_dir: str) -> List[LinePatch]:
+        """List one directory again and apply the differences to its children"""
+        node = self.find(rel_dir)
+        if node is None or not node.is_dir:
+            return []
+        full_path = self.full_path(node)
+        try:
+            with os.scandir(full_path) as it:
+                current = {}
+                for entry in it:
+                    try:
+                        current[entry.name] = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        current[entry.name] = False
+        except FileNotFoundError:
+            return self.delete(rel_dir) if rel_dir else []
+        except PermissionError:
+            return []
+
+        patches: List[LinePatch] = []
+        for child in list(node.children):
+            if current.get(child.name) != child.is_dir:
+                patches += self._unlink(child)
+        for name in sorted(current):
+            if node.child(name) is None:
+                rel_path = f"{rel_dir}/{name}" if rel_dir else name
+                patches += self.insert(rel_path, current[name])
+        return patches
@@ -0,0 +1,286 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from directory_printer.core.tree_model import LinePatch, TreeModel
+
+# Change kinds reported by the watchers
+CREATED = "created"
+DELETED = "deleted"
+MOVED = "moved"
+CHANGED = "changed"  # Directory contents changed in an unknown way; list it again
+RESCAN = "rescan"  # Events were lost; walk the whole tree again
+
+# Seconds without new events before a burst of changes is applied
+DEFAULT_DEBOUNCE = 0.3
+# Upper bound on how long a continuous burst can delay an update
+DEFAULT_MAX_DELAY = 2.0
+# Seconds between directory mtime checks when inotify is unavailable
+DEFAULT_POLL_INTERVAL = 1.0
+
+# inotify constants from <sys/inotify.h>
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (
+    IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class Change(NamedTuple):
+    """A filesystem change, with paths relative to the watched root"""
+    kind: str
+    rel_path: str
+    is_dir: bool = False
+    new_rel_path: Optional[str] = None
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+class PollingWatcher:
+    """Detect changed directories by comparing their mtimes on an interval"""
+
+    def __init__(self, model: TreeModel, interval: float = DEFAULT_POLL_INTERVAL):
+        self.model = model
+        self.interval = interval
+        self._mtimes: Dict[str, int] = {}
+        self._next_poll = 0.0
+        self._poll()
+
+    def _poll(self) -> List[Change]:
+        changes = []
+        mtimes = {}
+        for node in self.model.iter_dirs():
+            rel_dir = self.model.rel_path(node)
+            try:
+                mtime_ns = os.stat(self.model.full_path(node)).st_mtime_ns
+            except OSError:
+                continue  # Reported through its parent's mtime
+            mtimes[rel_dir] = mtime_ns
+            previous = self._mtimes.get(rel_dir)
+            if previous is not None and previous != mtime_ns:
+                changes.append(Change(CHANGED, rel_dir, True))
+        self._mtimes = mtimes
+        self._next_poll = time.monotonic() + self.interval
+        return changes
+
+    def wait(self, timeout: float) -> List[Change]:
+        """Return the changes seen within `timeout` seconds, or an empty list"""
+        delay = self._next_poll - time.monotonic()
+        if delay > timeout:
+            time.sleep(timeout)
+            return []
+        if delay > 0:
+            time.sleep(delay)
+        return self._poll()
+
+    def add(self, rel_dir: str):
+        """Directories are picked up from the model on the next poll"""
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Receive directory change events from the Linux inotify API"""
+
+    def __init__(self, model: TreeModel):
+        self.model = model
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}
+        try:
+            for node in model.iter_dirs():
+                if node.error is None:
+                    self.add(model.rel_path(node))
+        except OSError:
+            self.close()
+            raise
+
+    def add(self, rel_dir: str):
+        """Watch a directory that is already in the model"""
+        full_path = self.model.path
+        if rel_dir:
+            full_path = os.path.join(full_path, *rel_dir.split('/'))
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(full_path), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            # ENOENT, EACCES, ENOTDIR: gone or unreadable, nothing to watch
+            if errno in (2, 13, 20):
+                return
+            raise OSError(errno, os.strerror(errno), full_path)
+        self._dirs[wd] = rel_dir
+
+    def _moved(self, old_rel: str, new_rel: str):
+        for wd, rel_dir in self._dirs.items():
+            if rel_dir == old_rel or rel_dir.startswith(old_rel + "/"):
+                self._dirs[wd] = new_rel + rel_dir[len(old_rel):]
+
+    def wait(self, timeout: float) -> List[Change]:
+        """Return the changes seen within `timeout` seconds, or an empty list"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        data = b""
+        while True:
+            try:
+                data += os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+
+        changes: List[Change] = []
+        moved_from: Dict[int, int] = {}  # Cookie to index of the provisional delete
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                return [Change(RESCAN, "")]
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            rel_dir = self._dirs.get(wd)
+            if rel_dir is None:
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                if rel_dir == "":
+                    return [Change(RESCAN, "")]
+                continue  # Reported by the parent directory
+
+            is_dir = bool(mask & IN_ISDIR)
+            rel_path = _join(rel_dir, name)
+            if mask & IN_CREATE:
+                changes.append(Change(CREATED, rel_path, is_dir))
+            elif mask & IN_DELETE:
+                changes.append(Change(DELETED, rel_path, is_dir))
+            elif mask & IN_MOVED_FROM:
+                moved_from[cookie] = len(changes)
+                changes.append(Change(DELETED, rel_path, is_dir))
+            elif mask & IN_MOVED_TO:
+                index = moved_from.pop(cookie, None)
+                if index is None:
+                    changes.append(Change(CREATED, rel_path, is_dir))
+                else:
+                    # Replace the provisional delete with a move that keeps the subtree
+                    source = changes[index]
+                    changes[index] = Change(MOVED, source.rel_path, is_dir, rel_path)
+                    if is_dir:
+                        self._moved(source.rel_path, rel_path)
+        return changes
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(model: TreeModel, poll_interval: float = DEFAULT_POLL_INTERVAL):
+    """Use inotify where available, polling directory mtimes otherwise"""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(model)
+        except (OSError, AttributeError):
+            pass  # Not supported or out of watches
+    return PollingWatcher(model, poll_interval)
+
+
+def apply_changes(model: TreeModel, changes: List[Change], watcher) -> List[LinePatch]:
+    """Update the model for a batch of changes, returning the line patches"""
+    patches: List[LinePatch] = []
+    for change in changes:
+        if change.kind == RESCAN:
+            patch = model.rebuild()
+            for node in model.iter_dirs():
+                if node.error is None:
+                    watcher.add(model.rel_path(node))
+            return [patch]
+        if change.kind == CREATED:
+            if change.is_dir:
+                watcher.add(change.rel_path)  # Before walking, so no later change is missed
+            patches += model.insert(change.rel_path, change.is_dir)
+            node = model.find(change.rel_path)
+            if node is not None and node.is_dir:
+                for child in model.iter_dirs(node):
+                    if child is not node:
+                        watcher.add(model.rel_path(child))
+        elif change.kind == DELETED:
+            patches += model.delete(change.rel_path)
+        elif change.kind == MOVED:
+            if model.find(change.rel_path) is None:
+                created = Change(CREATED, change.new_rel_path, change.is_dir)
+                patches += apply_changes(model, [created], watcher)
+            else:
+                patches += model.rename(change.rel_path, change.new_rel_path)
+                node = model.find(change.new_rel_path)
+                if node is not None and node.is_dir:
+                    # A directory walked again may show subdirectories that were ignored
+                    for child in model.iter_dirs(node):
+                        watcher.add(model.rel_path(child))
+        elif change.kind == CHANGED:
+            patches += model.sync_directory(change.rel_path)
+    return patches
+
+
+def watch_structure(
+    model: TreeModel,
+    on_patches: Callable[[List[LinePatch]], None],
+    stop_event: threading.Event,
+    debounce: float = DEFAULT_DEBOUNCE,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    poll_interval: float = DEFAULT_POLL_INTERVAL
+):
+    """
+    Keep a tree model in sync with the filesystem until stop_event is set
+
+    Changes are collected until no new event arrives for `debounce` seconds
+    (or `max_delay` has passed), then applied together, so a checkout or a
+    build results in a single call to on_patches.
+
+    Args:
+        model: Tree model built from the directory to watch
+        on_patches: Called with the line patches of each applied batch
+        stop_event: Set to stop watching
+        debounce: Quiet period that ends a burst of changes
+        max_delay: Longest time a burst is held back
+        poll_interval: Seconds between checks when inotify is unavailable
+    """
+    watcher = create_watcher(model, poll_interval)
+    try:
+        while not stop_event.is_set():
+            changes = watcher.wait(0.5)
+            if not changes:
+                continue
+            deadline = time.monotonic() + max_delay
+            while not stop_event.is_set() and time.monotonic() < deadline:
+                more = watcher.wait(min(debounce, max(0.0, deadline - time.monotonic())))
+                if not more:
+                    break
+                changes.extend(more)
+            if stop_event.is_set():
+                break
+            patches = apply_changes(model, changes, watcher)
+            if patches:
+                on_patches(patches)
+    finally:
+        watcher.close()
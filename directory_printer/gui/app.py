@@ -1,22 +1,37 @@
 import os
+import queue
+import threading
+import time
 import tkinter as tk
-import webbrowser
-import json
-import urllib.request
+from functools import cached_property
 from importlib.metadata import version
-from tkinter import filedialog, scrolledtext, messagebox, ttk
+from tkinter import filedialog, messagebox, ttk
 
-import tomli
-from PIL import Image, ImageTk
-
-from directory_printer.core.printer import print_structure
+# webbrowser, urllib, json, tomli and PIL are imported where they are used,
+# keeping them off the startup path before the window is first drawn
 from directory_printer.core.i18n_config import init_i18n, t, set_language, get_language
 from directory_printer.core.utilities import get_resource_path
 from directory_printer.core.configuration import Configuration
+from directory_printer.core.snapshot import SnapshotCache
+from directory_printer.gui.output_view import VirtualOutputView
+from directory_printer.gui.worker import (
+    DONE, ERROR, LINES, PATCHES, TREE, WATCHING, StructureWorker
+)
+
+# Interval between UI refreshes while a structure is being generated (~30 fps)
+FRAME_INTERVAL_MS = 33
+
+# Number of largest directories listed below the tree when sizes are shown
+LARGEST_DIRECTORIES = 10
+
+# Recent directories listed in the File menu; the configuration remembers more
+RECENT_MENU_SIZE = 10
 
 
 def load_project_metadata():
     """Load project metadata from pyproject.toml"""
+    import tomli
+
     toml_path = get_resource_path("pyproject.toml")
     with open(toml_path, "rb") as f:
         toml_data = tomli.load(f)
@@ -27,20 +42,32 @@ class DirectoryPrinterApp:
     def __init__(self):
         # Initialize configuration
         self.config = Configuration()
+        # Directory listings from earlier runs, stored next to the configuration
+        self.snapshot_cache = SnapshotCache()
         
-        # Initialize i18n with saved language
-        init_i18n()
-        set_language(self.config.get_language())
+        # Initialize i18n with saved language; other locales are only loaded when needed
+        init_i18n(self.config.get_language())
         
+        self.current_version = version('directory-printer')
         self.root = tk.Tk()
-        self.root.title(t('TITLE', version=version('directory-printer')))
+        self.root.title(t('TITLE', version=self.current_version))
         self.root.minsize(700, 400)
         self.logo_image = None
-        self.project_metadata = load_project_metadata()
+        self.started = False
         self.selected_folder = None
         self.gitignore_path = None
         self.stop_processing = False
-        self.current_version = version('directory-printer')
+        self.worker = None
+        self.poll_id = None
+        self.watching = False
+        self.exporting = False
+        # Collapsible view of the last generated tree, and its name index once a filter is applied
+        self.tree_lines = None
+        self.name_index = None
+        # Complete tree of the last run, sized or not, which exports are written from
+        self.generated_tree = None
+        # Start of the current generation, for the last run recorded in the directory's profile
+        self.run_started = None
 
         # Language options
         self.languages = {
@@ -52,21 +79,65 @@ class DirectoryPrinterApp:
         # Add window close handler
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
-        # Set window icon
+        # Kept across UI rebuilds
+        self.watch_var = tk.BooleanVar(value=False)
+        self.nested_ignore_var = tk.BooleanVar(value=False)
+        self.max_depth_var = tk.StringVar()  # Empty for no limit
+        self.max_entries_var = tk.StringVar()
+        self.sizes_var = tk.BooleanVar(value=False)
+        self.profile_var = tk.BooleanVar(value=False)
+        self.follow_symlinks_var = tk.BooleanVar(value=False)
+        self.one_filesystem_var = tk.BooleanVar(value=False)
+        self.git_index_var = tk.BooleanVar(value=False)
+        self.search_var = tk.StringVar()
+
+        # Create menu bar
+        self.create_menu_bar()
+        
+        self.setup_ui()
+
+        # Everything not needed for the first frame runs once the window is drawn
+        self.root.after_idle(self.finish_startup)
+
+    @cached_property
+    def project_metadata(self):
+        return load_project_metadata()
+
+    def finish_startup(self):
+        """Work deferred until after the first paint"""
+        self.started = True
+        self.set_window_icon()
+        self.author_link.config(text=self.project_metadata.get("author_name"))
+        # Recent directories on unreachable mounts must not hold up the window
+        self.recent_check = threading.Thread(target=self.config.check_recent_files, daemon=True)
+        self.recent_check.start()
+        self.root.after(FRAME_INTERVAL_MS, self.poll_recent_check)
+
+    def poll_recent_check(self):
+        """Refresh the recent menu once the background check of recent directories is done"""
+        if self.recent_check.is_alive():
+            self.root.after(FRAME_INTERVAL_MS, self.poll_recent_check)
+        else:
+            self.update_recent_menu()
+
+    def set_window_icon(self):
         logo_path = get_resource_path(os.path.join("directory_printer", "assets", "logo.png"))
-        if os.path.exists(logo_path):
+        if not os.path.exists(logo_path):
+            return
+        try:
+            # The bundled logo is already 32x32, which Tk can load without PIL
+            self.logo_image = tk.PhotoImage(file=logo_path)
+        except tk.TclError:
             try:
+                from PIL import Image, ImageTk
+
                 icon = Image.open(logo_path)
                 icon = icon.resize((32, 32), Image.Resampling.LANCZOS)
-                icon_photo = ImageTk.PhotoImage(icon)
-                self.root.iconphoto(True, icon_photo)
+                self.logo_image = ImageTk.PhotoImage(icon)
             except Exception as e:
                 print(f"Could not set window icon: {e}")
-
-        # Create menu bar
-        self.create_menu_bar()
-        
-        self.setup_ui()
+                return
+        self.root.iconphoto(True, self.logo_image)
 
     def create_menu_bar(self):
         """Create the menu bar"""
@@ -140,7 +211,7 @@ class DirectoryPrinterApp:
         if not recent_files:
             self.recent_menu.add_command(label="(Empty)", state=tk.DISABLED)
         else:
-            for entry in recent_files:
+            for entry in recent_files[:RECENT_MENU_SIZE]:
                 directory_path = entry.get('directory_path', '')
                 self.recent_menu.add_command(
                     label=os.path.basename(directory_path),
@@ -155,7 +226,8 @@ class DirectoryPrinterApp:
         if os.path.exists(directory_path):
             # Clear output if opening a different directory
             if self.selected_folder != directory_path:
-                self.output_text.delete("1.0", tk.END)
+                self.reset_filter()
+                self.output_view.clear()
                 
             self.selected_folder = directory_path
             self.directory_var.set(directory_path)
@@ -168,6 +240,7 @@ class DirectoryPrinterApp:
             else:
                 self.gitignore_path = None
                 self.gitignore_var.set("")
+            self.nested_ignore_var.set(config.get('nested_ignore', False))
         else:
             messagebox.showwarning(
                 t('DIALOGS.WARNING'),
@@ -193,14 +266,14 @@ class DirectoryPrinterApp:
             # Save current state
             current_directory = self.directory_var.get()
             current_gitignore = self.gitignore_var.get()
-            current_output = self.output_text.get("1.0", tk.END)
+            current_output = self.output_view.lines
             
             # Destroy all widgets
             for widget in self.root.winfo_children():
                 widget.destroy()
             
             # Update window title
-            self.root.title(t('TITLE', version=version('directory-printer')))
+            self.root.title(t('TITLE', version=self.current_version))
             
             # Recreate menu
             self.create_menu_bar()
@@ -211,14 +284,17 @@ class DirectoryPrinterApp:
             # Restore state
             self.directory_var.set(current_directory)
             self.gitignore_var.set(current_gitignore)
-            self.output_text.insert("1.0", current_output)
+            self.output_view.set_source(current_output)
 
     def open_link(self, url):
+        import webbrowser
+
         webbrowser.open(url)
 
-    def create_link_label(self, parent, text, url):
+    def create_link_label(self, parent, text, url_key):
+        """Create a link whose URL is looked up in the project metadata when clicked"""
         link = tk.Label(parent, text=text, fg="blue", cursor="hand2", font=("Helvetica", 9))
-        link.bind("<Button-1>", lambda e: self.open_link(url))
+        link.bind("<Button-1>", lambda e: self.open_link(self.project_metadata.get(url_key)))
         link.bind("<Enter>", lambda e: link.configure(font=("Helvetica", 9, "underline")))
         link.bind("<Leave>", lambda e: link.configure(font=("Helvetica", 9)))
         return link
@@ -263,6 +339,54 @@ class DirectoryPrinterApp:
         self.clear_gitignore_btn = ttk.Button(gitignore_frame, text=t('ACTIONS.CLEAR'), command=self.clear_gitignore)
         self.clear_gitignore_btn.grid(row=0, column=3, padx=2)
 
+        self.nested_ignore_check = ttk.Checkbutton(
+            gitignore_frame, text=t('IGNORE_FILE.NESTED'), variable=self.nested_ignore_var
+        )
+        self.nested_ignore_check.grid(row=1, column=1, padx=5, sticky='w')
+
+        # Optional limits; left empty, the whole tree is printed
+        limits_frame = ttk.Frame(main_frame)
+        limits_frame.pack(fill=tk.X, pady=(0, 10))
+
+        self.max_depth_label = ttk.Label(limits_frame, text=t('LIMITS.MAX_DEPTH'))
+        self.max_depth_label.pack(side=tk.LEFT, padx=5)
+        self.max_depth_entry = ttk.Spinbox(
+            limits_frame, from_=1, to=999, width=6, textvariable=self.max_depth_var
+        )
+        self.max_depth_entry.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.max_entries_label = ttk.Label(limits_frame, text=t('LIMITS.MAX_ENTRIES'))
+        self.max_entries_label.pack(side=tk.LEFT, padx=5)
+        self.max_entries_entry = ttk.Entry(
+            limits_frame, width=10, textvariable=self.max_entries_var
+        )
+        self.max_entries_entry.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.sizes_check = ttk.Checkbutton(
+            limits_frame, text=t('LIMITS.SHOW_SIZES'), variable=self.sizes_var
+        )
+        self.sizes_check.pack(side=tk.LEFT, padx=5)
+
+        self.profile_check = ttk.Checkbutton(
+            limits_frame, text=t('LIMITS.SHOW_TIMINGS'), variable=self.profile_var
+        )
+        self.profile_check.pack(side=tk.LEFT, padx=5)
+
+        self.follow_symlinks_check = ttk.Checkbutton(
+            limits_frame, text=t('LIMITS.FOLLOW_SYMLINKS'), variable=self.follow_symlinks_var
+        )
+        self.follow_symlinks_check.pack(side=tk.LEFT, padx=5)
+
+        self.one_filesystem_check = ttk.Checkbutton(
+            limits_frame, text=t('LIMITS.ONE_FILESYSTEM'), variable=self.one_filesystem_var
+        )
+        self.one_filesystem_check.pack(side=tk.LEFT, padx=5)
+
+        self.git_index_check = ttk.Checkbutton(
+            limits_frame, text=t('LIMITS.GIT_INDEX'), variable=self.git_index_var
+        )
+        self.git_index_check.pack(side=tk.LEFT, padx=5)
+
         # Action buttons and progress frame
         action_frame = ttk.Frame(main_frame)
         action_frame.pack(fill=tk.X, pady=(0, 5))
@@ -274,6 +398,11 @@ class DirectoryPrinterApp:
         self.generate_btn.pack(side=tk.LEFT, padx=2)
         self.reset_btn = ttk.Button(button_container, text=t('ACTIONS.RESET'), command=self.reset_all)
         self.reset_btn.pack(side=tk.LEFT, padx=2)
+        self.watch_check = ttk.Checkbutton(
+            button_container, text=t('ACTIONS.WATCH'), variable=self.watch_var,
+            command=self.update_watch_options
+        )
+        self.watch_check.pack(side=tk.LEFT, padx=2)
 
         # Progress bar (hidden initially)
         self.progress_frame = ttk.Frame(action_frame)
@@ -303,9 +432,30 @@ class DirectoryPrinterApp:
         # Initially hide all progress elements
         self.progress_frame.pack_forget()
 
+        # Filter over the generated tree
+        search_frame = ttk.Frame(main_frame)
+        search_frame.pack(fill=tk.X, pady=(0, 5))
+
+        self.search_label = ttk.Label(search_frame, text=t('SEARCH.LABEL'))
+        self.search_label.pack(side=tk.LEFT, padx=5)
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        self.search_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        self.search_entry.bind("<Return>", lambda e: self.apply_filter())
+        self.filter_btn = ttk.Button(
+            search_frame, text=t('ACTIONS.FILTER'), command=self.apply_filter
+        )
+        self.filter_btn.pack(side=tk.LEFT, padx=2)
+        self.clear_filter_btn = ttk.Button(
+            search_frame, text=t('ACTIONS.CLEAR'), command=self.clear_filter
+        )
+        self.clear_filter_btn.pack(side=tk.LEFT, padx=2)
+        self.matches_label = ttk.Label(search_frame, text="")
+        self.matches_label.pack(side=tk.LEFT, padx=5)
+
         # Output area
-        self.output_text = scrolledtext.ScrolledText(main_frame, wrap=tk.WORD, width=80, height=25)
-        self.output_text.pack(pady=(0, 5), fill=tk.BOTH, expand=True)
+        # Only the visible window of lines is materialized in the widget
+        self.output_view = VirtualOutputView(main_frame, width=80, height=25)
+        self.output_view.pack(pady=(0, 5), fill=tk.BOTH, expand=True)
 
         # Buttons frame for copy and download
         buttons_frame = ttk.Frame(main_frame)
@@ -320,20 +470,24 @@ class DirectoryPrinterApp:
         self.download_btn = ttk.Button(left_buttons, text=t('ACTIONS.DOWNLOAD'), command=self.download_as_txt)
         self.download_btn.pack(side=tk.LEFT, padx=2)
 
+        # Timings of the last run, when enabled
+        self.status_label = ttk.Label(buttons_frame, text="")
+        self.status_label.grid(row=0, column=1, padx=5, sticky='w')
+
         # Right side - links
         links_frame = ttk.Frame(buttons_frame)
         links_frame.grid(row=0, column=2, sticky='e')
 
-        author_link = self.create_link_label(
-            links_frame, self.project_metadata.get("author_name"), self.project_metadata.get("author_linkedin")
-        )
-        author_link.pack(side=tk.LEFT)
+        # The author name comes from the project metadata, which is read after the first paint
+        author_name = self.project_metadata.get("author_name") if self.started else ""
+        self.author_link = self.create_link_label(links_frame, author_name, "author_linkedin")
+        self.author_link.pack(side=tk.LEFT)
 
         separator1 = ttk.Label(links_frame, text=" | ")
         separator1.pack(side=tk.LEFT)
 
         product_hunt_link = self.create_link_label(
-            links_frame, "producthunt", self.project_metadata.get("product_hunt_url")
+            links_frame, "producthunt", "product_hunt_url"
         )
         product_hunt_link.pack(side=tk.LEFT)
 
@@ -341,7 +495,7 @@ class DirectoryPrinterApp:
         separator2.pack(side=tk.LEFT)
 
         github_link = self.create_link_label(
-            links_frame, "github", self.project_metadata.get("github_repo_url")
+            links_frame, "github", "github_repo_url"
         )
         github_link.pack(side=tk.LEFT)
 
@@ -377,62 +531,238 @@ class DirectoryPrinterApp:
         self.gitignore_path = None
         self.gitignore_var.set("")
 
+    def update_watch_options(self):
+        """Disable the options that watch mode does not apply, so they are not silently ignored"""
+        state = tk.DISABLED if self.watch_var.get() else tk.NORMAL
+        for widget in (
+            self.max_depth_entry, self.max_entries_entry, self.sizes_check,
+            self.follow_symlinks_check, self.one_filesystem_check, self.git_index_check
+        ):
+            widget.config(state=state)
+
     def reset_all(self):
+        self.stop_worker()
         self.clear_directory()
         self.clear_gitignore()
-        self.output_text.delete("1.0", tk.END)
+        self.reset_filter()
+        self.output_view.clear()
         self.progress_bar["value"] = 0
         self.progress_label.config(text="")
         self.progress_frame.pack_forget()  # Hide entire progress frame
 
     def confirm_stop(self):
-        if not self.stop_processing:  # Only show dialog if not already stopping
+        # Only show dialog if still running
+        if self.worker is not None and not self.stop_processing:
             self.root.bell()  # Ring the system bell
             if messagebox.askyesno(
                 t('DIALOGS.STOP_TITLE'),
                 t('DIALOGS.STOP_MESSAGE')
             ):
                 self.stop_processing = True
-                self.output_text.delete("1.0", tk.END)
+                if self.worker is not None:
+                    self.worker.stop()
+                if not self.exporting:
+                    self.output_view.clear()
                 self.progress_frame.pack_forget()  # Hide entire progress frame
 
     def process_directory(self):
         if not self.selected_folder:
             messagebox.showwarning(t('DIALOGS.WARNING'), t('MESSAGES.SELECT_DIRECTORY'))
             return
-
-        self.output_text.delete("1.0", tk.END)
-        self.output_text.insert(tk.END, f"{self.selected_folder}\n")
+        limits = self.read_limits()
+        if limits is None:
+            return
+        max_depth, max_entries = limits
+        if self.worker is not None:
+            if not self.watching:  # A structure is already being generated
+                return
+            self.stop_worker()
+
+        self.reset_filter()
+        self.status_label.config(text="")
+        self.output_view.clear()
+        self.output_view.append([self.selected_folder])
         
         # Reset progress bar and stop flag
         self.progress_bar["value"] = 0
         self.progress_label.config(text="")
         self.stop_processing = False
-        
+        self.run_started = time.perf_counter()
+
+        # Walk the tree on a background thread; the Tk loop polls it once per frame
+        self.worker = StructureWorker(
+            self.selected_folder,
+            gitignore_path=self.gitignore_path,
+            cache=self.snapshot_cache,
+            watch=self.watch_var.get(),
+            nested_ignore=self.nested_ignore_var.get(),
+            max_depth=max_depth,
+            max_entries=max_entries,
+            sizes=self.sizes_var.get(),
+            largest=LARGEST_DIRECTORIES,
+            profile=self.profile_var.get(),
+            follow_symlinks=self.follow_symlinks_var.get(),
+            one_filesystem=self.one_filesystem_var.get(),
+            source="git" if self.git_index_var.get() else "walk"
+        )
+        self.worker.start()
+        self.generate_btn.config(state=tk.DISABLED)
+        self.poll_id = self.root.after(FRAME_INTERVAL_MS, self.poll_worker)
+
+    def read_limits(self):
+        """
+        Parse the max depth and max entries fields, warning and returning None
+        if either is invalid
+        """
         try:
-            output_list = print_structure(
-                self.selected_folder,
-                gitignore_path=self.gitignore_path,
-                progress_callback=self.update_progress
-            )
-            if not self.stop_processing:  # Only update output if not stopped
-                self.output_text.insert(tk.END, "\n".join(output_list))
-            else:
-                # Clear output if stopped
-                self.output_text.delete("1.0", tk.END)
-        except Exception as e:
-            if not self.stop_processing:  # Only show error if not stopped
-                messagebox.showerror(t('DIALOGS.ERROR'), t('MESSAGES.PROCESS_ERROR', error=str(e)))
-        finally:
-            # Hide progress frame when done or stopped
-            self.progress_frame.pack_forget()
-            # Reset stop flag
-            self.stop_processing = False
+            max_depth = self.parse_limit(self.max_depth_var.get())
+            return max_depth, self.parse_limit(self.max_entries_var.get())
+        except ValueError:
+            messagebox.showwarning(t('DIALOGS.WARNING'), t('MESSAGES.INVALID_LIMIT'))
+            return None
+
+    @staticmethod
+    def parse_limit(value: str):
+        """Parse a limit field: None when empty, otherwise a positive integer"""
+        value = value.strip()
+        if not value:
+            return None
+        limit = int(value)
+        if limit < 1:
+            raise ValueError(value)
+        return limit
+
+    def poll_worker(self):
+        """Drain output queued by the worker and refresh progress once per frame"""
+        worker = self.worker
+        finished = None
+        while finished is None:
+            try:
+                kind, payload = worker.messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind in (DONE, ERROR):
+                finished = (kind, payload)
+            elif self.stop_processing:
+                continue  # Drop output that arrives after a stop
+            elif kind == LINES:
+                self.output_view.append(payload)
+            elif kind == TREE:
+                # Imported by the worker before posting, so this does not load anything new
+                from directory_printer.core.compact_tree import TreeLines
+
+                # The worker keeps adding rows; only the ones in view are ever rendered
+                self.tree_lines = TreeLines(payload, header=[self.selected_folder])
+                self.output_view.set_source(self.tree_lines)
+            elif kind == PATCHES:
+                self.output_view.patch(payload, offset=1)  # Line 0 is the root path
+            elif kind == WATCHING:
+                # The tree is complete; it is now kept up to date until stopped
+                self.watching = True
+                self.progress_frame.pack_forget()
+                self.generate_btn.config(state=tk.NORMAL)
+                self.record_run(worker)
+
+        if not self.stop_processing and not self.watching:
+            self.output_view.refresh()
+            self.update_progress(worker.current, worker.total)
+
+        if finished is None:
+            self.poll_id = self.root.after(FRAME_INTERVAL_MS, self.poll_worker)
+        else:
+            self.finish_processing(*finished)
+
+    def finish_processing(self, kind, payload):
+        """Clean up after the worker has finished, failed or been stopped"""
+        self.poll_id = None
+        worker, self.worker = self.worker, None
+        self.watching = False
+        exporting, self.exporting = self.exporting, False
+        if exporting:
+            # The output pane is left as it was; a stopped export writes no file
+            if kind == ERROR and not self.stop_processing:
+                messagebox.showerror(t('DIALOGS.ERROR'), t('MESSAGES.SAVE_ERROR', error=payload))
+            elif not self.stop_processing:
+                messagebox.showinfo(t('DIALOGS.SUCCESS'), t('MESSAGES.SAVE_SUCCESS'))
+        elif self.stop_processing:
+            # Clear output if stopped
+            self.output_view.clear()
+        elif kind == ERROR:
+            messagebox.showerror(t('DIALOGS.ERROR'), t('MESSAGES.PROCESS_ERROR', error=payload))
+        else:
+            self.generated_tree = worker.tree
+            self.record_run(worker)
+            if payload is not None:
+                self.show_profile(payload)
+        # Hide progress frame when done or stopped
+        self.progress_frame.pack_forget()
+        # Reset stop flag
+        self.stop_processing = False
+        self.generate_btn.config(state=tk.NORMAL)
+
+    def apply_filter(self):
+        """Show only the entries of the generated tree matching the filter, and their directories"""
+        query = self.search_var.get().strip()
+        if not query:
+            self.clear_filter()
+            return
+        if self.tree_lines is None or not self.tree_lines.tree.complete:
+            messagebox.showwarning(t('DIALOGS.WARNING'), t('MESSAGES.NO_TREE'))
+            return
+        from directory_printer.core.search import NameIndex, filter_tree
+
+        tree = self.tree_lines.tree
+        if self.name_index is None:
+            # Built once per tree; later queries only scan its distinct names
+            self.name_index = NameIndex(tree)
+        filtered = filter_tree(tree, query, self.name_index, header=self.tree_lines.header)
+        self.output_view.set_source(filtered)
+        self.matches_label.config(text=t('SEARCH.MATCHES', count=filtered.matches))
+
+    def clear_filter(self):
+        """Go back to the whole generated tree"""
+        self.search_var.set("")
+        self.matches_label.config(text="")
+        if self.tree_lines is not None and self.output_view.lines is not self.tree_lines:
+            self.output_view.set_source(self.tree_lines)
+
+    def reset_filter(self):
+        """Forget the tree and index of the previous run"""
+        self.tree_lines = None
+        self.name_index = None
+        self.generated_tree = None
+        self.search_var.set("")
+        self.matches_label.config(text="")
+
+    def record_run(self, worker):
+        """Remember the settings and size of a completed generation in the directory's profile"""
+        config = {'nested_ignore': worker.nested_ignore}
+        if worker.gitignore_path:
+            config['ignore_file'] = worker.gitignore_path
+        self.config.record_run(worker.path, config, {
+            'entries': worker.current,
+            'seconds': round(time.perf_counter() - self.run_started, 3)
+        })
+        self.update_recent_menu()
+
+    def show_profile(self, profile):
+        """Summarize a RunProfile in the status area"""
+        counts, seconds = profile.counts, profile.seconds
+        self.status_label.config(text=t(
+            'PROFILE.SUMMARY',
+            directories=counts['directories_listed'] + counts['cached_listings'],
+            entries=counts['output_lines'],
+            total=f"{seconds['total']:.2f}",
+            listing=f"{seconds['listing'] + seconds['sorting'] + seconds['stat']:.2f}",
+            ignore=f"{seconds['ignore']:.2f}",
+            formatting=f"{seconds['formatting']:.2f}",
+            output=f"{seconds['output'] + seconds['progress_callback']:.2f}"
+        ))
 
     def update_progress(self, current: int, total: int):
-        if self.stop_processing:
-            return False  # Signal to stop processing
-            
+        if not total:
+            return
+
         # Show progress frame if not already visible
         if not self.progress_frame.winfo_ismapped():
             self.progress_frame.pack(fill=tk.X, pady=5)
@@ -440,8 +770,6 @@ class DirectoryPrinterApp:
         progress = (current / total) * 100
         self.progress_bar["value"] = progress
         self.progress_label.config(text=t('PROGRESS.PROCESSING', current=current, total=total, percent=f"{progress:.1f}"))
-        self.root.update()  # Use update to process events and keep UI responsive
-        return True  # Continue processing
 
     def browse_folder(self):
         folder_selected = filedialog.askdirectory()
@@ -456,17 +784,15 @@ class DirectoryPrinterApp:
             self.update_recent_menu()
 
     def copy_to_clipboard(self):
-        content = self.output_text.get("1.0", tk.END).strip()
-        if content:
+        if len(self.output_view.lines):
             self.root.clipboard_clear()
-            self.root.clipboard_append(content)
+            self.root.clipboard_append(self.output_view.get_text().strip())
             messagebox.showinfo(t('DIALOGS.SUCCESS'), t('MESSAGES.COPY_SUCCESS'))
         else:
             messagebox.showwarning(t('DIALOGS.WARNING'), t('MESSAGES.NO_CONTENT'))
 
     def download_as_txt(self):
-        content = self.output_text.get("1.0", tk.END).strip()
-        if not content:
+        if not len(self.output_view.lines):
             messagebox.showwarning(t('DIALOGS.WARNING'), t('MESSAGES.NO_CONTENT_DOWNLOAD'))
             return
 
@@ -476,24 +802,60 @@ class DirectoryPrinterApp:
 
         file_path = filedialog.asksaveasfilename(
             defaultextension=".txt",
-            filetypes=[(t('SAVE_DIALOG.FILETYPES.TEXT'), "*.txt"), (t('SAVE_DIALOG.FILETYPES.ALL'), "*.*")],
+            filetypes=[
+                (t('SAVE_DIALOG.FILETYPES.TEXT'), "*.txt"),
+                (t('SAVE_DIALOG.FILETYPES.JSON'), "*.json"),
+                (t('SAVE_DIALOG.FILETYPES.NDJSON'), "*.ndjson"),
+                (t('SAVE_DIALOG.FILETYPES.CSV'), "*.csv"),
+                (t('SAVE_DIALOG.FILETYPES.ALL'), "*.*")
+            ],
             title=t('SAVE_DIALOG.TITLE'),
             initialfile=default_name
         )
-        
-        if file_path:
+
+        from directory_printer.core.export import EXPORT_FORMATS
+
+        if file_path and os.path.splitext(file_path)[1].lower() in EXPORT_FORMATS:
+            self.export_structure(file_path)
+        elif file_path:
             try:
+                # Written line by line: the line store may be far too large to join into one string
                 with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(content)
+                    for line in self.output_view.lines:
+                        file.write(line + "\n")
                 messagebox.showinfo(t('DIALOGS.SUCCESS'), t('MESSAGES.SAVE_SUCCESS'))
             except Exception as e:
                 messagebox.showerror(t('DIALOGS.ERROR'), t('MESSAGES.SAVE_ERROR', error=str(e)))
 
+    def export_structure(self, file_path: str):
+        """
+        Write the generated tree to a structured file on the worker, without
+        walking the directory again
+        """
+        if self.generated_tree is None:
+            messagebox.showwarning(t('DIALOGS.WARNING'), t('MESSAGES.NO_EXPORT_TREE'))
+            return
+        if self.worker is not None:
+            if not self.watching:  # Already generating or exporting
+                return
+            self.stop_worker()
+
+        self.progress_bar["value"] = 0
+        self.progress_label.config(text="")
+        self.stop_processing = False
+        self.exporting = True
+        self.worker = StructureWorker(
+            self.generated_tree.path, export_path=file_path, tree=self.generated_tree
+        )
+        self.worker.start()
+        self.generate_btn.config(state=tk.DISABLED)
+        self.poll_id = self.root.after(FRAME_INTERVAL_MS, self.poll_worker)
+
     def on_closing(self):
         """Handle window close event"""
-        if self.stop_processing or not self.progress_frame.winfo_ismapped():
+        if self.worker is None or self.stop_processing or self.watching:
             # If not processing or already stopped, close directly
-            self.root.destroy()
+            self.close()
         else:
             # If processing, ask for confirmation
             self.root.bell()
@@ -502,17 +864,40 @@ class DirectoryPrinterApp:
                 t('DIALOGS.QUIT_MESSAGE')
             ):
                 self.stop_processing = True
-                self.root.destroy()
+                self.close()
+
+    def close(self):
+        """Stop any running worker and destroy the window"""
+        self.stop_worker()
+        self.config.flush()
+        self.root.destroy()
+
+    def stop_worker(self):
+        """Stop a running or watching worker without waiting for it to finish"""
+        if self.poll_id is not None:
+            self.root.after_cancel(self.poll_id)
+            self.poll_id = None
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+        self.watching = False
+        self.exporting = False
+        self.stop_processing = False
+        self.progress_frame.pack_forget()
+        self.generate_btn.config(state=tk.NORMAL)
 
     def run(self):
         self.root.mainloop()
 
     def open_faq(self):
         """Open FAQ section in GitHub"""
-        webbrowser.open(f"{self.project_metadata.get('faqs_url')}")
+        self.open_link(f"{self.project_metadata.get('faqs_url')}")
 
     def check_updates(self):
         """Check for updates by comparing current version with latest release"""
+        import json
+        import urllib.request
+
         try:
             # Get latest release info from GitHub API
             api_url = self.project_metadata.get('release_api_url')
@@ -527,7 +912,7 @@ class DirectoryPrinterApp:
                         t('MESSAGES.UPDATE_AVAILABLE', version=latest_version),
                         icon='info'
                     ):
-                        webbrowser.open(data['html_url'])
+                        self.open_link(data['html_url'])
                 else:
                     messagebox.showinfo(
                         t('DIALOGS.SUCCESS'),
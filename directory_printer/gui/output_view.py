@@ -0,0 +1,153 @@
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk
+from typing import Iterable, Sequence
+
+
+class VirtualOutputView(ttk.Frame):
+    """
+    Read-only text view over an in-memory list of lines
+
+    Only the lines that fit in the visible window are inserted into the Text
+    widget, so appending or scrolling costs the same for ten lines or a
+    million. The vertical scrollbar is driven from the line store rather than
+    from the widget contents. Copy and export should read `lines` directly.
+
+    The store can also be any sequence of lines, such as a TreeLines view of
+    a CompactTree that renders lines only when they are read. Double-clicking
+    a directory in such a view collapses or expands it.
+    """
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent)
+        self.lines: Sequence[str] = []
+        self._top = 0
+        self._rendered_len = 0  # Store length at the last redraw
+
+        self.text = tk.Text(self, wrap=tk.NONE, **kwargs)
+        self.vscroll = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.hscroll = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.text.xview)
+        self.text.configure(xscrollcommand=self.hscroll.set)
+
+        self.text.grid(row=0, column=0, sticky='nsew')
+        self.vscroll.grid(row=0, column=1, sticky='ns')
+        self.hscroll.grid(row=1, column=0, sticky='ew')
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.text.bind("<Configure>", lambda e: self._render())
+        self.text.bind("<MouseWheel>", self._on_mousewheel)
+        self.text.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.text.bind("<Button-5>", lambda e: self._scroll_by(3))
+        self.text.bind("<Prior>", lambda e: self._scroll_page(-1))
+        self.text.bind("<Next>", lambda e: self._scroll_page(1))
+        self.text.bind("<Control-Home>", lambda e: self._scroll_to(0))
+        self.text.bind("<Control-End>", lambda e: self._scroll_to(len(self.lines)))
+        self.text.bind("<Double-Button-1>", self._on_double_click)
+        self.text.configure(state=tk.DISABLED)
+
+    def clear(self):
+        """Remove all lines"""
+        self.lines = []
+        self._top = 0
+        self._render()
+
+    def append(self, lines: Iterable[str]):
+        """Add lines to the end of the store, redrawing only if they are visible"""
+        start = len(self.lines)
+        self.lines.extend(lines)
+        if start < self._top + self._visible_rows():
+            self._render()
+        else:
+            self._rendered_len = len(self.lines)
+            self._update_scrollbar()
+
+    def set_lines(self, lines: Iterable[str]):
+        """Replace the whole store"""
+        self.lines = list(lines)
+        self._top = 0
+        self._render()
+
+    def set_source(self, lines: Sequence[str]):
+        """Show a sequence that may keep growing, without copying it; see refresh"""
+        self.lines = lines
+        self._top = 0
+        self._render()
+
+    def refresh(self):
+        """Pick up lines added to the store by someone else, redrawing only if they are visible"""
+        if len(self.lines) == self._rendered_len:
+            return
+        if self._rendered_len < self._top + self._visible_rows():
+            self._render()
+        else:
+            self._rendered_len = len(self.lines)
+            self._update_scrollbar()
+
+    def patch(self, patches: Iterable, offset: int = 0):
+        """Apply TreeModel line patches to the store, `offset` lines below the first line"""
+        for patch in patches:
+            self.lines[offset + patch.start:offset + patch.start + patch.count] = patch.lines
+        self._render()
+
+    def get_text(self) -> str:
+        """All lines joined into a single string"""
+        return "\n".join(self.lines)
+
+    def _visible_rows(self) -> int:
+        linespace = tkfont.nametofont(self.text.cget("font")).metrics("linespace")
+        return max(1, self.text.winfo_height() // max(1, linespace))
+
+    def _render(self):
+        rows = self._visible_rows()
+        self._top = max(0, min(self._top, len(self.lines) - rows))
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(self.lines[self._top:self._top + rows]))
+        self.text.configure(state=tk.DISABLED)
+        self._rendered_len = len(self.lines)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self.lines)
+        if total == 0:
+            self.vscroll.set(0.0, 1.0)
+            return
+        rows = self._visible_rows()
+        self.vscroll.set(self._top / total, min(1.0, (self._top + rows) / total))
+
+    def _scroll_to(self, top: int):
+        self._top = top
+        self._render()
+        return "break"
+
+    def _scroll_by(self, rows: int):
+        return self._scroll_to(self._top + rows)
+
+    def _scroll_page(self, direction: int):
+        return self._scroll_by(direction * max(1, self._visible_rows() - 1))
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS reports small deltas
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self._scroll_by(-3 * step)
+
+    def _on_double_click(self, event):
+        toggle = getattr(self.lines, "toggle", None)
+        if toggle is None:
+            return None
+        index = self._top + int(self.text.index(f"@{event.x},{event.y}").split('.')[0]) - 1
+        row = self.lines.row(index) if index < len(self.lines) else None
+        if row is not None and toggle(row):
+            self._render()
+        return "break"
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self._scroll_to(int(float(args[0]) * len(self.lines)))
+        elif action == "scroll":
+            amount, unit = int(args[0]), args[1]
+            if unit == "pages":
+                self._scroll_page(amount)
+            else:
+                self._scroll_by(amount)
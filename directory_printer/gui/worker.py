@@ -0,0 +1,188 @@
+import itertools
+import queue
+import threading
+from typing import Optional
+
+from directory_printer.core.snapshot import SnapshotCache
+
+# Number of tree lines sent to the UI in one message
+OUTPUT_BATCH_SIZE = 1000
+
+# Message kinds placed on the worker queue
+LINES = "lines"
+DONE = "done"
+ERROR = "error"
+WATCHING = "watching"
+PATCHES = "patches"
+TREE = "tree"
+
+
+class StructureWorker:
+    """
+    Generate a directory structure on a background thread
+
+    A structure is built into a CompactTree, kept in `tree` once complete.
+    Without sizes, (TREE, tree) is posted first and the tree then grows as
+    the directory is walked, so the UI can render whichever of its rows are
+    in view. With sizes, the tree is walked with stats and its annotated
+    lines are posted in batches as (LINES, [lines]). Either is followed by a
+    single (DONE, profile) or (ERROR, message), where profile is the run's
+    RunProfile when `profile` is set and None otherwise. Progress is not
+    queued per entry; the latest counts are kept in `current` and `total`
+    for the UI to sample whenever it redraws.
+
+    With `watch` set, the tree is built into a TreeModel instead. Once its
+    lines are sent, (WATCHING, None) is posted and the worker keeps running,
+    posting (PATCHES, [LinePatch]) for each batch of filesystem changes until
+    it is stopped. Watch mode always walks the whole tree without sizes and
+    does not follow symlinks, so max_depth, max_entries, sizes,
+    follow_symlinks, one_filesystem and source only apply to one-off
+    generation.
+
+    With `export_path` set, the rows of `tree`, a tree generated earlier, are
+    written to that JSON, NDJSON or CSV file instead, without walking the
+    directory again, and only (DONE, None) or (ERROR, message) is posted.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        gitignore_path: Optional[str] = None,
+        workers: int = 0,
+        cache: Optional[SnapshotCache] = None,
+        watch: bool = False,
+        nested_ignore: bool = False,
+        max_depth: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        sizes: bool = False,
+        largest: int = 0,
+        export_path: Optional[str] = None,
+        profile: bool = False,
+        tree=None,
+        follow_symlinks: bool = False,
+        one_filesystem: bool = False,
+        source: str = "walk"
+    ):
+        self.path = path
+        self.gitignore_path = gitignore_path
+        self.workers = workers
+        self.cache = cache
+        self.watch = watch
+        self.nested_ignore = nested_ignore
+        self.max_depth = max_depth
+        self.max_entries = max_entries
+        self.sizes = sizes
+        self.largest = largest
+        self.export_path = export_path
+        self.profile = profile
+        self.tree = tree
+        self.follow_symlinks = follow_symlinks
+        self.one_filesystem = one_filesystem
+        self.source = source
+        self.messages: "queue.Queue" = queue.Queue()
+        self.current = 0
+        self.total = 0
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def stopped(self) -> bool:
+        """Whether a stop has been requested"""
+        return self._stop_event.is_set()
+
+    def start(self):
+        """Start generating in the background"""
+        self._thread.start()
+
+    def stop(self):
+        """Ask the worker to stop at the next entry"""
+        self._stop_event.set()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def _progress(self, current: int, total: int) -> bool:
+        self.current = current
+        self.total = total
+        return not self._stop_event.is_set()
+
+    def _generate(self):
+        # Imported on the worker thread so the walker stays off the GUI startup path
+        from directory_printer.core.compact_tree import CompactTree
+        from directory_printer.core.printer import format_tree, iter_entries
+        from directory_printer.core.profiling import RunProfile
+        from directory_printer.core.sizes import summarize_sizes
+
+        profile = RunProfile() if self.profile else None
+        tree = CompactTree(self.path, stats=self.sizes)
+        if not self.sizes:
+            self.messages.put((TREE, tree))
+        entries = iter_entries(
+            self.path,
+            gitignore_path=self.gitignore_path,
+            progress_callback=self._progress,
+            workers=self.workers,
+            cache=self.cache,
+            max_depth=self.max_depth,
+            max_entries=self.max_entries,
+            nested_ignore=self.nested_ignore,
+            stats=self.sizes,
+            follow_symlinks=self.follow_symlinks,
+            one_filesystem=self.one_filesystem,
+            source=self.source,
+            profile=profile
+        )
+        # Filling the tree is the output phase here; lines are only rendered by the view
+        for entry in profile.measure_output(entries) if profile is not None else entries:
+            tree.add(entry)
+        tree.finish()
+        self.tree = tree
+        if not self.sizes:
+            return profile
+
+        # Totals are only known once the walk is over, so sized lines are rendered from the
+        # finished tree
+        summary = summarize_sizes(tree.entries(), largest=self.largest, max_depth=self.max_depth)
+        lines = itertools.chain(
+            format_tree(summary.entries, labels=summary.labels()), summary.summary_lines()
+        )
+        for batch in iter(lambda: list(itertools.islice(lines, OUTPUT_BATCH_SIZE)), []):
+            self.messages.put((LINES, batch))
+        return profile
+
+    def _export(self):
+        from directory_printer.core.export import export_tree
+
+        export_tree(self.tree, self.export_path, progress_callback=self._progress)
+
+    def _generate_and_watch(self):
+        from directory_printer.core.ignore import load_ignore
+        from directory_printer.core.tree_model import TreeModel
+        from directory_printer.core.watcher import watch_structure
+
+        matcher = load_ignore(self.path, self.gitignore_path, nested=self.nested_ignore)
+        model = TreeModel.build(
+            self.path, ignore=matcher, progress_callback=self._progress, workers=self.workers
+        )
+        if self._stop_event.is_set():
+            return
+        lines = model.lines()
+        for start in range(0, len(lines), OUTPUT_BATCH_SIZE):
+            self.messages.put((LINES, lines[start:start + OUTPUT_BATCH_SIZE]))
+        self.messages.put((WATCHING, None))
+        watch_structure(
+            model, lambda patches: self.messages.put((PATCHES, patches)), self._stop_event
+        )
+
+    def _run(self):
+        try:
+            profile = None
+            if self.export_path:
+                self._export()
+            elif self.watch:
+                self._generate_and_watch()
+            else:
+                profile = self._generate()
+            self.messages.put((DONE, profile))
+        except Exception as e:
+            self.messages.put((ERROR, str(e)))
@@ -0,0 +1,42 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from directory_printer.core.printer import iter_entries
+from directory_printer.core.sizes import plural, summarize_sizes
+
+
+class SizeSummaryTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def test_plural(self):
+        self.assertEqual(plural(0, "file"), "files")
+        self.assertEqual(plural(1, "file"), "file")
+        self.assertEqual(plural(2, "symbolic link"), "symbolic links")
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "symbolic links are not supported")
+    def test_one_file_and_one_link_are_singular(self):
+        directory = os.path.join(self.root, "dir")
+        os.mkdir(directory)
+        with open(os.path.join(directory, "file.txt"), "w", encoding="utf-8") as f:
+            f.write("hello")
+        try:
+            os.symlink("file.txt", os.path.join(directory, "link"))
+        except OSError:
+            self.skipTest("symbolic links cannot be created here")
+
+        summary = summarize_sizes(iter_entries(self.root, stats=True), largest=1)
+
+        labels = dict(zip((entry.rel_path for entry in summary.entries), summary.labels()))
+        self.assertEqual(labels["dir"], "5 B, 1 file")
+        self.assertIsNone(labels["dir/link"])
+        lines = summary.summary_lines()
+        self.assertEqual(lines[1], "Total: 5 B in 1 file and 1 symbolic link")
+        self.assertEqual(lines[3], "  5 B         1 file   dir")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from directory_printer.core.ignore import IgnoreMatcher
+from directory_printer.core.tree_model import TreeModel, apply_patches
+from directory_printer.core.watcher import watch_structure
+
+
+def _touch(path: str):
+    with open(path, "w", encoding="utf-8"):
+        pass
+
+
+class RenameIgnoreTest(unittest.TestCase):
+    """Moving a directory under paths that anchored or path-scoped rules match"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        os.makedirs(os.path.join(self.root, "src", "tmp"))
+        os.mkdir(os.path.join(self.root, "build"))
+        os.mkdir(os.path.join(self.root, "out"))
+        _touch(os.path.join(self.root, "src", "app.log"))
+        _touch(os.path.join(self.root, "src", "main.py"))
+        _touch(os.path.join(self.root, "src", "tmp", "cache.txt"))
+        self.ignore = IgnoreMatcher(["build/**/*.log", "/out/src/tmp"])
+
+    def _move(self, old: str, new: str):
+        os.rename(
+            os.path.join(self.root, *old.split("/")), os.path.join(self.root, *new.split("/"))
+        )
+
+    def _walked(self):
+        return TreeModel.build(self.root, ignore=self.ignore).lines()
+
+    def test_rename_drops_descendants_ignored_at_the_new_path(self):
+        model = TreeModel.build(self.root, ignore=self.ignore)
+        lines = model.lines()
+        self.assertTrue(any(line.endswith("app.log") for line in lines))
+
+        self._move("src", "build/src")
+        apply_patches(lines, model.rename("src", "build/src"))
+        self.assertFalse(any(line.endswith("app.log") for line in lines))
+        self.assertTrue(any(line.endswith("main.py") for line in lines))
+        self.assertEqual(lines, self._walked())
+        self.assertEqual(lines, model.lines())
+
+        self._move("build/src", "out/src")
+        apply_patches(lines, model.rename("build/src", "out/src"))
+        self.assertFalse(any(line.endswith("tmp") for line in lines))
+        self.assertEqual(lines, self._walked())
+        self.assertEqual(lines, model.lines())
+
+    def _watch(self):
+        """Watch a model of the tree, returning its lines and a wait for them to match a walk"""
+        model = TreeModel.build(self.root, ignore=self.ignore)
+        lines = model.lines()
+        stop = threading.Event()
+        lock = threading.Lock()
+
+        def on_patches(patches):
+            with lock:
+                apply_patches(lines, patches)
+
+        watcher = threading.Thread(
+            target=watch_structure, args=(model, on_patches, stop),
+            kwargs={"debounce": 0.05, "poll_interval": 0.05}
+        )
+        watcher.start()
+        self.addCleanup(watcher.join)
+        self.addCleanup(stop.set)
+        time.sleep(0.3)  # Let the watcher register the tree before anything moves
+
+        def wait_for_walk():
+            expected = self._walked()
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                with lock:
+                    if lines == expected:
+                        break
+                time.sleep(0.05)
+            with lock:
+                self.assertEqual(lines, expected)
+
+        return lines, wait_for_walk
+
+    def test_watch_drops_descendants_ignored_after_a_move(self):
+        lines, wait_for_walk = self._watch()
+        self._move("src", "build/src")
+        wait_for_walk()
+        self.assertFalse(any(line.endswith("app.log") for line in lines))
+        self.assertTrue(any(line.endswith("main.py") for line in lines))
+
+        # Moving out of the ignored location shows the log again
+        self._move("build/src", "out/src")
+        wait_for_walk()
+        self.assertTrue(any(line.endswith("app.log") for line in lines))
+        self.assertFalse(any(line.endswith("tmp") for line in lines))
+
+    def test_watch_shows_and_watches_descendants_no_longer_ignored(self):
+        # tmp is ignored when watching starts, so it is only watched once it is shown
+        self._move("src", "out/src")
+        lines, wait_for_walk = self._watch()
+        self.assertFalse(any(line.endswith("tmp") for line in lines))
+
+        self._move("out/src", "src")
+        wait_for_walk()
+        self.assertTrue(any(line.endswith("tmp") for line in lines))
+        _touch(os.path.join(self.root, "src", "tmp", "new.txt"))
+        wait_for_walk()
+        self.assertTrue(any(line.endswith("new.txt") for line in lines))
+
+
+if __name__ == "__main__":
+    unittest.main()